@@ -0,0 +1,48 @@
+"""
+Summing many ROIs over a scan by numpy slicing against the integral image.  Run from the repository root as
+    PYTHONPATH=. python benchmarks/benchmark_integral_image.py
+"""
+from __future__ import (absolute_import, division, print_function)
+import time
+import numpy
+from py4circle.lib import integral_image
+
+
+def benchmark_roi_sums(num_pts=80, det_size=256, num_rois=200, repeat=5):
+    """ Compare summing many ROIs over a scan by numpy slicing against the integral image
+    :param num_pts:
+    :param det_size:
+    :param num_rois:
+    :param repeat:
+    :return: dictionary: method -> seconds
+    """
+    counts_cube = numpy.random.randint(0, 1000, size=(num_pts, det_size, det_size)).astype('uint32')
+    corners = numpy.random.randint(0, det_size, size=(num_rois, 4))
+    range_list = [(min(r0, r1), min(c0, c1), max(r0, r1), max(c0, c1)) for r0, c0, r1, c1 in corners]
+
+    time_dict = dict()
+
+    start_time = time.time()
+    for i_repeat in range(repeat):
+        slice_sums = [counts_cube[:, r0:r1, c0:c1].sum(axis=(1, 2)) for r0, c0, r1, c1 in range_list]
+    time_dict['slicing'] = (time.time() - start_time) / repeat
+
+    start_time = time.time()
+    for i_repeat in range(repeat):
+        scan_integral = integral_image.build_integral_image(counts_cube)
+    time_dict['build integral image'] = (time.time() - start_time) / repeat
+
+    start_time = time.time()
+    for i_repeat in range(repeat):
+        table_sums = integral_image.sum_rectangles(scan_integral, range_list)
+    time_dict['integral image look-up'] = (time.time() - start_time) / repeat
+
+    assert numpy.array_equal(numpy.array(slice_sums).T, table_sums), 'Integral image sums are not correct'
+
+    return time_dict
+
+
+if __name__ == '__main__':
+    for detector_size in [256, 512]:
+        for method, seconds in sorted(benchmark_roi_sums(det_size=detector_size).items()):
+            print('{0}x{0} detector, 80 Pts., 200 ROIs: {1:25s} {2:.4f} s'.format(detector_size, method, seconds))
@@ -0,0 +1,77 @@
+"""
+Loading an ASCii MD event file block by block and from the binary cache against loading it line by line.
+Run from the repository root as
+    PYTHONPATH=. python benchmarks/benchmark_md_data.py
+"""
+from __future__ import (absolute_import, division, print_function)
+from six.moves import range
+import os
+import shutil
+import tempfile
+import time
+import numpy
+from py4circle.lib import fourcircle_utility
+
+
+def benchmark_load_md_data(num_events=1000000, work_dir=None):
+    """ Compare the throughput of loading MD event file block by block, line by line (as it used to be)
+    and from the binary cache
+    :param num_events: number of events in the generated file
+    :param work_dir: directory for the generated files.  None for a temporary directory
+    :return: dictionary: method -> (seconds, MB per second)
+    """
+    temp_dir = tempfile.mkdtemp() if work_dir is None else work_dir
+    md_file_name = os.path.join(temp_dir, 'md_events.dat')
+    cache_file_name = os.path.join(temp_dir, 'md_events.bin')
+    events = numpy.random.random((num_events, 4))
+    numpy.savetxt(md_file_name, events, fmt='%.6f', delimiter=', ')
+    file_mb = os.path.getsize(md_file_name) / 1024. ** 2
+
+    try:
+        # line by line
+        start_time = time.time()
+        with open(md_file_name, 'r') as data_file:
+            raw_lines = data_file.readlines()
+        line_xyz = numpy.zeros((len(raw_lines), 3))
+        line_intensities = numpy.zeros((len(raw_lines), ))
+        for i in range(len(raw_lines)):
+            terms = raw_lines[i].strip().split(',')
+            for j in range(3):
+                line_xyz[i][j] = float(terms[j])
+            line_intensities[i] = float(terms[3])
+        line_time = time.time() - start_time
+
+        # by blocks
+        start_time = time.time()
+        block_xyz, block_intensities = fourcircle_utility.load_hb3a_md_data(md_file_name)
+        block_time = time.time() - start_time
+
+        # by blocks to cache and then from cache
+        start_time = time.time()
+        fourcircle_utility.load_hb3a_md_data(md_file_name, cache_file_name)
+        write_cache_time = time.time() - start_time
+        start_time = time.time()
+        cache_xyz, cache_intensities = fourcircle_utility.load_hb3a_md_data(md_file_name, cache_file_name)
+        cache_sum = float(cache_intensities.sum())
+        read_cache_time = time.time() - start_time
+
+        assert numpy.array_equal(line_xyz, block_xyz) and numpy.array_equal(line_intensities, block_intensities), \
+            'Events loaded by blocks and line by line are different'
+        assert numpy.array_equal(block_xyz, cache_xyz) and cache_sum == float(block_intensities.sum()), \
+            'Events loaded from cache are different'
+        del cache_xyz, cache_intensities
+    finally:
+        if work_dir is None:
+            shutil.rmtree(temp_dir)
+
+    time_dict = dict()
+    for method, seconds in [('line by line', line_time), ('by blocks', block_time),
+                            ('to cache', write_cache_time), ('from cache', read_cache_time)]:
+        time_dict[method] = seconds, file_mb / max(seconds, 1.E-9)
+
+    return time_dict
+
+
+if __name__ == '__main__':
+    for method_name, (run_time, mb_per_second) in sorted(benchmark_load_md_data().items()):
+        print('1000000 MD events: {0:14s} {1:8.3f} s {2:10.1f} MB/s'.format(method_name, run_time, mb_per_second))
@@ -0,0 +1,62 @@
+"""
+Frame rate of stepping through the Pts. of a scan on the 2D detector view and of moving a ROI over the image.
+Run from the repository root as
+    PYTHONPATH=. python benchmarks/benchmark_mplgraphicsview2d.py
+"""
+from __future__ import (absolute_import, division, print_function)
+import sys
+import time
+import numpy
+try:
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    from PyQt4.QtGui import QApplication
+from py4circle.interface.gui.mplgraphicsview2d import MplGraphicsView2D
+
+
+def benchmark_frame_rate(graphics_view, counts_cube, q_app):
+    """ Measure the frame rate of stepping through the Pts. of a scan on a 2D view and of moving a ROI over the image
+    :param graphics_view: MplGraphicsView2D that is shown
+    :param counts_cube: (n_pt, rows, cols) array of detector counts
+    :param q_app: QApplication to process the pending draws of each frame
+    :return: 2-tuple as (Pts. per second, ROI moves per second)
+    """
+    num_pts, num_rows, num_cols = counts_cube.shape
+
+    # step through the Pts.
+    start_time = time.time()
+    for pt_index in range(num_pts):
+        graphics_view.add_2d_plot(counts_cube[pt_index], x_min=0, x_max=num_rows, y_min=0, y_max=num_cols,
+                                  title='Pt {0}'.format(pt_index + 1))
+        q_app.processEvents()
+    # END-FOR
+    pt_rate = num_pts / (time.time() - start_time)
+
+    # move a ROI over the last Pt.
+    canvas = graphics_view.canvas()
+    roi_rect = canvas.add_rectangular(0, 0, num_rows // 4, num_cols // 4, 'red', 'benchmark')
+    q_app.processEvents()
+    start_time = time.time()
+    for move_index in range(num_pts):
+        roi_rect.set_x(move_index % (num_rows // 2))
+        canvas.update_overlays()
+        q_app.processEvents()
+    # END-FOR
+    roi_rate = num_pts / (time.time() - start_time)
+    canvas.remove_overlay(roi_rect)
+
+    return pt_rate, roi_rate
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    view = MplGraphicsView2D(None)
+    view.resize(800, 800)
+    view.show()
+    app.processEvents()
+
+    for det_size in [256, 512]:
+        cube = numpy.random.poisson(10., size=(50, det_size, det_size)).astype('int32')
+        pts_per_second, moves_per_second = benchmark_frame_rate(view, cube, app)
+        print('Detector {0} x {0}: {1:.1f} Pts./s, {2:.1f} ROI moves/s'.format(det_size, pts_per_second,
+                                                                               moves_per_second))
@@ -0,0 +1,80 @@
+"""
+Per-file latency and peak memory of parsing SPICE detector XML files by streaming the raw bytes and by building
+the ElementTree.  Run from the repository root as
+    PYTHONPATH=. python benchmarks/benchmark_parse_spice_xml.py [XML files]
+A 256 x 256 detector file is generated if no file is given.
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy
+from py4circle.lib import parse_spice_xml
+try:
+    import tracemalloc
+except ImportError:
+    # python 2: peak memory is not available
+    tracemalloc = None
+
+
+def benchmark_parsers(xml_name, repeat=10):
+    """ Compare per-file latency and peak memory of the stream and etree parsing methods
+    :param xml_name:
+    :param repeat:
+    :return: dictionary: method name -> (seconds per file, peak memory in bytes or None)
+    """
+    result_dict = dict()
+    for method in ['etree', 'stream']:
+        start_time = time.time()
+        for i_repeat in range(repeat):
+            parse_spice_xml.get_counts_xml_file(xml_name, method=method)
+        latency = (time.time() - start_time) / repeat
+
+        peak_memory = None
+        if tracemalloc is not None:
+            tracemalloc.start()
+            parse_spice_xml.get_counts_xml_file(xml_name, method=method)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        result_dict[method] = latency, peak_memory
+    # END-FOR
+
+    return result_dict
+
+
+def write_detector_file(xml_name, det_size=256):
+    """ Write a SPICE detector XML file with random counts
+    :param xml_name:
+    :param det_size:
+    :return:
+    """
+    count_matrix = numpy.random.randint(0, 1000, size=(det_size, det_size))
+    det_str = '\n'.join(['\t'.join([str(count) for count in row]) for row in count_matrix])
+    with open(xml_name, 'w') as xml_file:
+        xml_file.write('<?xml version="1.0" encoding="UTF-8"?>\n<SPICErack>\n<Data>\n'
+                       '<Detector type="INT32[{0},{0}]">\n{1}\n</Detector>\n</Data>\n</SPICErack>\n'
+                       ''.format(det_size, det_str))
+
+    return
+
+
+if __name__ == '__main__':
+    temp_dir = None
+    xml_names = sys.argv[1:]
+    if len(xml_names) == 0:
+        temp_dir = tempfile.mkdtemp()
+        xml_names = [os.path.join(temp_dir, 'HB3A_exp1_scan0001_0001.xml')]
+        write_detector_file(xml_names[0])
+
+    try:
+        for xml_name in xml_names:
+            for method_name, (time_per_file, peak_bytes) in sorted(benchmark_parsers(xml_name).items()):
+                print('{0}: {1:6s} {2:.4f} s/file; peak memory {3} bytes'.format(os.path.basename(xml_name),
+                                                                                  method_name, time_per_file,
+                                                                                  peak_bytes))
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
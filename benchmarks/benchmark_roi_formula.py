@@ -0,0 +1,38 @@
+"""
+Evaluating a ROI formula for all rows at once against parsing and evaluating it row by row.
+Run from the repository root as
+    PYTHONPATH=. python benchmarks/benchmark_roi_formula.py
+"""
+from __future__ import (absolute_import, division, print_function)
+import time
+import numpy
+from py4circle.lib.roi_formula import RoiFormula
+
+
+def benchmark_formula(expression='roi0 - 0.5 * (roi0_upper_bkgd + roi0_lower_bkgd)', num_rows=500):
+    """ Compare evaluating a formula for all rows at once with parsing and evaluating it row by row
+    :param expression:
+    :param num_rows:
+    :return: dictionary: method -> seconds
+    """
+    column_dict = dict([(var_name, numpy.random.poisson(1000., num_rows).astype('float64'))
+                        for var_name in RoiFormula(expression).variables])
+
+    start_time = time.time()
+    vector_result = RoiFormula(expression).evaluate(column_dict)
+    vector_time = time.time() - start_time
+
+    start_time = time.time()
+    row_result = [RoiFormula(expression).evaluate(dict([(var_name, column_dict[var_name][row_index])
+                                                        for var_name in column_dict]))
+                  for row_index in range(num_rows)]
+    row_time = time.time() - start_time
+
+    assert numpy.allclose(vector_result, row_result), 'Vectorized and per-row results are different'
+
+    return {'vectorized': vector_time, 'per row': row_time}
+
+
+if __name__ == '__main__':
+    for method, seconds in sorted(benchmark_formula().items()):
+        print('500 rows: {0:12s} {1:.5f} s'.format(method, seconds))
@@ -0,0 +1,65 @@
+"""
+Populating the integrated counts table and reading its columns back, against filling a table widget cell by cell
+as done before.  Run from the repository root as
+    PYTHONPATH=. python benchmarks/benchmark_tablewidgets.py
+"""
+from __future__ import (absolute_import, division, print_function)
+import sys
+import time
+import numpy
+try:
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    from PyQt4.QtGui import QApplication
+import py4circle.interface.gui.MyTableWidget as tableBase
+from py4circle.interface.gui.tablewidgets import IntegratedCountsTable
+
+
+def benchmark_populate(num_rows=10000, num_rois=30, item_widget_rows=1000):
+    """ Measure populating the integrated counts table and reading its columns back, against filling a table widget
+    cell by cell.  A QApplication must exist
+    :param num_rows: number of Pts.
+    :param num_rois: number of ROI columns
+    :param item_widget_rows: number of rows to fill in the cell by cell table widget.  0 to skip
+    :return: dictionary: operation -> seconds
+    """
+    pt_list = list(range(1, num_rows + 1))
+    counts_dict = dict([(str(roi_index), numpy.random.poisson(1000., num_rows).astype('float64'))
+                        for roi_index in range(num_rois)])
+    time_dict = dict()
+
+    table = IntegratedCountsTable(None)
+    table.setup('Pt', 'int', sorted(counts_dict.keys()))
+    start_time = time.time()
+    table.set_integrated_counts(pt_list, counts_dict)
+    time_dict['model: populate {0} rows'.format(num_rows)] = time.time() - start_time
+
+    start_time = time.time()
+    for roi_name in counts_dict.keys():
+        assert numpy.array_equal(table.get_column_data(roi_name), counts_dict[roi_name]), 'Column {0} is different' \
+                                                                                         ''.format(roi_name)
+    time_dict['model: read {0} rows'.format(num_rows)] = time.time() - start_time
+
+    if item_widget_rows > 0:
+        # populate and read the first rows by QTableWidgetItems
+        item_table = tableBase.NTableWidget(None)
+        item_table.init_setup([('Pt', 'int')] + [(roi_name, 'float') for roi_name in sorted(counts_dict.keys())])
+        start_time = time.time()
+        for row_index in range(item_widget_rows):
+            item_table.append_row([pt_list[row_index]] + [counts_dict[roi_name][row_index]
+                                                          for roi_name in sorted(counts_dict.keys())])
+        time_dict['item widget: populate {0} rows'.format(item_widget_rows)] = time.time() - start_time
+
+        start_time = time.time()
+        for col_index in range(1, num_rois + 1):
+            [item_table.get_cell_value(row_index, col_index) for row_index in range(item_widget_rows)]
+        time_dict['item widget: read {0} rows'.format(item_widget_rows)] = time.time() - start_time
+    # END-IF
+
+    return time_dict
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    for operation, seconds in sorted(benchmark_populate().items()):
+        print('{0:35s} {1:.4f} s'.format(operation, seconds))
@@ -11,7 +11,13 @@ import gui.ui_MainWindow as MainWindow_ui
 import math
 
 import guiutility as gutil
+import backgroundtask
 import py4circle.lib.polarized_neutron_processor as polarized_neutron_processor
+import py4circle.lib.pt_prefetcher as pt_prefetcher
+import py4circle.lib.polarization as polarization
+import py4circle.lib.roi_util as roi_util
+import py4circle.lib.scan_watcher as scan_watcher
+import py4circle.lib.movie_export as movie_export
 from py4circle.interface.integrratedroiview import IntegratedROIView
 
 
@@ -39,6 +45,10 @@ class FourCircleMainWindow(QMainWindow):
 
         # define class variable
         self._myControl = polarized_neutron_processor.FourCirclePolarizedNeutronProcessor()
+        # load the Pts. next to the displayed one in background
+        self._ptPrefetcher = pt_prefetcher.PtPrefetcher(self._myControl)
+        # (exp, scan) of the displayed Pt.
+        self._displayedScan = None
         self._expNumber = None
         self._iptsNumber = None
         
@@ -129,6 +139,14 @@ class FourCircleMainWindow(QMainWindow):
         # define child windows
         self._integratedViewWindow = None
 
+        # latest ROI integration as (exp, scan, matrix range dict, multiply factor dict) for live update
+        self._lastIntegrationSetup = None
+        # integration running in background as (exp, scan, matrix range dict, multiply factor dict, ROI colors)
+        self._pendingIntegration = None
+        # integration, survey or movie export running in background
+        self._backgroundTask = None
+        self._scanWatcher = None
+
         # instrument information: FIXME - this number shall be flexible with input
         self._pixelXYSize = DETECTOR_SIZE
 
@@ -184,6 +202,34 @@ class FourCircleMainWindow(QMainWindow):
 
         return roi_list
 
+    def _start_background_task(self, label, task_method, result_method):
+        """
+        run a processor call in a worker thread with a progress dialog such that GUI stays responsive
+        :param label:
+        :param task_method: method as task_method(progress_callback) returning the result
+        :param result_method: method called in GUI thread with the result
+        :return: boolean: whether the task is started
+        """
+        if self._backgroundTask is not None:
+            self.pop_one_button_dialog('Another integration, survey or export is running.')
+            return False
+
+        self._backgroundTask = backgroundtask.start_task(self, label, task_method, result_method,
+                                                         self.pop_one_button_dialog,
+                                                         self._finish_background_task)
+
+        return True
+
+    def _finish_background_task(self):
+        """
+        clean up after a background task is finished, cancelled or failed
+        :return:
+        """
+        self._backgroundTask = None
+        self._pendingIntegration = None
+
+        return
+
     def calculate_polarization(self, integrated_counts_dict):
 
         # TODO FIXME - so far, this is not an elegant solution
@@ -193,31 +239,16 @@ class FourCircleMainWindow(QMainWindow):
         exp_number = int(self.ui.lineEdit_exp.text())
         scan_number = int(self.ui.lineEdit_run.text())
         pt_list = integrated_counts_dict[0][0]
-        peak_count_vec = integrated_counts_dict[0][1]
-        upper_bkgd_count_vec = integrated_counts_dict['0_upper_bkgd'][1]
-        lower_bkgd_count_vec = integrated_counts_dict['0_lower_bkgd'][1]
-
-        # vertical
-        polarizers, single_spins = \
-            self.controller.calculate_polarization(exp_number, scan_number, pt_list, peak_count_vec,
-                                                   upper_bkgd_count_vec, lower_bkgd_count_vec, flag='vertical')
-
-        # horizontal
-        left_bkgd_count_vec = integrated_counts_dict['0_left_bkgd'][1]
-        right_bkgd_count_vec = integrated_counts_dict['0_right_bkgd'][1]
-        left_right_polarizers, left_right_single_spins = \
-            self.controller.calculate_polarization(exp_number, scan_number, pt_list, peak_count_vec,
-                                                   left_bkgd_count_vec, right_bkgd_count_vec, flag='horizontal')
-
-        # encircle
-        outer_bkgd_count_vec = integrated_counts_dict['0_encircle'][1]
-        outer_bkgd_count_vec = outer_bkgd_count_vec - peak_count_vec
-        zero_count_vec = np.zeros(shape=outer_bkgd_count_vec.shape, dtype=outer_bkgd_count_vec.dtype)
-        encircle_polarizers, encircle_single_spins = \
-            self.controller.calculate_polarization(exp_number, scan_number, pt_list, peak_count_vec,
-                                                   outer_bkgd_count_vec, zero_count_vec, flag='outer')
-
-        self._polarizers = polarizers
+
+        # evaluate all the background models (vertical, horizontal and encircle) in one call
+        peak_count_vec, bkgd_model_dict = roi_util.get_background_models(integrated_counts_dict, 0)
+        pol_array_dict = self.controller.calculate_polarizations(exp_number, scan_number, pt_list, peak_count_vec,
+                                                                 bkgd_model_dict)
+
+        self._polarizers = polarization.to_polarization_list(pol_array_dict['vertical'])
+
+        encircle_polarizers = polarization.to_polarization_list(pol_array_dict['outer'])
+        encircle_single_spins = list(polarization.get_single_spin_counts(pol_array_dict['outer']))
 
         return encircle_polarizers, encircle_single_spins
 
@@ -225,6 +256,43 @@ class FourCircleMainWindow(QMainWindow):
     def controller(self):
         return self._myControl
 
+    def start_live_update(self, update_callback, integrated_counts_dict, error_callback=None):
+        """
+        watch the data directory for new Pts. of the latest integrated scan and integrate them with the same ROIs
+        :param update_callback: method to call with each update from the watcher thread
+        :param integrated_counts_dict: dictionary: ROI name -> (pt list, counts vector) integrated already
+        :param error_callback: method to call with the error message of a failed update from the watcher thread
+        :return: (boolean, str) as status and error message
+        """
+        if self._lastIntegrationSetup is None:
+            return False, 'ROIs must be integrated before live update.'
+
+        self.stop_live_update()
+
+        exp_number, scan_number, matrix_range_dict, multiply_factor_dict = self._lastIntegrationSetup
+        # polarization requires the peak ROI (the first one) and its background ROIs
+        peak_roi_name = None
+        if roi_util.get_background_roi_name(0, roi_util.ENCIRCLE_BKGD) in matrix_range_dict:
+            peak_roi_name = 0
+
+        self._scanWatcher = scan_watcher.ScanWatcher(self._myControl, exp_number, scan_number, matrix_range_dict,
+                                                     multiply_factor_dict, peak_roi_name, update_callback,
+                                                     integrated_counts_dict, error_callback=error_callback)
+        self._scanWatcher.start()
+
+        return True, ''
+
+    def stop_live_update(self):
+        """
+        stop watching the data directory
+        :return:
+        """
+        if self._scanWatcher is not None:
+            self._scanWatcher.stop()
+            self._scanWatcher = None
+
+        return
+
     def do_apply_setup(self):
         """
         Purpose:
@@ -316,24 +384,47 @@ class FourCircleMainWindow(QMainWindow):
 
     def do_export_movie(self):
         """
-
+        export all the Pts. of the scan to PNG images in working directory, which are rendered off-screen in
+        background, and to a movie if ffmpeg is available
         @return:
         """
-        self.ui.lineEdit_rawDataPtNo.setText('0')
-        scan_number = str(self.ui.lineEdit_run.text())
-
-        continue_plot = True
-        counts = 0
-        while continue_plot and counts < 1000:
-            continue_plot = self.do_plot_next_pt_raw()
-            file_name = os.path.join(self._myControl.working_dir,
-                                     'scan{}_{:04}.png'
-                                     ''.format(scan_number, int(self.ui.lineEdit_rawDataPtNo.text())))
-            print ('[INFO] Save image for {} to {}'.format(self.ui.lineEdit_rawDataPtNo.text(),
-                                                           file_name))
-            self.ui.graphicsView_detector2dPlot.save_image(file_name)
-            counts += 1
-        # END-WHILE
+        status, ret_obj = gutil.parse_integers_editors([self.ui.lineEdit_exp, self.ui.lineEdit_run])
+        if status is False:
+            self.pop_one_button_dialog(ret_obj)
+            return
+        exp_number, scan_number = ret_obj
+
+        output_dir = self._myControl.working_dir
+        if output_dir is None:
+            self.pop_one_button_dialog('Working directory must be set up to export movie.')
+            return
+
+        if movie_export.find_encoder() is None:
+            movie_file_name = None
+        else:
+            movie_file_name = os.path.join(output_dir, 'scan{0}.mp4'.format(scan_number))
+
+        def export_task(progress_callback):
+            return self._myControl.export_scan_movie(exp_number, scan_number, output_dir, movie_file_name,
+                                                     progress_callback=progress_callback)
+
+        self._start_background_task('Exporting Exp {0} Scan {1}'.format(exp_number, scan_number),
+                                    export_task, self._show_exported_movie)
+
+        return
+
+    def _show_exported_movie(self, export_result):
+        """
+        report the exported images and movie
+        :param export_result: 2-tuple as (list of PNG file names, movie file name or None)
+        :return:
+        """
+        png_file_list, movie_file_name = export_result
+        message = '{0} images are saved to {1}'.format(len(png_file_list), os.path.dirname(png_file_list[0]))
+        if movie_file_name is not None:
+            message += '\nMovie is saved to {0}'.format(movie_file_name)
+        print ('[INFO] {0}'.format(message))
+        self.pop_one_button_dialog(message)
 
         return
 
@@ -348,86 +439,49 @@ class FourCircleMainWindow(QMainWindow):
 
         print ('[INFO] ROI to integrate: {}'.format(roi_dimension_dict.keys()))
 
-        # integrate
-        integrated_value_dict = dict()
-
         # create background ROI
         AUTOBACKGROND = True   # FIXME : shall be a user's choice!
         if AUTOBACKGROND is True:
-            # get original ROIs to keep
-            roi_names = roi_dimension_dict.keys()
-
-            # add backgrounds' ROI
-            for roi_name in roi_names:
-                # dimension
-                left_bottom_x = roi_dimension_dict[roi_name][0]
-                left_bottom_y = roi_dimension_dict[roi_name][1]
-                width = roi_dimension_dict[roi_name][2]
-                height = roi_dimension_dict[roi_name][3]
-
-                # add upper background
-                upper_bkgd_left_bottom_y = left_bottom_y + height
-                upper_bkgd_name = '{}_upper_bkgd'.format(roi_name)
-                roi_dimension_dict[upper_bkgd_name] = [left_bottom_x, upper_bkgd_left_bottom_y, width, height/2]
-
-                # add lower background
-                lower_bkgd_left_bottom_y = left_bottom_y - height/2
-                lower_bkgd_name = '{}_lower_bkgd'.format(roi_name)
-                roi_dimension_dict[lower_bkgd_name] = [left_bottom_x, lower_bkgd_left_bottom_y, width, height/2]
-
-                # add left background
-                left_bkgd_left_bottom_x = left_bottom_x - width/2
-                left_bkgd_name = '{}_left_bkgd'.format(roi_name)
-                roi_dimension_dict[left_bkgd_name] = [left_bkgd_left_bottom_x, left_bottom_y, width/2, height]
-
-                # add right background
-                right_bkgd_left_bottom_x = left_bottom_x + width
-                right_bkgd_name = '{}_right_bkgd'.format(roi_name)
-                roi_dimension_dict[right_bkgd_name] = [right_bkgd_left_bottom_x, left_bottom_y, width/2, height]
-
-                # add encircled background
-                new_width = int(width * math.sqrt(2.))
-                new_height = int(height*math.sqrt(2.))
-                new_bkgd_left_bottom_x = left_bottom_x - (new_width - width)/2
-                new_bkgd_left_bottom_y = left_bottom_y - (new_height - height)/2
-                encircle_bkgd_name = '{}_encircle'.format(roi_name)
-                roi_dimension_dict[encircle_bkgd_name] = [new_bkgd_left_bottom_x, new_bkgd_left_bottom_y,
-                                                          new_width, new_height]
-
-            # END-FOR
+            # add backgrounds' ROI around the original ROIs
+            roi_dimension_dict = roi_util.add_background_rois(roi_dimension_dict)
         # END-IF
 
+        # convert the ROI/rectangular dimension to numpy array range
+        try:
+            matrix_range_dict, multiply_factor_dict = roi_util.convert_rois_to_matrix_ranges(roi_dimension_dict,
+                                                                                             DETECTOR_SIZE)
+        except RuntimeError as run_err:
+            self.pop_one_button_dialog(str(run_err))
+            return
+
+        # integrate all ROIs with one pass on the scan in background
+        exp_number = int(self.ui.lineEdit_exp.text())
+        scan_number = int(self.ui.lineEdit_run.text())
+
+        def integrate_task(progress_callback):
+            return self._myControl.integrate_rois(exp_number, scan_number, matrix_range_dict, progress_callback)
+
+        if self._start_background_task('Integrating ROIs of Exp {0} Scan {1}'.format(exp_number, scan_number),
+                                       integrate_task, self._set_integrated_rois):
+            self._pendingIntegration = (exp_number, scan_number, matrix_range_dict, multiply_factor_dict,
+                                        roi_color_dict)
+
+        return
+
+    def _set_integrated_rois(self, roi_counts_dict):
+        """
+        show the integrated ROIs from the background integration
+        :param roi_counts_dict: dictionary: ROI name -> (pt list, counts vector)
+        :return:
+        """
+        exp_number, scan_number, matrix_range_dict, multiply_factor_dict, roi_color_dict = self._pendingIntegration
+        self._lastIntegrationSetup = exp_number, scan_number, matrix_range_dict, multiply_factor_dict
+
+        integrated_value_dict = dict()
         integration_info = 'ROI multiply factor: '
-        for roi_name in roi_dimension_dict:
-            # convert the ROI/rectangular dimension to pixels
-            left_bottom_x = roi_dimension_dict[roi_name][0]
-            left_bottom_y = roi_dimension_dict[roi_name][1]
-            width = roi_dimension_dict[roi_name][2]
-            height = roi_dimension_dict[roi_name][3]
-
-            pixel_range = (left_bottom_x, left_bottom_y), (left_bottom_x + width, left_bottom_y + height)
-            print ('[DB...BAT] Pixel Range: {0}'.format(pixel_range))
-
-            # convert to numpy array range
-            min_row = (DETECTOR_SIZE - 1) - int(left_bottom_y + height + 1)
-            min_col = int(left_bottom_x - 1)
-            max_row = min_row + int(height) + 2
-            max_col = int(min_col + width)
-
-            # check whether it is out of boundary
-            original_size = (max_row - min_row + 1) * (max_col - min_col + 1)
-            min_row = max(min_row, 0)
-            max_row = min(max_row, DETECTOR_SIZE - 1)
-            min_col = max(min_col, 0)
-            max_col = min(max_col, DETECTOR_SIZE - 1)
-            new_size = (max_row - min_row + 1) * (max_col - min_col + 1)
-
-            matrix_range = (min_row, min_col), (max_row, max_col)
-            multiply_factor = float(original_size) / float(new_size)
-
-            pt_list, counts_vector = self._myControl.integrate_roi(int(self.ui.lineEdit_exp.text()),
-                                                                   int(self.ui.lineEdit_run.text()),
-                                                                   matrix_range)
+        for roi_name in roi_counts_dict:
+            pt_list, counts_vector = roi_counts_dict[roi_name]
+            multiply_factor = multiply_factor_dict[roi_name]
 
             counts_vector *= multiply_factor
             if multiply_factor > 1.0000001:
@@ -435,7 +489,6 @@ class FourCircleMainWindow(QMainWindow):
 
             print ('[DB...BAT] multiplication factor: {}'.format(multiply_factor))
             integrated_value_dict[roi_name] = pt_list, counts_vector
-
         # END-FOR
 
         # create a dialog/window for the result
@@ -608,6 +661,21 @@ class FourCircleMainWindow(QMainWindow):
     def do_quit(self):
         self.close()
 
+    def closeEvent(self, event):
+        """
+        stop the background Pt. prefetcher and scan watcher before closing
+        :param event:
+        :return:
+        """
+        self._ptPrefetcher.stop()
+        self.stop_live_update()
+        if self._backgroundTask is not None:
+            self._backgroundTask.cancel()
+            self._backgroundTask.wait()
+        super(FourCircleMainWindow, self).closeEvent(event)
+
+        return
+
     def do_remove_roi(self):
         """
         remove a selected ROI (rectangular)
@@ -706,13 +774,28 @@ class FourCircleMainWindow(QMainWindow):
         if status is False:
             err_msg = ret_obj
             self.pop_one_button_dialog(err_msg)
+            return
         start_scan = ret_obj[0]
         end_scan = ret_obj[1]
 
+        # survey in background
+        def survey_task(progress_callback):
+            return self._myControl.survey(exp_number, start_scan, end_scan, progress_callback)
+
+        self._start_background_task('Surveying Exp {0} Scans {1} - {2}'.format(exp_number, start_scan, end_scan),
+                                    survey_task, self._set_survey_result)
+
+        return
+
+    def _set_survey_result(self, survey_result):
+        """
+        show the result of the background survey
+        :param survey_result: 3-tuple (status, scan_summary list or error message, error message)
+        :return:
+        """
         max_number = int(self.ui.lineEdit_numSurveyOutput.text())
 
-        # Get value
-        status, ret_obj, err_msg = self._myControl.survey(exp_number, start_scan, end_scan)
+        status, ret_obj, err_msg = survey_result
         if status is False:
             self.pop_one_button_dialog(ret_obj)
             return
@@ -790,6 +873,11 @@ class FourCircleMainWindow(QMainWindow):
         @param pt_no:
         @return:
         """
+        # Pts. of the previous scan are not needed anymore and must not delay loading the new scan
+        if self._displayedScan != (exp_no, scan_no):
+            self._ptPrefetcher.cancel()
+            self._displayedScan = exp_no, scan_no
+
         # check whether this XML file has been loaded
         # TODO blabla
         try:
@@ -807,10 +895,13 @@ class FourCircleMainWindow(QMainWindow):
 
         self.ui.graphicsView_detector2dPlot.add_2d_plot(raw_det_data, x_min=0, x_max=det_shape[0], y_min=0,
                                                         y_max=det_shape[1],
-                                                        hold_prev_image=False, plot_type='image',
+                                                        hold_prev_image=True, plot_type='image',
                                                         title='Exp {} Scan {} Pt {}'
                                                               ''.format(exp_no, scan_no, pt_no))
 
+        # load the neighbouring Pts. ahead of the next step through the scan
+        self._ptPrefetcher.prefetch(exp_no, scan_no, pt_no)
+
         return
 
     def _plot_raw_xml_2d_old(self, exp_no, scan_no, pt_no):
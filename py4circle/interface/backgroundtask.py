@@ -0,0 +1,116 @@
+try:
+    from PyQt5 import QtCore
+    from PyQt5.QtWidgets import QProgressDialog
+except ImportError:
+    from PyQt4 import QtCore
+    from PyQt4.QtGui import QProgressDialog
+
+
+class TaskCancelled(RuntimeError):
+    """
+    Raised from the progress callback of a cancelled task to stop it
+    """
+    pass
+
+
+class BackgroundTask(QtCore.QThread):
+    """
+    Run a long processor call (such as ROI integration or survey) out of the GUI thread.
+    The task method is called with a progress callback as its only argument.  Progress, result and error are
+    passed to the GUI thread by signals.
+    """
+    progressSignal = QtCore.pyqtSignal(int, int)
+    resultSignal = QtCore.pyqtSignal(object)
+    errorSignal = QtCore.pyqtSignal(str)
+    cancelledSignal = QtCore.pyqtSignal()
+
+    def __init__(self, parent, task_method):
+        """
+        initialization
+        :param parent:
+        :param task_method: method as task_method(progress_callback) returning the result
+        """
+        super(BackgroundTask, self).__init__(parent)
+
+        self._taskMethod = task_method
+        self._cancelled = False
+
+        return
+
+    def _report_progress(self, current, total):
+        """
+        progress callback given to the task method, called in the worker thread
+        :param current:
+        :param total:
+        :return:
+        """
+        if self._cancelled:
+            raise TaskCancelled('Task is cancelled by user')
+        self.progressSignal.emit(current, total)
+
+        return
+
+    def cancel(self):
+        """
+        request the task to stop at its next progress report
+        :return:
+        """
+        self._cancelled = True
+
+        return
+
+    def run(self):
+        """
+        run the task in the worker thread
+        :return:
+        """
+        try:
+            result = self._taskMethod(self._report_progress)
+        except TaskCancelled:
+            self.cancelledSignal.emit()
+        except Exception as run_err:
+            # any error must reach the GUI thread; an exception escaping run() is only printed by Qt
+            self.errorSignal.emit('{0}: {1}'.format(run_err.__class__.__name__, run_err))
+        else:
+            if self._cancelled:
+                self.cancelledSignal.emit()
+            else:
+                self.resultSignal.emit(result)
+
+        return
+
+
+def start_task(parent, label, task_method, result_method, error_method, finish_method=None):
+    """
+    start a background task with a modal progress dialog, whose Cancel button cancels the task
+    :param parent: parent widget
+    :param label: text shown in the progress dialog
+    :param task_method: method as task_method(progress_callback) returning the result
+    :param result_method: method called in GUI thread with the result
+    :param error_method: method called in GUI thread with the error message
+    :param finish_method: method called in GUI thread when the task is finished, cancelled or failed.  None for none
+    :return: BackgroundTask (started)
+    """
+    progress_dialog = QProgressDialog(label, 'Cancel', 0, 0, parent)
+    progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+    progress_dialog.setMinimumDuration(500)
+
+    task = BackgroundTask(parent, task_method)
+
+    def update_progress(current, total):
+        progress_dialog.setMaximum(total)
+        progress_dialog.setValue(current)
+
+    task.progressSignal.connect(update_progress)
+    task.resultSignal.connect(result_method)
+    task.errorSignal.connect(error_method)
+    progress_dialog.canceled.connect(task.cancel)
+    task.finished.connect(progress_dialog.reset)
+    task.finished.connect(progress_dialog.deleteLater)
+    if finish_method is not None:
+        task.finished.connect(finish_method)
+    task.finished.connect(task.deleteLater)
+
+    task.start()
+
+    return task
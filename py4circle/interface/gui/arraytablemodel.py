@@ -0,0 +1,296 @@
+#pylint: disable=C0103,R0904
+from __future__ import (absolute_import, division, print_function)
+import numpy
+try:
+    from PyQt5 import QtCore
+except ImportError:
+    from PyQt4 import QtCore
+
+
+class ArrayTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model whose rows are the records of a NumPy structured array and whose columns are its fields.
+    Cells are formatted only when the view paints them, and the data are set and read back as whole arrays.
+    A NaN float is shown as a blank cell and a bool field as a check box.
+    The view may show a subset of the records in any order, given by an array of record indexes, such that
+    filtering and sorting do not copy the records.
+    """
+    def __init__(self, parent=None):
+        """
+        initialization
+        :param parent:
+        """
+        super(ArrayTableModel, self).__init__(parent)
+
+        self._dataArray = numpy.zeros(0, dtype=numpy.dtype([]))
+        self._columnNames = list()
+        self._columnTitles = list()
+        # indexes of the records shown as rows.  None for all the records in order
+        self._rowIndexes = None
+
+        return
+
+    @property
+    def array(self):
+        """
+        the structured array backing the table.  Call refresh() after modifying it in place
+        :return:
+        """
+        return self._dataArray
+
+    @property
+    def column_names(self):
+        """
+        names of the columns
+        :return: list of strings
+        """
+        return self._columnNames[:]
+
+    def append_rows(self, row_array):
+        """
+        append rows at once
+        :param row_array: structured array with the same dtype as the table
+        :return:
+        """
+        assert row_array.dtype == self._dataArray.dtype, 'Rows of dtype {0} cannot be appended to table of dtype {1}' \
+                                                         ''.format(row_array.dtype, self._dataArray.dtype)
+        if row_array.shape[0] == 0:
+            return
+
+        num_rows = self.rowCount()
+        num_records = self._dataArray.shape[0]
+        self.beginInsertRows(QtCore.QModelIndex(), num_rows, num_rows + row_array.shape[0] - 1)
+        self._dataArray = numpy.concatenate((self._dataArray, row_array))
+        if self._rowIndexes is not None:
+            self._rowIndexes = numpy.concatenate((self._rowIndexes,
+                                                  numpy.arange(num_records, self._dataArray.shape[0])))
+        self.endInsertRows()
+
+        return
+
+    def get_column(self, column_name):
+        """
+        get the values of a column
+        :param column_name:
+        :return: 1D array (copy)
+        """
+        if column_name not in self._columnNames:
+            raise RuntimeError('Column name {0} does not exist in table whose columns are {1}'
+                               ''.format(column_name, self._columnNames))
+
+        return self._dataArray[column_name].copy()
+
+    def get_record_indexes(self, row_number_list=None):
+        """
+        get the indexes of the records shown in rows
+        :param row_number_list: None for all the rows
+        :return: 1D integer array
+        """
+        if self._rowIndexes is None:
+            record_indexes = numpy.arange(self._dataArray.shape[0])
+        else:
+            record_indexes = self._rowIndexes
+        if row_number_list is not None:
+            record_indexes = record_indexes[numpy.asarray(row_number_list, dtype='int64')]
+
+        return record_indexes
+
+    def refresh(self, column_name=None):
+        """
+        notify the views that the values of a column (or all columns) are changed
+        :param column_name: None for all columns
+        :return:
+        """
+        if self.rowCount() == 0 or len(self._columnNames) == 0:
+            return
+
+        if column_name is None:
+            first_col = 0
+            last_col = len(self._columnNames) - 1
+        else:
+            first_col = last_col = self._columnNames.index(column_name)
+        self.dataChanged.emit(self.index(0, first_col), self.index(self.rowCount() - 1, last_col))
+
+        return
+
+    def remove_rows(self, row_number_list):
+        """
+        remove the records of rows at once
+        :param row_number_list:
+        :return:
+        """
+        keep_mask = numpy.ones(self._dataArray.shape[0], dtype=bool)
+        keep_mask[self.get_record_indexes(row_number_list)] = False
+        self.set_array(self._dataArray[keep_mask], self._columnTitles)
+
+        return
+
+    def set_array(self, data_array, column_titles=None):
+        """
+        replace the whole content of the table in one model reset.  All the records are shown in order.
+        :param data_array: 1D structured array
+        :param column_titles: titles of the columns in header.  None for the field names
+        :return:
+        """
+        assert isinstance(data_array, numpy.ndarray) and data_array.dtype.names is not None, \
+            'Table data must be a structured numpy array but not a {0}'.format(type(data_array))
+        assert data_array.ndim == 1, 'Table data must be 1D but not of shape {0}'.format(data_array.shape)
+        if column_titles is None:
+            column_titles = list(data_array.dtype.names)
+        assert len(column_titles) == len(data_array.dtype.names), 'Column titles {0} do not match fields {1}' \
+                                                                  ''.format(column_titles, data_array.dtype.names)
+
+        self.beginResetModel()
+        self._dataArray = data_array
+        self._columnNames = list(data_array.dtype.names)
+        self._columnTitles = list(column_titles)
+        self._rowIndexes = None
+        self.endResetModel()
+
+        return
+
+    def set_record_indexes(self, record_indexes):
+        """
+        show a subset of the records in the given order, such as the result of a filter and argsort
+        :param record_indexes: 1D integer array.  None for all the records in order
+        :return:
+        """
+        self.beginResetModel()
+        if record_indexes is None:
+            self._rowIndexes = None
+        else:
+            self._rowIndexes = numpy.asarray(record_indexes, dtype='int64')
+        self.endResetModel()
+
+        return
+
+    def set_column(self, column_name, values, row_indexes=None):
+        """
+        set the values of a column, or of some rows of it
+        :param column_name:
+        :param values: array or a single value
+        :param row_indexes: array of row indexes or a slice.  None for all the rows
+        :return:
+        """
+        if column_name not in self._columnNames:
+            raise RuntimeError('Column name {0} does not exist in table whose columns are {1}'
+                               ''.format(column_name, self._columnNames))
+
+        if row_indexes is None:
+            self._dataArray[column_name] = values
+        else:
+            self._dataArray[column_name][row_indexes] = values
+        self.refresh(column_name)
+
+        return
+
+    def sort_rows(self, column_name, descending=False):
+        """
+        order the shown records by a column with a stable argsort
+        :param column_name:
+        :param descending:
+        :return:
+        """
+        record_indexes = self.get_record_indexes()
+        values = self._dataArray[column_name][record_indexes]
+        if descending:
+            # negate the key (as survey_index.sort_survey) but not reverse the order, such that rows with the same
+            # value keep their order.  bool and unsigned integers are negated as float and others by their ranks
+            if values.dtype.kind in 'bu':
+                values = values.astype('float64')
+            elif values.dtype.kind not in 'if':
+                values = numpy.unique(values, return_inverse=True)[1]
+            values = -values
+        order = numpy.argsort(values, kind='mergesort')
+        self.set_record_indexes(record_indexes[order])
+
+        return
+
+    # Qt model interface
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._rowIndexes is None:
+            return self._dataArray.shape[0]
+        return self._rowIndexes.shape[0]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columnNames)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """
+        format the value of a cell to display
+        :param index:
+        :param role:
+        :return:
+        """
+        if not index.isValid():
+            return None
+
+        record_index = index.row() if self._rowIndexes is None else self._rowIndexes[index.row()]
+        value = self._dataArray[self._columnNames[index.column()]][record_index]
+        if isinstance(value, numpy.bool_):
+            if role == QtCore.Qt.CheckStateRole:
+                return QtCore.Qt.Checked if value else QtCore.Qt.Unchecked
+            return None
+        elif role != QtCore.Qt.DisplayRole:
+            return None
+
+        if isinstance(value, numpy.floating):
+            if numpy.isnan(value):
+                return ''
+            return '{0:.7f}'.format(value)
+
+        return str(value)
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        item_flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if self._dataArray.dtype[self._columnNames[index.column()]].kind == 'b':
+            item_flags |= QtCore.Qt.ItemIsUserCheckable
+        return item_flags
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self._columnTitles[section]
+        return str(section + 1)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """
+        check or uncheck a check box cell
+        :param index:
+        :param value:
+        :param role:
+        :return:
+        """
+        if not index.isValid() or role != QtCore.Qt.CheckStateRole:
+            return False
+        column_name = self._columnNames[index.column()]
+        if self._dataArray.dtype[column_name].kind != 'b':
+            return False
+
+        if hasattr(value, 'toInt'):
+            # QVariant of PyQt4
+            value = value.toInt()[0]
+        record_index = index.row() if self._rowIndexes is None else self._rowIndexes[index.row()]
+        self._dataArray[column_name][record_index] = value == QtCore.Qt.Checked
+        self.dataChanged.emit(index, index)
+
+        return True
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """
+        sort by clicking the header of a view whose sorting is enabled
+        :param column:
+        :param order:
+        :return:
+        """
+        if 0 <= column < len(self._columnNames):
+            self.sort_rows(self._columnNames[column], order == QtCore.Qt.DescendingOrder)
+
+        return
@@ -187,8 +187,8 @@ class DetectorView(mplgraphicsview2d.MplGraphicsView2D):
             y = roi_rect.get_y()
             roi_rect.set_y(y+dy)
 
-        # flush
-        self.canvas()._flush()
+        # blit the ROIs over the image
+        self.canvas().update_overlays()
 
         return
 
@@ -200,7 +200,9 @@ class DetectorView(mplgraphicsview2d.MplGraphicsView2D):
         w = self._lastRect.get_width()
         x = self._lastRect.get_x()
         self._lastRect.set_x(x + w * 0.1)
-        #  plt.show()
+        self.canvas().update_overlays()
+
+        return
 
     def move_rectangular(self, event):
         """
@@ -246,12 +248,9 @@ class DetectorView(mplgraphicsview2d.MplGraphicsView2D):
         # remove rectangular
         for roi_index in roi_index_list:
             rectangular, color = self._roiCollections[roi_index]
-            rectangular.remove()
+            self.canvas().remove_overlay(rectangular)
             del self._roiCollections[roi_index]
 
-        # flush
-        self.canvas()._flush()
-
         return
 
 
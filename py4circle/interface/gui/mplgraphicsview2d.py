@@ -123,7 +123,8 @@ class MplGraphicsView2D(QWidget):
         :param x_max:
         :param y_min:
         :param y_max:
-        :param hold_prev_image:
+        :param hold_prev_image: if True, the image on canvas is updated with the new data in place; otherwise it is
+                                replaced by a new image
         :param y_tick_label:
         :param title:
         :return:
@@ -131,8 +132,8 @@ class MplGraphicsView2D(QWidget):
         # obsoleted: self._myCanvas.addPlot2D(array2d, x_min, x_max, y_min, y_max, hold_prev_image, y_tick_label)
 
         if plot_type == 'image':
-            print ('array2d: shape = {0}, x_max = {1}'.format(array2d.shape, x_max))
-            self._myCanvas.add_image_plot(array2d, x_min, x_max, y_min, y_max, yticklabels=y_tick_label)
+            self._myCanvas.add_image_plot(array2d, x_min, x_max, y_min, y_max, holdprev=hold_prev_image,
+                                          yticklabels=y_tick_label)
         elif plot_type == 'image file':
             self._myCanvas.add_image_file()
         elif plot_type == 'scatter':
@@ -178,6 +179,7 @@ class MplGraphicsView2D(QWidget):
         # to-be-filled
 
         r = self._myCanvas.clear_canvas()
+        self._hasImage = False
 
         return r
 
@@ -332,7 +334,7 @@ class MplGraphicsView2D(QWidget):
         return
 
     def save_image(self, file_name):
-        self._myCanvas.fig.savefig(file_name)
+        self._myCanvas.save_figure(file_name)
 
     def set_indicator_position(self, line_id, pos_x, pos_y):
         """ Set the indicator to new position
@@ -463,6 +465,11 @@ class Qt4Mpl2DCanvas(FigureCanvas):
         # plot management
         self._scatterPlot = None
         self._imagePlot = None
+        # artists (such as ROI rectangulars) drawn over the image by blitting and the background under them
+        self._overlayList = list()
+        self._overlayBackground = None
+        # overlays are drawn as normal artists while the figure is saved
+        self._savingFigure = False
 
         # Initialize parent class and set parent
         FigureCanvas.__init__(self, self.fig)
@@ -481,6 +488,9 @@ class Qt4Mpl2DCanvas(FigureCanvas):
         self._isLegendOn = False
         self._legendFontSize = 8
 
+        # capture the background for overlays whenever the whole figure is drawn
+        self.mpl_connect('draw_event', self._on_draw_event)
+
         # # TODO/FIXME/TODO/FIXME ----- Prototype!
         # import matplotlib.pyplot as plt
         #
@@ -502,13 +512,19 @@ class Qt4Mpl2DCanvas(FigureCanvas):
 
     def update_image(self, array2d):
         """
-
+        update the data of the image on canvas in place.  The color scale is set to the range of the new data
+        @param array2d:
         @return:
         """
+        if self._imagePlot is None:
+            raise RuntimeError('There is no image on canvas to update.')
 
         self._imagePlot.set_data(array2d)
+        self._imagePlot.set_clim(array2d.min(), array2d.max())
 
-        self._flush()
+        # the background under overlays is out of date until the next draw
+        self._overlayBackground = None
+        self.draw_idle()
 
         return
 
@@ -603,30 +619,42 @@ class Qt4Mpl2DCanvas(FigureCanvas):
         # Flush...
         self._flush()
 
-    def add_image_plot(self, array2d, xmin, xmax, ymin, ymax, yticklabels=None):
+    def add_image_plot(self, array2d, xmin, xmax, ymin, ymax, holdprev=True, yticklabels=None):
         """
-
+        plot a 2D array as image.  The image on canvas (matplotlib.image.AxesImage) is reused such that stepping
+        through Pts. only replaces the data instead of creating a new artist for each of them
         @param array2d:
         @param xmin:
         @param xmax:
         @param ymin:
         @param ymax:
-        @param holdprev:
+        @param holdprev: if True, update the image on canvas in place; otherwise remove it and create a new one
         @param yticklabels: list of string for y ticks
         @return:
         """
         # check
-        assert isinstance(array2d, np.ndarray), 'blabla'
-        assert len(array2d.shape) == 2, 'blabla'
-
-        # show image: return is of class matplotlib.image.AxesImage
-        prev_image = self._imagePlot
-
-        self._imagePlot = self.axes.imshow(array2d, extent=[xmin, xmax, ymin, ymax], interpolation='none')
-        print ('[DB...BAT] previous image: {0}.   current image: {1}.  Are they same? {2}'
-               ''.format(prev_image, self._imagePlot, prev_image == self._imagePlot))
-        # print (self._imagePlot, type(self._imagePlot))
-        del prev_image
+        assert isinstance(array2d, np.ndarray), 'Image must be a numpy array but not a {0}'.format(type(array2d))
+        assert len(array2d.shape) == 2, 'Image must be a 2D array but not of shape {0}'.format(array2d.shape)
+
+        # the image may have been removed from axes, for example by clear_canvas()
+        if self._imagePlot is not None and self._imagePlot not in self.axes.images:
+            self._imagePlot = None
+        if self._imagePlot is not None and holdprev is False:
+            self._imagePlot.remove()
+            self._imagePlot = None
+
+        if self._imagePlot is None:
+            # show image: return is of class matplotlib.image.AxesImage
+            self._imagePlot = self.axes.imshow(array2d, extent=[xmin, xmax, ymin, ymax], interpolation='none')
+            # explicitly set aspect ratio of the image
+            # TODO ASAP Expose setup for aspect ratio
+            self.axes.set_aspect(1)
+        else:
+            self._imagePlot.set_data(array2d)
+            self._imagePlot.set_clim(array2d.min(), array2d.max())
+            if list(self._imagePlot.get_extent()) != [xmin, xmax, ymin, ymax]:
+                self._imagePlot.set_extent([xmin, xmax, ymin, ymax])
+        # END-IF-ELSE
 
         # set y ticks as an option:
         if yticklabels is not None:
@@ -634,10 +662,6 @@ class Qt4Mpl2DCanvas(FigureCanvas):
             print ("[FIXME]: The way to set up the Y-axis ticks is wrong!")
             self.axes.set_yticklabels(yticklabels)
 
-        # explicitly set aspect ratio of the image
-        # TODO ASAP Expose setup for aspect ratio
-        self.axes.set_aspect(1)
-
         # set up color bar
         # # Set color bar.  plt.colorbar() does not work!
         # if self._colorBar is None:
@@ -647,8 +671,10 @@ class Qt4Mpl2DCanvas(FigureCanvas):
         # else:
         #     self._colorBar.update_bruteforce(imgplot)
 
-        # Flush...
-        self._flush()
+        # draw once the event loop is idle, which merges with the draw for the title.
+        # the background under overlays is out of date until then
+        self._overlayBackground = None
+        self.draw_idle()
 
         return
 
@@ -695,14 +721,106 @@ class Qt4Mpl2DCanvas(FigureCanvas):
                                  linewidth=5)
         patch_return = self.axes.add_patch(new_rect)  # return type: matplotlib.patches.Rectangle
 
-        # apply to 2D
-        self._flush()
-
         # check
         assert new_rect == patch_return
 
+        # apply to 2D as an overlay
+        self.add_overlay(new_rect)
+
         return new_rect
 
+    def add_overlay(self, artist):
+        """
+        register an artist of the axes as overlay, which is excluded from the full draw and blitted over the image
+        :param artist:
+        :return:
+        """
+        artist.set_animated(True)
+        self._overlayList.append(artist)
+
+        self.update_overlays()
+
+        return
+
+    def remove_overlay(self, artist):
+        """
+        remove an overlay from axes and canvas
+        :param artist:
+        :return:
+        """
+        # it may have been removed with the axes cleared
+        if artist in self._overlayList:
+            self._overlayList.remove(artist)
+            artist.remove()
+            self.update_overlays()
+
+        return
+
+    def update_overlays(self):
+        """
+        draw the overlays (after they are added, moved or removed) by restoring the background captured at the last
+        full draw and blitting the overlays over it, without drawing the image again
+        :return:
+        """
+        if self._overlayBackground is None:
+            # background is not captured yet: overlays are drawn after the full draw
+            self.draw_idle()
+        else:
+            self.restore_region(self._overlayBackground)
+            self._draw_overlays()
+            self.blit(self.axes.bbox)
+
+        return
+
+    def save_figure(self, file_name):
+        """
+        save the figure with the overlays, which are animated and thus skipped by savefig otherwise
+        :param file_name:
+        :return:
+        """
+        for artist in self._overlayList:
+            artist.set_animated(False)
+        self._savingFigure = True
+        try:
+            self.fig.savefig(file_name)
+        finally:
+            self._savingFigure = False
+            for artist in self._overlayList:
+                artist.set_animated(True)
+        # END-TRY
+
+        # savefig may have rendered to the canvas' buffer at another resolution
+        self._overlayBackground = None
+        self.draw_idle()
+
+        return
+
+    def _draw_overlays(self):
+        """
+        draw the overlays to the canvas' buffer
+        :return:
+        """
+        for artist in self._overlayList:
+            self.axes.draw_artist(artist)
+
+        return
+
+    def _on_draw_event(self, event):
+        """
+        handling the full draw of the figure, in which the (animated) overlays are not drawn: capture the background
+        and draw the overlays over it
+        :param event:
+        :return:
+        """
+        if self._savingFigure:
+            # the overlays are drawn with the figure
+            return
+
+        self._overlayBackground = self.copy_from_bbox(self.axes.bbox)
+        self._draw_overlays()
+
+        return
+
     def add_scatter_plot(self, array2d):
         """
         add scatter plot
@@ -746,6 +864,9 @@ class Qt4Mpl2DCanvas(FigureCanvas):
 
         # clear image
         self.axes.cla()
+        self._imagePlot = None
+        self._overlayList = list()
+        self._overlayBackground = None
         # Try to clear the color bar
         if len(self.fig.axes) > 1:
             self.fig.delaxes(self.fig.axes[1])
@@ -864,10 +985,9 @@ class Qt4Mpl2DCanvas(FigureCanvas):
         assert isinstance(title, str), 'Title must be a string but not a {0}.'.format(type(title))
         assert isinstance(color, str), 'Color must be a string but not a {0}.'.format(type(color))
     
-        print '[DB...BAT] Set {0} in color {1} as the figure\'s title.'.format(title, color)
         self.axes.set_title(title)
     
-        self.draw()
+        self.draw_idle()
     
         return
 
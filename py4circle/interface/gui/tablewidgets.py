@@ -3,29 +3,103 @@ from __future__ import (absolute_import, division, print_function)
 from six.moves import range
 import numpy
 import sys
+try:
+    from PyQt5.QtWidgets import QTableView
+except ImportError:
+    from PyQt4.QtGui import QTableView
 # from HFIR_4Circle_Reduction import fourcircle_utility
 # from HFIR_4Circle_Reduction import guiutility
 
-import py4circle.interface.gui.MyTableWidget as tableBase
+from py4circle.interface.gui.arraytablemodel import ArrayTableModel
+from py4circle.lib import survey_index
+from py4circle.lib.roi_formula import get_variable_name
 
 
-class IntegratedCountsTable(tableBase.NTableWidget):
-    """ Extended table widget for integrated counts in ROI
+class IntegratedCountsTable(QTableView):
+    """ Extended table view for integrated counts in ROI.  The table is backed by a NumPy structured array with
+    one record per Pt., which is set, appended and read back as whole columns.
     """
+    # numpy types of the supported column types
+    Column_Types = {'int': 'i8', 'float': 'f8', 'double': 'f8'}
+
     def __init__(self, parent):
         """
 
         :param parent:
         """
-        tableBase.NTableWidget.__init__(self, parent)
+        QTableView.__init__(self, parent)
+
+        self._myModel = ArrayTableModel(self)
+        self.setModel(self._myModel)
 
         # set up list
         self._tableSetupList = list()
         self._tableColumnNames = list()
+        self._tableDataType = None
         # dictionary to map Pt number to row number
         self._ptNumberDict = dict()
         # calculated value column number
         self._calculatedColumnIndex = None
+        self._polarizationColumnIndex = None
+
+        return
+
+    def _create_rows(self, pt_list, counts_dict):
+        """
+        create the records of Pts. with their integrated counts.  Counts not given are blank (NaN)
+        :param pt_list:
+        :param counts_dict: dictionary: ROI name -> vector of counts in the order of pt_list
+        :return: structured array
+        """
+        assert self._tableDataType is not None, 'Table is not set up.'
+
+        row_array = numpy.zeros(len(pt_list), dtype=self._tableDataType)
+        for col_name in self._tableColumnNames[1:]:
+            row_array[col_name] = numpy.nan
+        row_array[self._tableColumnNames[0]] = pt_list
+
+        for roi_name in counts_dict.keys():
+            col_name = str(roi_name)
+            if col_name not in self._tableColumnNames:
+                raise RuntimeError('ROI {0} is not a column of table whose columns are {1}'
+                                   ''.format(roi_name, self._tableColumnNames))
+            row_array[col_name] = counts_dict[roi_name]
+        # END-FOR
+
+        return row_array
+
+    def _get_row_numbers(self, pt_list):
+        """
+        get the row numbers of Pts.
+        :param pt_list:
+        :return: 1D integer array
+        """
+        try:
+            row_list = [self._ptNumberDict[int(pt_number)] for pt_number in pt_list]
+        except KeyError as key_err:
+            raise RuntimeError('Pt number {0} does not exist in table.'.format(key_err))
+
+        return numpy.array(row_list, dtype='int64')
+
+    def _update_pt_rows(self):
+        """
+        map Pt numbers to row numbers
+        :return:
+        """
+        pt_vec = self._myModel.array[self._tableColumnNames[0]]
+        self._ptNumberDict = dict(zip(pt_vec.tolist(), range(pt_vec.shape[0])))
+
+        return
+
+    def append_integrated_counts(self, pt_list, counts_dict):
+        """
+        append Pts. with their integrated counts at once
+        :param pt_list:
+        :param counts_dict: dictionary: ROI name -> vector of counts in the order of pt_list
+        :return:
+        """
+        self._myModel.append_rows(self._create_rows(pt_list, counts_dict))
+        self._update_pt_rows()
 
         return
 
@@ -39,14 +113,7 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         assert isinstance(pt_number, int), 'Pt number {0} shall be an integer but not a {1}' \
                                            ''.format(pt_number, type(pt_number))
 
-        # construct
-        row_value_list = [None] * len(self._tableSetupList)
-        row_value_list[0] = pt_number
-
-        self.append_row(row_value_list)
-
-        # add to management
-        self._ptNumberDict[pt_number] = self.rowCount() - 1
+        self.append_integrated_counts([pt_number], dict())
 
         return
 
@@ -57,24 +124,24 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         :return:
         """
         # check input
-        assert isinstance(col_name, str), 'Column name {0} must be an integer but not a {1}.' \
+        assert isinstance(col_name, str), 'Column name {0} must be a string but not a {1}.' \
                                           ''.format(col_name, type(col_name))
 
-        # get column
-        try:
-            col_index = self._tableColumnNames.index(col_name)
-        except IndexError:
-            err_msg = 'Column name {0} does not exist in table whose columns are {1}' \
-                      ''.format(col_name, self._tableColumnNames)
-            raise RuntimeError(err_msg)
+        return self._myModel.get_column(col_name)
 
-        # set up vector
-        num_rows = self.rowCount()
-        value_list = list()
-        for row_index in range(num_rows):
-            value_list.append(self.get_cell_value(row_index, col_index))
+    def get_integrated_columns(self):
+        """ get the Pt. numbers and integrated counts of all the rows as columns, keyed by the variable names used
+        in formula, such as 'roi0' for ROI 0.  Blank cells are NaN
+        :return: dictionary: variable name -> 1D array
+        """
+        column_dict = dict()
+        for col_index, col_name in enumerate(self._tableColumnNames):
+            if col_index in [self._calculatedColumnIndex, self._polarizationColumnIndex]:
+                continue
+            column_dict[get_variable_name(col_name)] = self._myModel.get_column(col_name).astype('float64')
+        # END-FOR
 
-        return numpy.array(value_list)
+        return column_dict
 
     def get_integrated_counts(self, pt_number=None, row_number=None):
         """ get the integrated counts of one row or one certain Pt
@@ -96,22 +163,51 @@ class IntegratedCountsTable(tableBase.NTableWidget):
             raise RuntimeError('Pt number and row number cannot be given simultaneously')
 
         # set the dictionary
+        row_record = self._myModel.array[row_number]
         value_dict = dict()
-        for col_index, col_tup in enumerate(self._tableSetupList):
-            col_name = col_tup[0]
-            if '0' <= col_name <= '9':
-                col_name = 'roi{0}'.format(col_name)
-            if col_index == self._calculatedColumnIndex:
-                allow_blank = True
-            else:
-                allow_blank = False
-            value_dict[col_name] = self.get_cell_value(row_number, col_index, allow_blank)
+        for col_name in self._tableColumnNames:
+            value = row_record[col_name].item()
+            if isinstance(value, float) and numpy.isnan(value):
+                value = None
+            value_dict[get_variable_name(col_name)] = value
         # END-FOR
 
-        print ('[DB...BAT] Integrated counts: {0}'.format(value_dict))
-
         return value_dict
 
+    def remove_all_rows(self):
+        """
+        remove all rows
+        :return:
+        """
+        self._myModel.set_array(self._myModel.array[:0])
+        self._ptNumberDict = dict()
+
+        return
+
+    def remove_rows(self, row_number_list=None):
+        """ Remove rows
+        :param row_number_list: None for all the rows
+        :return: string as error message
+        """
+        if row_number_list is None:
+            self.remove_all_rows()
+            return ''
+
+        num_rows = self.rowCount()
+        error_message = ''.join(['Row %d is out of range.\n' % row_number for row_number in row_number_list
+                                 if row_number >= num_rows])
+        self._myModel.remove_rows([row_number for row_number in row_number_list if row_number < num_rows])
+        self._update_pt_rows()
+
+        return error_message
+
+    def rowCount(self):
+        """
+        number of rows
+        :return:
+        """
+        return self._myModel.rowCount()
+
     def set_calculated_value(self, pt_number, value):
         """
         set the calculated value to the table
@@ -119,15 +215,31 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         :param value:
         :return:
         """
-        # get row number
-        try:
-            row_number = self._ptNumberDict[pt_number]
-        except KeyError as key_err:
-            raise RuntimeError('Pt number {0} ({1}) does not exist in table. FYI {2}.'
-                               ''.format(pt_number, type(pt_number), key_err))
+        row_numbers = self._get_row_numbers([pt_number])
+        self._myModel.set_column(self._tableColumnNames[self._calculatedColumnIndex], value, row_numbers)
 
-        # update value
-        self.update_cell_value(row_number, self._calculatedColumnIndex, value)
+        return
+
+    def set_polarization_value(self, pt_number, value):
+        """
+        set the polarization of a spin pair to the row of its spin-up Pt.
+        :param pt_number:
+        :param value:
+        :return:
+        """
+        self.set_polarization_values([pt_number], [value])
+
+        return
+
+    def set_polarization_values(self, pt_vec, value_vec):
+        """
+        set the polarization of spin pairs to the rows of their spin-up Pts.
+        :param pt_vec:
+        :param value_vec:
+        :return:
+        """
+        row_numbers = self._get_row_numbers(pt_vec)
+        self._myModel.set_column(self._tableColumnNames[self._polarizationColumnIndex], value_vec, row_numbers)
 
         return
 
@@ -136,17 +248,24 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         set column values
         :param col_index:
         :param value_vec:
-        :param skip:
+        :param skip: number of rows to skip after each row that is set
         :return:
         """
-        for index in range(len(value_vec)):
-            row_index = index * (1 + skip)
-            if row_index >= self.rowCount():
-                break
-            else:
-                self.update_cell_value(row_index, col_index, value_vec[index])
+        row_numbers = numpy.arange(0, self.rowCount(), 1 + skip)[:len(value_vec)]
+        self._myModel.set_column(self._tableColumnNames[col_index], numpy.asarray(value_vec)[:row_numbers.shape[0]],
+                                 row_numbers)
 
-        # END-FOR
+        return
+
+    def set_integrated_counts(self, pt_list, counts_dict):
+        """
+        replace the rows of the table by Pts. with their integrated counts at once
+        :param pt_list:
+        :param counts_dict: dictionary: ROI name -> vector of counts in the order of pt_list
+        :return:
+        """
+        self._myModel.set_array(self._create_rows(pt_list, counts_dict))
+        self._update_pt_rows()
 
         return
 
@@ -161,24 +280,9 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         # check input
         assert isinstance(pt_number, int), 'Pt number {0} shall be an integer but not a {1}' \
                                            ''.format(pt_number, type(pt_number))
-        # convert ROI name to be string
-        roi_name = str(roi_name)
-
-        # get row number
-        if pt_number in self._ptNumberDict:
-            row_number = self._ptNumberDict[pt_number]
-        else:
-            raise RuntimeError('Pt {0} is not in the table.'.format(pt_number))
-
-        # get column number
-        try:
-            col_number = self._tableColumnNames.index(roi_name)
-        except ValueError as index_err:
-            raise RuntimeError('Unable to get column number for {0} due to {1}'
-                               ''.format(roi_name, index_err))
 
-        # set value
-        self.update_cell_value(row_number, col_number, value)
+        row_numbers = self._get_row_numbers([pt_number])
+        self._myModel.set_column(str(roi_name), value, row_numbers)
 
         return
 
@@ -190,7 +294,9 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         # check inputs
         assert isinstance(index_name, str), 'Index column name must be a string'
         assert isinstance(index_type, str), 'Index column type must be a string'
-        self.check_cell_type(index_type, raise_if_wrong=True)
+        if index_type not in IntegratedCountsTable.Column_Types:
+            raise RuntimeError('Index column type {0} is not supported. Supported types are {1}'
+                               ''.format(index_type, sorted(IntegratedCountsTable.Column_Types.keys())))
 
         # set up the set up list
         self._tableSetupList = list()
@@ -214,14 +320,18 @@ class IntegratedCountsTable(tableBase.NTableWidget):
         self._polarizationColumnIndex = len(self._tableSetupList) - 1
 
         # do set up
-        self.init_setup(self._tableSetupList)
+        self._tableDataType = numpy.dtype([(str(col_name), IntegratedCountsTable.Column_Types[col_type])
+                                           for col_name, col_type in self._tableSetupList])
+        self._myModel.set_array(numpy.zeros(0, dtype=self._tableDataType))
+        self._ptNumberDict = dict()
 
         return
 
 
-class ScanListTable(tableBase.NTableWidget):
+class ScanListTable(QTableView):
     """
-    Extended table widget for peak integration
+    Extended table view for the survey of the strongest reflections.  The summaries of all the surveyed scans are
+    kept in a record array, and the rows shown are the indexes of the records left by the filter, in sorted order.
     """
     Table_Setup = [('Scan', 'int'),
                    ('Max Counts Pt', 'int'),
@@ -232,37 +342,72 @@ class ScanListTable(tableBase.NTableWidget):
                    ('Q-range', 'float'),
                    ('Sample Temp', 'float'),
                    ('Selected', 'checkbox')]
+    # fields of the survey record array for the columns of Table_Setup
+    Table_Fields = ['scan', 'pt', 'counts', 'h', 'k', 'l', 'q', 'temperature', 'selected']
 
     def __init__(self, parent):
         """
         :param parent:
         """
-        tableBase.NTableWidget.__init__(self, parent)
+        QTableView.__init__(self, parent)
+
+        self._myModel = ArrayTableModel(self)
+        self.setModel(self._myModel)
 
-        self._myScanSummaryList = list()
+        self._surveyArray = self._create_table_array(survey_index.create_survey_array(list()))
 
         self._currStartScan = 0
         self._currEndScan = sys.maxsize
         self._currMinCounts = 0.
         self._currMaxCounts = sys.float_info.max
+        self._currHKL = None
+        self._currPeakType = None
 
-        self._colIndexH = None
-        self._colIndexK = None
-        self._colIndexL = None
+        # order of the rows: strongest reflection first
+        self._sortField = 'counts'
+        self._sortDescending = True
+
+        return
+
+    @staticmethod
+    def _create_table_array(survey_array):
+        """
+        create the records of the table, in the order of columns, from the survey
+        :param survey_array: structured array of survey_index.SURVEY_DTYPE
+        :return:
+        """
+        table_dtype = numpy.dtype([(field, survey_index.SURVEY_DTYPE[field])
+                                   for field in ScanListTable.Table_Fields[:-1]] + [('selected', '?')])
+        table_array = numpy.zeros(survey_array.shape[0], dtype=table_dtype)
+        for field in ScanListTable.Table_Fields[:-1]:
+            table_array[field] = survey_array[field]
+
+        return table_array
+
+    def _show_records(self, record_indexes):
+        """
+        show the records of the survey as rows
+        :param record_indexes:
+        :return:
+        """
+        if self._myModel.array is not self._surveyArray:
+            self._myModel.set_array(self._surveyArray, [col_tup[0] for col_tup in ScanListTable.Table_Setup])
+        self._myModel.set_record_indexes(record_indexes)
 
         return
 
     def filter_and_sort(self, start_scan, end_scan, min_counts, max_counts,
-                        sort_by_column, sort_order):
+                        sort_by_column, sort_order, hkl=None, peak_type=None):
         """
-        Filter the survey table and sort
-        Note: it might not be efficient here because the table will be refreshed twice
+        Filter the survey table and sort.  The table is refreshed once
         :param start_scan:
         :param end_scan:
         :param min_counts:
         :param max_counts:
         :param sort_by_column:
         :param sort_order: 0 for ascending, 1 for descending
+        :param hkl: 3-tuple of the HKL to find.  None for any HKL
+        :param peak_type: 'nuclear' or 'magnetic'.  None for both
         :return:
         """
         # check
@@ -273,65 +418,55 @@ class ScanListTable(tableBase.NTableWidget):
         assert isinstance(sort_order, int), \
             'sort_order requires an integer but not %s.' % str(type(sort_order))
 
-        # get column index to sort
-        col_index = self.get_column_index(column_name=sort_by_column)
+        # get the field to sort
+        column_titles = [col_tup[0] for col_tup in ScanListTable.Table_Setup]
+        if sort_by_column not in column_titles:
+            raise RuntimeError('Column {0} does not exist in table whose columns are {1}'
+                               ''.format(sort_by_column, column_titles))
+        self._sortField = ScanListTable.Table_Fields[column_titles.index(sort_by_column)]
+        self._sortDescending = sort_order == 1
 
-        # filter on the back end row contents list first
-        self.filter_rows(start_scan, end_scan, min_counts, max_counts)
-
-        # order
-        self.sort_by_column(col_index, sort_order)
+        # filter and order in one go
+        self._currStartScan = None
+        self.filter_rows(start_scan, end_scan, min_counts, max_counts, hkl, peak_type)
 
         return
 
-    def filter_rows(self, start_scan, end_scan, min_counts, max_counts):
+    def filter_rows(self, start_scan, end_scan, min_counts, max_counts, hkl=None, peak_type=None):
         """
-        Filter by scan number, detector counts on self._myScanSummaryList
-        and reset the table via the latest result
+        Filter by scan number, detector counts, HKL and peak type on the survey and reset the table via the
+        latest result
         :param start_scan:
         :param end_scan:
         :param min_counts:
         :param max_counts:
+        :param hkl: 3-tuple of the HKL to find.  None for any HKL
+        :param peak_type: 'nuclear' or 'magnetic'.  None for both
         :return:
         """
+        if hkl is not None:
+            hkl = tuple(float(index) for index in hkl)
+
         # check whether it can be skipped
         if start_scan == self._currStartScan and end_scan == self._currEndScan \
-                and min_counts == self._currMinCounts and max_counts == self._currMaxCounts:
+                and min_counts == self._currMinCounts and max_counts == self._currMaxCounts \
+                and hkl == self._currHKL and peak_type == self._currPeakType:
             # same filter set up, return
             return
 
-        # clear the table
-        self.remove_all_rows()
-
-        # go through all rows in the original list and then reconstruct
-        for index in range(len(self._myScanSummaryList)):
-            sum_item = self._myScanSummaryList[index]
-            # check
-            assert isinstance(sum_item, list)
-            assert len(sum_item) == len(self._myColumnNameList) - 1
-            # check with filters: original order is counts, scan, Pt., ...
-            scan_number = sum_item[1]
-            if scan_number < start_scan or scan_number > end_scan:
-                continue
-            counts = sum_item[0]
-            if counts < min_counts or counts > max_counts:
-                continue
-
-            # modify for appending to table
-            row_items = sum_item[:]
-            counts = row_items.pop(0)
-            row_items.insert(2, counts)
-            row_items.append(False)
-
-            # append to table
-            self.append_row(row_items)
-        # END-FOR (index)
+        record_indexes = survey_index.filter_survey(self._surveyArray, start_scan, end_scan, min_counts, max_counts,
+                                                    hkl, peak_type=peak_type)
+        record_indexes = survey_index.sort_survey(self._surveyArray, record_indexes, self._sortField,
+                                                  self._sortDescending)
+        self._show_records(record_indexes)
 
         # Update
         self._currStartScan = start_scan
         self._currEndScan = end_scan
         self._currMinCounts = min_counts
         self._currMaxCounts = max_counts
+        self._currHKL = hkl
+        self._currPeakType = peak_type
 
         return
 
@@ -341,11 +476,9 @@ class ScanListTable(tableBase.NTableWidget):
         :param row_index:
         :return:
         """
-        index_h = self.get_cell_value(row_index, self._colIndexH)
-        index_k = self.get_cell_value(row_index, self._colIndexK)
-        index_l = self.get_cell_value(row_index, self._colIndexL)
+        record = self._myModel.array[self._myModel.get_record_indexes([row_index])[0]]
 
-        return index_h, index_k, index_l
+        return float(record['h']), float(record['k']), float(record['l'])
 
     def get_scan_numbers(self, row_index_list):
         """
@@ -353,14 +486,19 @@ class ScanListTable(tableBase.NTableWidget):
         :param row_index_list:
         :return:
         """
-        scan_list = list()
-        scan_col_index = self.Table_Setup.index(('Scan', 'int'))
-        for row_index in row_index_list:
-            scan_number_i = self.get_cell_value(row_index, scan_col_index)
-            scan_list.append(scan_number_i)
-        scan_list.sort()
+        scan_vec = self._myModel.array['scan'][self._myModel.get_record_indexes(row_index_list)]
 
-        return scan_list
+        return sorted(scan_vec.tolist())
+
+    def get_selected_rows(self, status=True):
+        """
+        Get the rows whose check box in column 'Selected' is checked (or not)
+        :param status:
+        :return: list of row numbers
+        """
+        selected_vec = self._myModel.array['selected'][self._myModel.get_record_indexes()]
+
+        return numpy.nonzero(selected_vec == status)[0].tolist()
 
     def get_selected_run_surveyed(self, required_size=1):
         """
@@ -384,12 +522,8 @@ class ScanListTable(tableBase.NTableWidget):
                                'selected.'.format(required_size, row_index_list))
 
         # get all the scans and rows that are selected
-        scan_run_list = list()
-        for i_row in row_index_list:
-            # get scan and pt.
-            scan_number = self.get_cell_value(i_row, 0)
-            pt_number = self.get_cell_value(i_row, 1)
-            scan_run_list.append((scan_number, pt_number))
+        selected_array = self._myModel.array[self._myModel.get_record_indexes(row_index_list)]
+        scan_run_list = list(zip(selected_array['scan'].tolist(), selected_array['pt'].tolist()))
 
         # special case for only 1 run that is selected
         if len(row_index_list) == 1 and required_size is not None:
@@ -399,46 +533,58 @@ class ScanListTable(tableBase.NTableWidget):
 
         return scan_run_list
 
+    def rowCount(self):
+        """
+        number of rows shown
+        :return:
+        """
+        return self._myModel.rowCount()
+
+    def select_all_rows(self, status):
+        """
+        check or uncheck all the rows shown
+        :param status:
+        :return:
+        """
+        self._myModel.set_column('selected', status, self._myModel.get_record_indexes())
+
+        return
+
     def show_reflections(self, num_rows):
         """
+        show the strongest reflections
         :param num_rows:
         :return:
         """
         assert isinstance(num_rows, int)
         assert num_rows > 0
-        assert len(self._myScanSummaryList) > 0
-
-        print ('Number of rows = {}; scan summary list = {}'.format(num_rows, len(self._myScanSummaryList)))
-
-        for i_ref in range(min(num_rows, len(self._myScanSummaryList))):
-            # get counts
-            scan_summary = self._myScanSummaryList[i_ref]
-            # check
-            assert isinstance(scan_summary, list)
-            assert len(scan_summary) == len(self._myColumnNameList) - 1
-            # modify for appending to table
-            row_items = scan_summary[:]
-            max_count = row_items.pop(0)
-            row_items.insert(2, max_count)
-            row_items.append(False)
-            # append
-            self.append_row(row_items)
-        # END-FOR
+        assert self._surveyArray.shape[0] > 0
+
+        print ('Number of rows = {}; scan summary list = {}'.format(num_rows, self._surveyArray.shape[0]))
+
+        record_indexes = survey_index.sort_survey(self._surveyArray, numpy.arange(self._surveyArray.shape[0]),
+                                                  'counts', descending=True)
+        self._show_records(record_indexes[:num_rows])
 
         return
 
     def set_survey_result(self, scan_summary_list):
         """
-
-        :param scan_summary_list:
+        set the survey result, which is shown by show_reflections() or filter_rows()
+        :param scan_summary_list: list of scan summary or structured array of survey_index.SURVEY_DTYPE
         :return:
         """
         # check
-        assert isinstance(scan_summary_list, list)
+        if isinstance(scan_summary_list, list):
+            survey_array = survey_index.create_survey_array(scan_summary_list)
+        else:
+            survey_array = scan_summary_list
+        assert isinstance(survey_array, numpy.ndarray), 'Survey result must be a list or a numpy array but not a {0}' \
+                                                        ''.format(type(scan_summary_list))
 
-        # Sort and set to class variable
-        scan_summary_list.sort(reverse=True)
-        self._myScanSummaryList = scan_summary_list
+        self._surveyArray = self._create_table_array(survey_array)
+        # filters shall be applied to the new result
+        self._currStartScan = None
 
         return
 
@@ -447,18 +593,15 @@ class ScanListTable(tableBase.NTableWidget):
         Init setup
         :return:
         """
-        self.init_setup(ScanListTable.Table_Setup)
-        self.set_status_column_name('Selected')
-
-        self._colIndexH = ScanListTable.Table_Setup.index(('H', 'float'))
-        self._colIndexK = ScanListTable.Table_Setup.index(('K', 'float'))
-        self._colIndexL = ScanListTable.Table_Setup.index(('L', 'float'))
+        self._show_records(None)
 
         return
 
-    def reset(self):
-        """ Reset the inner survey summary table
+    def reset_survey(self):
+        """ Reset the inner survey summary table.  Not named reset(), which the view calls on each model reset
         :return:
         """
-        self._myScanSummaryList = list()
+        self._surveyArray = self._create_table_array(survey_index.create_survey_array(list()))
+        self._currStartScan = None
 
+        return
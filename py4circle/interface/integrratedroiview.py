@@ -8,12 +8,18 @@ except ImportError:
 from gui.ui_ResultViewWindow import Ui_MainWindow as ResultView_UI_MainWindow
 
 import numpy as np
+from py4circle.lib.roi_formula import RoiFormula
 
 
 class IntegratedROIView(QMainWindow):
     """
     Extended QMainWindow class for plotting and processing integrated ROI for polarized neutron experiment
     """
+    # emitted from the scan watcher's thread with an update dictionary and handled in GUI thread
+    liveUpdateSignal = QtCore.pyqtSignal(object)
+    # emitted from the scan watcher's thread with the error message of a failed update
+    liveErrorSignal = QtCore.pyqtSignal(str)
+
     def __init__(self, parent):
         """
         initialization
@@ -40,40 +46,82 @@ class IntegratedROIView(QMainWindow):
         self.ui.actionExport_Polarization.triggered.connect(self.do_export_polarization)
         self.ui.actionQuit.triggered.connect(self.do_close_window)
         self.ui.actionCalculate_Polarization.triggered.connect(self.do_calculate_polarization)
+        self.ui.actionLive_Update.toggled.connect(self.do_live_update)
+
+        self.liveUpdateSignal.connect(self.append_live_update)
+        self.liveErrorSignal.connect(self.set_integration_info)
+
+        self._integrated_counts_dict = dict()
+        self._roi_color_dict = dict()
+
+        return
+
+    def append_live_update(self, update_dict):
+        """
+        append the Pts. integrated by the scan watcher to the table and plots
+        :param update_dict: dictionary with 'pts', 'counts' and 'polarization' from ScanWatcher
+        :return:
+        """
+        new_pt_list = update_dict['pts']
+        if len(new_pt_list) > 0:
+            self.ui.tableView_result.append_integrated_counts(new_pt_list, update_dict['counts'])
+            for roi_name in update_dict['counts']:
+                new_count_vec = update_dict['counts'][roi_name]
+                pt_list, count_vec = self._integrated_counts_dict[roi_name]
+                self._integrated_counts_dict[roi_name] = (list(pt_list) + new_pt_list,
+                                                          np.concatenate((count_vec, new_count_vec)))
+            # END-FOR
+
+            # plot again with the new Pts.
+            self.clear_plots()
+            for roi_name in self._integrated_counts_dict:
+                pt_list, count_vec = self._integrated_counts_dict[roi_name]
+                self.plot_counts(np.array(pt_list), count_vec, 'Pt', self._roi_color_dict.get(roi_name, 'brown'))
+        # END-IF
+
+        # polarization (outer background) of the new spin pairs
+        if update_dict['polarization'] is not None:
+            pol_array = update_dict['polarization']['outer']
+            self.ui.tableView_result.set_polarization_values(pol_array['pt_up'], pol_array['flip'])
+        # END-IF
+
+        return
+
+    def do_live_update(self, checked):
+        """
+        start or stop following the scan in progress
+        :param checked:
+        :return:
+        """
+        if checked:
+            status, err_msg = self._my_parent.start_live_update(self.liveUpdateSignal.emit,
+                                                                self._integrated_counts_dict,
+                                                                self.liveErrorSignal.emit)
+            if not status:
+                QMessageBox.information(self, 'Live Update', err_msg)
+                self.ui.actionLive_Update.setChecked(False)
+        else:
+            self._my_parent.stop_live_update()
 
         return
 
     @staticmethod
     def calculate_by_formula(formula, value_dict):
         """
-        calculate a formula
-        :param formula:
-        :param value_dict: 
-        :return: 
+        calculate a formula for all the Pts. at once
+        :param formula: string or RoiFormula
+        :param value_dict: dictionary: variable name -> column (1D array) or a single value
+        :return: 1D array of the calculated values (or a single value)
         """
         # check inputs
-        assert isinstance(formula, str), 'Input formula {0} must be a string but not a {1}.' \
-                                         ''.format(formula, type(formula))
+        if isinstance(formula, str):
+            formula = RoiFormula(formula)
+        assert isinstance(formula, RoiFormula), 'Input formula {0} must be a string or RoiFormula but not a {1}.' \
+                                                ''.format(formula, type(formula))
         assert isinstance(value_dict, dict), 'Values {0} shall be given in a dictionary but not {1}' \
                                              ''.format(value_dict, type(value_dict))
 
-        # replace the variables with real value
-        print ('[DB...BAT] Input formula: {0}'.format(formula))
-        for var_name in value_dict.keys():
-            formula = formula.replace(var_name, str(value_dict[var_name]))
-        print ('[DB...BAT] Translated formula: {0}'.format(formula))
-
-        # execute
-        try:
-            if formula.count('=') == 0:
-                formula = '_cal_value = {0}'.format(formula)
-            dynamic_code = compile(formula, '<string>', 'exec')
-            # dynamic_code = compile('a = 1 + 2', '<string>', 'exec')
-            exec dynamic_code
-        except NameError as name_err:
-            raise name_err
-
-        return _cal_value
+        return formula.evaluate(value_dict)
 
     def do_calculate_polarization(self):
         """
@@ -82,7 +130,10 @@ class IntegratedROIView(QMainWindow):
         """
         polarizers, single_spins = self._my_parent.calculate_polarization(self._integrated_counts_dict)
         self.ui.tableView_result.set_column_values(self.ui.tableView_result._calculatedColumnIndex, single_spins)
-        self.ui.tableView_result.set_column_values(self.ui.tableView_result._polarizationColumnIndex, polarizers, skip=1)
+        # polarizer: (hkl, flip, error, spin up, spin up background, spin down, spin down background)
+        flip_ratios = [polarizer[1] for polarizer in polarizers]
+        self.ui.tableView_result.set_column_values(self.ui.tableView_result._polarizationColumnIndex, flip_ratios,
+                                                   skip=1)
 
         return
 
@@ -166,18 +217,15 @@ class IntegratedROIView(QMainWindow):
         do calculation of the ROIs
         :return:
         """
-        # read the formula
-        cal_formula = str(self.ui.lineEdit_roiFormular.text())
-        print ('[DB] Input is {0}'.format(cal_formula))
-
-        # calculate
-        num_rows = self.ui.tableView_result.rowCount()
-        for row_index in range(num_rows):
-            integrated_counts = self.ui.tableView_result.get_integrated_counts(row_number=row_index)
-            value = self.calculate_by_formula(cal_formula, integrated_counts)
-            pt_number = integrated_counts['Pt']
-            self.ui.tableView_result.set_calculated_value(pt_number=pt_number, value=value)
-        # END-FOR
+        # read the formula and calculate it on the columns of all rows
+        try:
+            cal_formula = RoiFormula(str(self.ui.lineEdit_roiFormular.text()))
+            value_vec = self.calculate_by_formula(cal_formula, self.ui.tableView_result.get_integrated_columns())
+        except RuntimeError as run_err:
+            QMessageBox.information(self, 'Formula', str(run_err))
+            return
+
+        self.ui.tableView_result.set_column_values(self.ui.tableView_result._calculatedColumnIndex, value_vec)
 
         return
 
@@ -232,6 +280,11 @@ class IntegratedROIView(QMainWindow):
         assert isinstance(roi_color_dict, dict), \
             'ROI counts {0} must be given in a dictionary but not a {1}'.format(roi_color_dict, type(roi_color_dict))
 
+        # new integration: stop following the previous one
+        if self.ui.actionLive_Update.isChecked():
+            self.ui.actionLive_Update.setChecked(False)
+        self._roi_color_dict = roi_color_dict
+
         # clear previous table and etc
         self.ui.tableView_result.remove_all_rows()
         # clear previous image
@@ -262,33 +315,19 @@ class IntegratedROIView(QMainWindow):
             'Integrated values {0} must be given in a dictionary but not a {1}' \
             ''.format(integrated_value_dict, type(integrated_value_dict))
 
-        # convert the dictionary to rows
-        pt_dict = dict()
+        # convert the dictionary to columns over all the Pts.  Pts. not integrated in a ROI are blank (NaN)
+        pt_vec = np.unique(np.concatenate([np.asarray(integrated_value_dict[roi_name][0], dtype='int64')
+                                           for roi_name in integrated_value_dict.keys()] + [np.zeros(0, 'int64')]))
+        counts_dict = dict()
         for roi_name in integrated_value_dict.keys():
             pt_list, value_vector = integrated_value_dict[roi_name]
-
-            for ipt, pt_number in enumerate(pt_list):
-                # set up the pt_dict by checking whether certain pt has been added
-                if pt_number not in pt_dict:
-                    pt_dict[pt_number] = dict()
-                # END-IF
-
-                # set value
-                pt_dict[pt_number][roi_name] = value_vector[ipt]
-            # END-FOR
+            counts_dict[roi_name] = np.full(pt_vec.shape[0], np.nan)
+            counts_dict[roi_name][np.searchsorted(pt_vec, pt_list)] = value_vector
         # END-FOR
 
         # determine roi and set up table
         self.ui.tableView_result.setup('Pt', 'int', sorted(integrated_value_dict.keys()))
-
-        # add cells
-        for pt_number in sorted(pt_dict.keys()):
-            # add row
-            self.ui.tableView_result.append_integrated_pt_row(pt_number)
-            for roi_name in pt_dict[pt_number].keys():
-                self.ui.tableView_result.set_integrated_value(pt_number, roi_name, pt_dict[pt_number][roi_name])
-            # END-FOR
-        # END-FOR
+        self.ui.tableView_result.set_integrated_counts(pt_vec, counts_dict)
 
         self._integrated_counts_dict = integrated_value_dict
 
@@ -0,0 +1,155 @@
+"""
+Headless polarization reduction of many scans: load -> integrate ROIs -> polarization for each scan, with the
+scans reduced in parallel by a pool of worker processes and the results consolidated to one table
+"""
+from __future__ import (absolute_import, division, print_function)
+import multiprocessing
+import six
+import numpy
+from py4circle.lib import polarization
+from py4circle.lib import roi_util
+from py4circle.lib import polarized_neutron_processor
+from py4circle.lib.fourcircle_utility import parse_int_array, round_hkl_array
+
+
+DEFAULT_DETECTOR_SIZE = 256
+# name of the peak ROI, same as the first ROI drawn in GUI
+PEAK_ROI_NAME = 0
+
+# one record per spin pair per background model per scan
+BATCH_DTYPE = numpy.dtype([('scan', 'i8'), ('model', 'U16')] + polarization.POLARIZATION_DTYPE.descr)
+
+
+def reduce_scan(task):
+    """ Reduce one scan to polarization of all background models.  It runs in a worker process.
+    :param task: tuple as (exp number, scan number, peak ROI [left bottom x, left bottom y, width, height] in pixels,
+                 data directory, working directory or None, detector size)
+    :return: 3-tuple as (scan number, dictionary: model name -> polarization structured array or None,
+             error message)
+    """
+    exp_number, scan_number, roi_dimension, data_dir, work_dir, detector_size = task
+
+    # any failure of a scan is reported and the scan is skipped, such that the other scans are still reduced
+    try:
+        processor = polarized_neutron_processor.FourCirclePolarizedNeutronProcessor()
+        processor.set_exp_number(exp_number)
+        status, err_msg = processor.set_local_data_dir(data_dir)
+        if not status:
+            return scan_number, None, err_msg
+        if work_dir is not None:
+            status, err_msg = processor.set_working_directory(work_dir)
+            if not status:
+                return scan_number, None, err_msg
+
+        # peak ROI and its backgrounds in matrix ranges
+        roi_dimension_dict = roi_util.add_background_rois({PEAK_ROI_NAME: roi_dimension})
+        matrix_range_dict, multiply_factor_dict = roi_util.convert_rois_to_matrix_ranges(roi_dimension_dict,
+                                                                                         detector_size)
+
+        roi_counts_dict = processor.integrate_rois(exp_number, scan_number, matrix_range_dict)
+        for roi_name in roi_counts_dict:
+            roi_counts_dict[roi_name][1][:] *= multiply_factor_dict[roi_name]
+
+        pt_list = roi_counts_dict[PEAK_ROI_NAME][0]
+        peak_count_vec, bkgd_model_dict = roi_util.get_background_models(roi_counts_dict, PEAK_ROI_NAME)
+        pol_array_dict = processor.calculate_polarizations(exp_number, scan_number, pt_list, peak_count_vec,
+                                                           bkgd_model_dict, export=False)
+    except Exception as run_err:
+        return scan_number, None, '{0}: {1}'.format(run_err.__class__.__name__, run_err)
+
+    return scan_number, pol_array_dict, ''
+
+
+def reduce_scans(exp_number, scan_numbers, roi_dimension, data_dir, work_dir=None, output_file_name=None,
+                 workers=None, detector_size=DEFAULT_DETECTOR_SIZE):
+    """ Reduce polarization of a list of scans in parallel and consolidate the results
+    :param exp_number:
+    :param scan_numbers: list of scan numbers or a string such as '12, 15-20' (parse_int_array syntax)
+    :param roi_dimension: peak ROI as [left bottom x, left bottom y, width, height] in detector pixels
+    :param data_dir: directory of SPICE data files
+    :param work_dir: working directory for the binary detector counts cache.  None for no cache
+    :param output_file_name: name of the consolidated result table file.  None for not writing
+    :param workers: number of worker processes.  None for the number of CPUs
+    :param detector_size:
+    :return: 2-tuple as (structured array of BATCH_DTYPE, dictionary: failed scan number -> error message)
+    """
+    # check inputs
+    assert isinstance(exp_number, int), 'Experiment number {0} must be an integer but not a {1}' \
+                                        ''.format(exp_number, type(exp_number))
+    if isinstance(scan_numbers, six.string_types):
+        status, scan_numbers = parse_int_array(scan_numbers)
+        if not status:
+            raise RuntimeError('Unable to parse scan numbers: {0}'.format(scan_numbers))
+    assert isinstance(scan_numbers, list), 'Scan numbers {0} must be given in a list or a string but not a {1}' \
+                                           ''.format(scan_numbers, type(scan_numbers))
+    assert len(roi_dimension) == 4, 'ROI {0} must be given as [left bottom x, left bottom y, width, height]' \
+                                    ''.format(roi_dimension)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    assert isinstance(workers, int) and workers > 0, 'Number of workers {0} must be a positive integer.' \
+                                                     ''.format(workers)
+
+    task_list = [(exp_number, scan_number, list(roi_dimension), data_dir, work_dir, detector_size)
+                 for scan_number in scan_numbers]
+
+    # reduce scans in parallel
+    if workers > 1 and len(task_list) > 1:
+        worker_pool = multiprocessing.Pool(processes=min(workers, len(task_list)))
+        try:
+            result_list = worker_pool.map(reduce_scan, task_list, chunksize=1)
+        finally:
+            worker_pool.close()
+            worker_pool.join()
+    else:
+        result_list = [reduce_scan(task) for task in task_list]
+
+    # consolidate
+    table_list = list()
+    error_dict = dict()
+    for scan_number, pol_array_dict, err_msg in result_list:
+        if pol_array_dict is None:
+            print('[ERROR] Unable to reduce Exp {0} Scan {1} due to {2}'.format(exp_number, scan_number, err_msg))
+            error_dict[scan_number] = err_msg
+            continue
+        for model_name in sorted(pol_array_dict.keys()):
+            pol_array = pol_array_dict[model_name]
+            scan_table = numpy.zeros(pol_array.shape[0], dtype=BATCH_DTYPE)
+            scan_table['scan'] = scan_number
+            scan_table['model'] = model_name
+            for field_name in polarization.POLARIZATION_DTYPE.names:
+                scan_table[field_name] = pol_array[field_name]
+            table_list.append(scan_table)
+    # END-FOR
+
+    if len(table_list) > 0:
+        result_table = numpy.concatenate(table_list)
+    else:
+        result_table = numpy.zeros(0, dtype=BATCH_DTYPE)
+
+    if output_file_name is not None:
+        write_result_table(result_table, output_file_name)
+
+    return result_table, error_dict
+
+
+def write_result_table(result_table, file_name):
+    """ Write the consolidated polarization table to a column-aligned ASCII file
+    :param result_table: structured array of BATCH_DTYPE
+    :param file_name:
+    :return:
+    """
+    # HKL of all the records are rounded at once
+    hkl_matrix = round_hkl_array(result_table['hkl']).astype('int64')
+    out_buffer = '# Scan  Model       PtUp  PtDown  H  K  L  Flip  Error  SpinUp  SpinUpBk  SpinDown  SpinDownBk\n'
+    for record, hkl in zip(result_table, hkl_matrix):
+        out_buffer += '{:6d}  {:10s}  {:4d}  {:4d}  {:4d}  {:4d}  {:4d}   {:3.5f}  {:3.5f}  {:3.5f}  {:3.5f}  ' \
+                      '{:3.5f}  {:3.5f}\n'.format(int(record['scan']), str(record['model']), int(record['pt_up']),
+                                                  int(record['pt_down']), int(hkl[0]), int(hkl[1]),
+                                                  int(hkl[2]), record['flip'], record['error'],
+                                                  record['spin_up'], record['spin_up_bkgd'], record['spin_down'],
+                                                  record['spin_down_bkgd'])
+
+    with open(file_name, 'w') as out_file:
+        out_file.write(out_buffer)
+
+    return
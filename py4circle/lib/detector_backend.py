@@ -0,0 +1,342 @@
+"""
+Backends holding the per-Pt. detector data and SPICE scan tables loaded by FourCirclePolarizedNeutronProcessor.
+The NumPy backend keeps them as in-memory arrays and SpiceTables; the Mantid backend keeps them as workspaces
+in Mantid's AnalysisDataService such that they can be used by Mantid algorithms.
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+from py4circle.lib import detector_workspace
+from py4circle.lib.fourcircle_utility import get_raw_data_workspace_name, get_spice_file_name, \
+    get_spice_table_name, import_mantid
+
+
+BACKEND_NUMPY = 'numpy'
+BACKEND_MANTID = 'mantid'
+BACKEND_NAMES = [BACKEND_NUMPY, BACKEND_MANTID]
+
+
+def create_backend(backend_name, processor):
+    """ Create a detector data backend by name
+    :param backend_name: 'numpy' or 'mantid'
+    :param processor: FourCirclePolarizedNeutronProcessor that the backend works for
+    :return: DetectorBackend
+    """
+    if backend_name == BACKEND_NUMPY:
+        backend = NumpyBackend(processor)
+    elif backend_name == BACKEND_MANTID:
+        backend = MantidBackend(processor)
+    else:
+        raise RuntimeError('Backend {0} is not supported. Supported are {1}'.format(backend_name, BACKEND_NAMES))
+
+    return backend
+
+
+class DetectorBackend(object):
+    """
+    Interface of the detector data backends.  Pts. are keyed by (exp number, scan number, pt number).
+    """
+    def __init__(self, processor):
+        """
+        initialization
+        :param processor: FourCirclePolarizedNeutronProcessor that the backend works for
+        """
+        self._processor = processor
+
+        return
+
+    @property
+    def name(self):
+        raise NotImplementedError('Backend {0} does not define its name'.format(self.__class__.__name__))
+
+    def get_detector_counts(self, exp_no, scan_no, pt_no):
+        """
+        get the counts of a loaded Pt. as a 2D array, to look at the detector from sample
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :return: 2D numpy array
+        """
+        raise NotImplementedError('Backend {0} does not implement get_detector_counts()'
+                                  ''.format(self.__class__.__name__))
+
+    def get_pt_data(self, exp_no, scan_no, pt_no):
+        """
+        get the data object of a loaded Pt.
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :return: backend specific data object or None if the Pt. is not loaded
+        """
+        raise NotImplementedError('Backend {0} does not implement get_pt_data()'.format(self.__class__.__name__))
+
+    def get_scan_table(self, exp_no, scan_no):
+        """
+        get the SPICE scan table of a scan
+        :param exp_no:
+        :param scan_no:
+        :return: backend specific table object
+        """
+        raise NotImplementedError('Backend {0} does not implement get_scan_table()'.format(self.__class__.__name__))
+
+    def has_pt(self, exp_no, scan_no, pt_no):
+        """
+        check whether a Pt. is loaded
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :return:
+        """
+        return self.get_pt_data(exp_no, scan_no, pt_no) is not None
+
+    def list_data(self):
+        """
+        list the data objects held by the backend
+        :return: list of 2-tuples as (name, type)
+        """
+        raise NotImplementedError('Backend {0} does not implement list_data()'.format(self.__class__.__name__))
+
+    def load_pt(self, exp_no, scan_no, pt_no, xml_file_name, over_write_existing=False):
+        """
+        load the SPICE detector XML file of a Pt.
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :param xml_file_name:
+        :param over_write_existing: flag to load again if the Pt. has been loaded
+        :return: (bool, str) as (loaded or not, name of the data or error message)
+        """
+        raise NotImplementedError('Backend {0} does not implement load_pt()'.format(self.__class__.__name__))
+
+
+class NumpyBackend(DetectorBackend):
+    """
+    Detector counts as 2D numpy arrays (parsed by the processor's pure python loader) and native SPICE tables
+    """
+    def __init__(self, processor):
+        """
+        initialization
+        :param processor:
+        """
+        super(NumpyBackend, self).__init__(processor)
+
+        # (exp, scan, pt) -> 2D counts array
+        self._countsDict = dict()
+
+        return
+
+    @property
+    def name(self):
+        return BACKEND_NUMPY
+
+    def get_detector_counts(self, exp_no, scan_no, pt_no):
+        """
+        get the counts of a loaded Pt.
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :return: 2D numpy array
+        """
+        try:
+            return self._countsDict[(exp_no, scan_no, pt_no)]
+        except KeyError:
+            raise RuntimeError('Raw data for Exp {0} Scan {1} Pt {2} is not loaded.'.format(exp_no, scan_no, pt_no))
+
+    def get_pt_data(self, exp_no, scan_no, pt_no):
+        return self._countsDict.get((exp_no, scan_no, pt_no), None)
+
+    def get_scan_table(self, exp_no, scan_no):
+        return self._processor.get_spice_table(exp_no, scan_no)
+
+    def list_data(self):
+        """
+        list the loaded SPICE tables and detector counts
+        :return: list of 2-tuples as (name, type)
+        """
+        data_list = [(get_spice_table_name(exp_no, scan_no), 'SpiceTable')
+                     for exp_no, scan_no in sorted(self._processor.loaded_spice_tables)]
+        data_list.extend([(get_raw_data_workspace_name(exp_no, scan_no, pt_no), 'DetectorCounts')
+                          for exp_no, scan_no, pt_no in sorted(self._countsDict.keys())])
+
+        return data_list
+
+    def load_pt(self, exp_no, scan_no, pt_no, xml_file_name, over_write_existing=False):
+        """
+        load the detector counts of a Pt.
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :param xml_file_name:
+        :param over_write_existing:
+        :return: (bool, str) as (loaded or not, name of the data or error message)
+        """
+        data_name = get_raw_data_workspace_name(exp_no, scan_no, pt_no)
+        if (exp_no, scan_no, pt_no) in self._countsDict and over_write_existing is False:
+            return True, data_name
+
+        try:
+            count_matrix = self._processor.load_spice_xml_file2(exp_no, scan_no, pt_no, xml_file_name)
+        except RuntimeError as run_err:
+            return False, str(run_err)
+        self._countsDict[(exp_no, scan_no, pt_no)] = count_matrix
+
+        return True, data_name
+
+
+class MantidBackend(DetectorBackend):
+    """
+    Detector counts as Workspace2D loaded by LoadSpiceXML2DDet and SPICE tables as TableWorkspace loaded by
+    LoadSpiceAscii, all in Mantid's AnalysisDataService
+    """
+    def __init__(self, processor):
+        """
+        initialization
+        :param processor:
+        """
+        super(MantidBackend, self).__init__(processor)
+
+        # (exp, scan, pt) -> Workspace2D
+        self._rawDataWSDict = dict()
+        self._refWorkspaceForMask = None
+
+        return
+
+    @property
+    def name(self):
+        return BACKEND_MANTID
+
+    def _add_raw_workspace(self, exp_no, scan_no, pt_no, raw_ws):
+        """ Add raw Pt.'s workspace
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :param raw_ws: workspace or name of the workspace
+        :return: None
+        """
+        # Check
+        assert isinstance(exp_no, int)
+        assert isinstance(scan_no, int)
+        assert isinstance(pt_no, int)
+        mantidsimple, AnalysisDataService = import_mantid()
+        import mantid.dataobjects
+
+        if isinstance(raw_ws, str):
+            # Given by name
+            matrix_ws = AnalysisDataService.retrieve(raw_ws)
+        else:
+            matrix_ws = raw_ws
+        assert isinstance(matrix_ws, mantid.dataobjects.Workspace2D)
+
+        self._rawDataWSDict[(exp_no, scan_no, pt_no)] = matrix_ws
+
+        return
+
+    def get_detector_counts(self, exp_no, scan_no, pt_no):
+        """
+        get the counts of a loaded Pt. with the detector size of the workspace
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :return: 2D numpy array
+        """
+        raw_ws = self.get_pt_data(exp_no, scan_no, pt_no)
+        if raw_ws is None:
+            raise RuntimeError('Raw data for Exp {0} Scan {1} Pt {2} is not loaded.'.format(exp_no, scan_no, pt_no))
+
+        return detector_workspace.extract_detector_counts(raw_ws)
+
+    def get_pt_data(self, exp_no, scan_no, pt_no):
+        """ Get raw workspace
+        """
+        try:
+            ws = self._rawDataWSDict[(exp_no, scan_no, pt_no)]
+            import mantid.dataobjects
+            assert isinstance(ws, mantid.dataobjects.Workspace2D)
+        except KeyError:
+            return None
+
+        return ws
+
+    def get_scan_table(self, exp_no, scan_no):
+        """ Get SPICE's scan table workspace, which is only required by Mantid's LoadSpiceXML2DDet.
+        It is loaded by LoadSpiceAscii if it does not exist in ADS.
+        :param exp_no:
+        :param scan_no:
+        :return: Table workspace
+        """
+        mantidsimple, AnalysisDataService = import_mantid()
+
+        spice_ws_name = get_spice_table_name(exp_no, scan_no)
+        if AnalysisDataService.doesExist(spice_ws_name):
+            ws = AnalysisDataService.retrieve(spice_ws_name)
+        else:
+            spice_file_name = os.path.join(self._processor.data_dir,
+                                           get_spice_file_name(self._processor.instrument_name, exp_no, scan_no))
+            try:
+                ws, info_matrix_ws = mantidsimple.LoadSpiceAscii(Filename=spice_file_name,
+                                                                 OutputWorkspace=spice_ws_name,
+                                                                 RunInfoWorkspace='TempInfo')
+                mantidsimple.DeleteWorkspace(Workspace=info_matrix_ws)
+            except RuntimeError as run_err:
+                raise KeyError('Unable to load SPICE table workspace {0} from {1} due to {2}'
+                               ''.format(spice_ws_name, spice_file_name, run_err))
+
+        return ws
+
+    def list_data(self):
+        """
+        get the list of workspaces that are in ADS current
+        :return:
+        """
+        mantidsimple, AnalysisDataService = import_mantid()
+
+        ws_name_list = AnalysisDataService.getObjectNames()
+        for index, ws_name in enumerate(ws_name_list):
+            ws_i = AnalysisDataService.retrieve(ws_name)
+            ws_type = ws_i.id()
+            ws_name_list[index] = ws_name, ws_type
+
+        return ws_name_list
+
+    def load_pt(self, exp_no, scan_no, pt_no, xml_file_name, over_write_existing=False):
+        """
+        load the SPICE detector XML file of a Pt. to a Workspace2D by LoadSpiceXML2DDet
+        :param exp_no:
+        :param scan_no:
+        :param pt_no:
+        :param xml_file_name:
+        :param over_write_existing: if workspace exists, load still
+        :return: (bool, str) as (loaded or not, workspace name)
+        """
+        mantidsimple, AnalysisDataService = import_mantid()
+        import mantid.dataobjects
+
+        # retrieve and check SPICE table workspace
+        spice_table_ws = self.get_scan_table(exp_no, scan_no)
+        assert isinstance(spice_table_ws, mantid.dataobjects.TableWorkspace), 'SPICE table workspace must be a ' \
+                                                                              'TableWorkspace but not %s.' \
+                                                                              '' % type(spice_table_ws)
+        spice_table_name = spice_table_ws.name()
+
+        # load SPICE Pt.  detector file
+        pt_ws_name = get_raw_data_workspace_name(exp_no, scan_no, pt_no)
+        if AnalysisDataService.doesExist(pt_ws_name) and over_write_existing is False:
+            pass
+        else:
+            try:
+                mantidsimple.LoadSpiceXML2DDet(Filename=xml_file_name,
+                                               OutputWorkspace=pt_ws_name,
+                                               SpiceTableWorkspace=spice_table_name,
+                                               PtNumber=pt_no)
+                if self._refWorkspaceForMask is None or AnalysisDataService.doesExist(pt_ws_name) is False:
+                    self._refWorkspaceForMask = pt_ws_name
+            except RuntimeError as run_err:
+                return False, str(run_err)
+            # END-IF-ELSE
+
+            # Add data storage
+            assert AnalysisDataService.doesExist(pt_ws_name), 'Unable to locate workspace {0}.'.format(pt_ws_name)
+            raw_matrix_ws = AnalysisDataService.retrieve(pt_ws_name)
+            self._add_raw_workspace(exp_no, scan_no, pt_no, raw_matrix_ws)
+        # END-IF
+
+        return True, pt_ws_name
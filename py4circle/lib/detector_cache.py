@@ -0,0 +1,168 @@
+from __future__ import (absolute_import, division, print_function)
+from collections import OrderedDict
+import threading
+import six
+import numpy
+
+
+# default memory budget for cached detector counts: 2 GB
+DEFAULT_CACHE_SIZE = 2 * 1024 ** 3
+
+
+class DetectorCountsCache(object):
+    """
+    Least-recently-used cache of detector counts matrices keyed by (exp number, scan number, pt number)
+    with a memory budget in bytes.  It is safe to be accessed from the GUI and background loading threads.
+    """
+    def __init__(self, max_bytes=DEFAULT_CACHE_SIZE):
+        """
+        initialization
+        :param max_bytes: memory budget in bytes.  None for unlimited
+        """
+        assert max_bytes is None or (isinstance(max_bytes, six.integer_types) and max_bytes > 0), \
+            'Cache size {0} must be None or a positive integer but not a {1}'.format(max_bytes, type(max_bytes))
+
+        self._maxBytes = max_bytes
+        self._numBytes = 0
+
+        # (exp, scan, pt) -> count matrix, ordered from least to most recently used
+        self._matrixDict = OrderedDict()
+        self._lock = threading.RLock()
+
+        # statistics
+        self._numHits = 0
+        self._numMisses = 0
+        self._numEvictions = 0
+
+        return
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._matrixDict
+
+    def __len__(self):
+        with self._lock:
+            return len(self._matrixDict)
+
+    def __getitem__(self, key):
+        """
+        get a counts matrix and mark it as most recently used
+        :param key: (exp, scan, pt)
+        :return:
+        """
+        with self._lock:
+            try:
+                count_matrix = self._matrixDict.pop(key)
+            except KeyError:
+                self._numMisses += 1
+                raise
+            self._matrixDict[key] = count_matrix
+            self._numHits += 1
+
+        return count_matrix
+
+    def __setitem__(self, key, count_matrix):
+        """
+        add a counts matrix and evict the least recently used ones if the budget is exceeded
+        :param key: (exp, scan, pt)
+        :param count_matrix:
+        :return:
+        """
+        assert isinstance(count_matrix, numpy.ndarray), 'Count matrix must be a numpy ndarray but not a {0}' \
+                                                        ''.format(type(count_matrix))
+        with self._lock:
+            if key in self._matrixDict:
+                self._remove(key)
+
+            self._matrixDict[key] = count_matrix
+            self._numBytes += count_matrix.nbytes
+
+            self._shrink()
+
+        return
+
+    def _remove(self, key):
+        """
+        remove one entry
+        :param key:
+        :return:
+        """
+        count_matrix = self._matrixDict.pop(key)
+        self._numBytes -= count_matrix.nbytes
+
+        return
+
+    def _shrink(self):
+        """
+        evict the least recently used matrices until the memory budget is met, but always keep the newest one
+        :return:
+        """
+        while self._maxBytes is not None and self._numBytes > self._maxBytes and len(self._matrixDict) > 1:
+            oldest_key = next(iter(self._matrixDict))
+            self._remove(oldest_key)
+            self._numEvictions += 1
+
+        return
+
+    def clear(self):
+        """
+        remove all the cached matrices
+        :return:
+        """
+        with self._lock:
+            self._matrixDict.clear()
+            self._numBytes = 0
+
+        return
+
+    def evict_scan(self, exp_number, scan_number):
+        """
+        remove all the cached Pts. of a scan
+        :param exp_number:
+        :param scan_number:
+        :return: number of evicted Pts.
+        """
+        with self._lock:
+            key_list = [key for key in self._matrixDict if key[0] == exp_number and key[1] == scan_number]
+            for key in key_list:
+                self._remove(key)
+            self._numEvictions += len(key_list)
+
+        return len(key_list)
+
+    def get_statistics(self):
+        """
+        get the cache statistics
+        :return: dictionary
+        """
+        with self._lock:
+            stat_dict = {'hits': self._numHits,
+                         'misses': self._numMisses,
+                         'evictions': self._numEvictions,
+                         'entries': len(self._matrixDict),
+                         'bytes': self._numBytes,
+                         'max bytes': self._maxBytes}
+
+        return stat_dict
+
+    def set_max_bytes(self, max_bytes):
+        """
+        set the memory budget and evict if necessary
+        :param max_bytes: memory budget in bytes.  None for unlimited
+        :return:
+        """
+        assert max_bytes is None or (isinstance(max_bytes, six.integer_types) and max_bytes > 0), \
+            'Cache size {0} must be None or a positive integer but not a {1}'.format(max_bytes, type(max_bytes))
+        with self._lock:
+            self._maxBytes = max_bytes
+            self._shrink()
+
+        return
+
+    @property
+    def max_bytes(self):
+        return self._maxBytes
+
+    @property
+    def size_bytes(self):
+        return self._numBytes
@@ -0,0 +1,32 @@
+"""
+Conversion of the detector counts in a Mantid MatrixWorkspace (one spectrum per pixel, as loaded by
+LoadSpiceXML2DDet) to a 2D numpy array
+"""
+from __future__ import (absolute_import, division, print_function)
+from math import sqrt
+import numpy
+
+
+def get_square_detector_size(num_pixels):
+    """ Get the number of pixels on each side of a square detector
+    :param num_pixels: total number of pixels
+    :return:
+    """
+    det_size = int(round(sqrt(num_pixels)))
+    if det_size * det_size != num_pixels:
+        raise RuntimeError('Number of pixels {0} does not match a square detector'.format(num_pixels))
+
+    return det_size
+
+
+def extract_detector_counts(matrix_ws):
+    """ Get the counts of all pixels with one bulk call of extractY().  Pixel (row i, column j) of the detector
+    is spectrum j * size + i, such that the counts are reshaped, transposed and flipped (to look at the detector
+    from sample) as views without copying.
+    :param matrix_ws: MatrixWorkspace with one single-bin spectrum per pixel
+    :return: 2D numpy array (a view)
+    """
+    y_values = matrix_ws.extractY()[:, 0]
+    det_size = get_square_detector_size(y_values.shape[0])
+
+    return numpy.flipud(y_values.reshape(det_size, det_size).T)
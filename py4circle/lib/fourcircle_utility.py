@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, print_function)
 from six.moves import range
 import csv
 import os
+import sys
 try:
     # python3
     from urllib.request import urlopen
@@ -11,15 +12,37 @@ except ImportError:
     from urllib2 import urlopen
     from urllib2 import URLError
 import socket
+import tempfile
 import numpy
-import math
-
-from mantid.api import AnalysisDataService
 
 __author__ = 'wzz'
 
 
 NUM_DET_ROW = 256
+# Mantid installation to search if mantid is not in python path
+MANTID_NIGHTLY_BIN = '/opt/mantidnightly/bin/'
+# size of the blocks of MD event file parsed at a time
+MD_DATA_CHUNK_BYTES = 32 * 1024 * 1024
+# binary cache of MD events: records of (x, y, z, intensity) as little-endian float64
+MD_CACHE_DTYPE = numpy.dtype('<f8')
+# tokens checked in each line of MD events
+MD_VALUE_START, MD_COMMA, MD_LINE_FEED = 1, 2, 3
+
+
+def import_mantid():
+    """ Import Mantid, which takes seconds, on the first call such that it is only imported by the methods
+    using Mantid algorithms or workspaces
+    :return: 2-tuple as (mantid.simpleapi module, AnalysisDataService)
+    """
+    try:
+        import mantid.simpleapi as mantidsimple
+    except ImportError:
+        if MANTID_NIGHTLY_BIN not in sys.path:
+            sys.path.append(MANTID_NIGHTLY_BIN)
+        import mantid.simpleapi as mantidsimple
+    from mantid.api import AnalysisDataService
+
+    return mantidsimple, AnalysisDataService
 
 
 def check_url(url, read_lines=False):
@@ -648,6 +671,7 @@ def get_wave_length(spice_table_name):
     """
     # check
     assert isinstance(spice_table_name, str), 'Input SPICE table workspace name must be a string.'
+    mantidsimple, AnalysisDataService = import_mantid()
     assert AnalysisDataService.doesExist(spice_table_name)
 
     spice_table_ws = AnalysisDataService.retrieve(spice_table_name)
@@ -663,39 +687,179 @@ def get_wave_length(spice_table_name):
     return wave_length
 
 
-def load_hb3a_md_data(file_name):
-    """ Load an ASCii file containing MDEvents and generated by mantid algorithm ConvertCWSDMDtoHKL()
+def _check_md_data_lines(data_block, num_columns):
+    """ Check that each line of a block of MD events is either blank or has exactly num_columns values separated
+    by num_columns - 1 commas, such that a line with a missing or an extra value cannot shift the columns
+    :param data_block: bytes
+    :param num_columns: number of comma separated values in each line
+    :return: number of events (non-blank lines)
+    """
+    block_bytes = numpy.frombuffer(data_block, dtype='uint8')
+
+    comma_mask = block_bytes == ord(',')
+    line_feed_mask = block_bytes == ord('\n')
+
+    # a value starts at a non-separator byte (white space or comma) after a separator byte or at the beginning
+    separator_mask = (block_bytes <= ord(' ')) | comma_mask
+    value_start_mask = ~separator_mask
+    value_start_mask[1:] &= separator_mask[:-1]
+
+    # sequence of tokens in the block with the blank lines removed
+    token_vec = value_start_mask.view('uint8') * numpy.uint8(MD_VALUE_START) + \
+        comma_mask.view('uint8') * numpy.uint8(MD_COMMA) + line_feed_mask.view('uint8') * numpy.uint8(MD_LINE_FEED)
+    token_vec = token_vec[value_start_mask | comma_mask | line_feed_mask]
+    if token_vec.shape[0] == 0 or token_vec[-1] != MD_LINE_FEED:
+        token_vec = numpy.append(token_vec, numpy.array([MD_LINE_FEED], dtype='uint8'))
+    blank_line_mask = token_vec == MD_LINE_FEED
+    blank_line_mask[1:] &= token_vec[:-1] == MD_LINE_FEED
+    token_vec = token_vec[~blank_line_mask]
+
+    # each event is: value, comma, value, comma, ..., value, line feed
+    line_tokens = numpy.tile(numpy.array([MD_VALUE_START, MD_COMMA], dtype='uint8'), num_columns)
+    line_tokens[-1] = MD_LINE_FEED
+    num_events = token_vec.shape[0] // line_tokens.shape[0]
+    good_line_vec = numpy.all(token_vec[:num_events * line_tokens.shape[0]].reshape((num_events, line_tokens.shape[0])) ==
+                              line_tokens, axis=1)
+    if not good_line_vec.all() or token_vec.shape[0] % line_tokens.shape[0] != 0:
+        # lines after the first bad line are not aligned anymore
+        bad_line_index = numpy.nonzero(~good_line_vec)[0][0] if not good_line_vec.all() else num_events
+        bad_line = [line for line in data_block.split(b'\n') if len(line.strip()) > 0][bad_line_index].strip()
+        raise RuntimeError('MD event line "{0}" is not {1} comma separated numbers'
+                           ''.format(bad_line.decode('ascii', 'replace'), num_columns))
+
+    return num_events
+
+
+def _parse_md_data_block(data_block, num_columns):
+    """ Parse a block of complete lines of MD events as "x, y, z, intensity[, ...]".  Blank lines are skipped.
+    :param data_block: bytes
+    :param num_columns: number of comma separated values in each line
+    :return: (number of events, 4) float64 array
+    """
+    if len(data_block.strip()) == 0:
+        # numpy.fromstring() does not return an empty array from blanks
+        return numpy.zeros((0, 4))
+
+    num_events = _check_md_data_lines(data_block, num_columns)
+    try:
+        values = numpy.fromstring(data_block.replace(b',', b' '), dtype='float64', sep=' ')
+    except ValueError as value_err:
+        # newer numpy raises on a bad value instead of stopping at it
+        raise RuntimeError('MD event data contain value(s) that are not numbers: {0}'.format(value_err))
+
+    # older numpy stops at a bad value
+    if values.shape[0] != num_events * num_columns:
+        raise RuntimeError('MD event data contain value(s) that are not numbers')
+
+    return values.reshape((num_events, num_columns))[:, :4]
+
+
+def load_hb3a_md_data(file_name, cache_file_name=None, chunk_bytes=MD_DATA_CHUNK_BYTES):
+    """ Load an ASCii file containing MDEvents and generated by mantid algorithm ConvertCWSDMDtoHKL().
+    The file is parsed in blocks of chunk_bytes such that it is never held in memory as a whole.
+    If a cache file is given, the events are written to it as binary and returned as memory-mapped arrays.
+    The cache is used instead of the ASCii file as long as it is newer than the ASCii file.
     :param file_name:
-    :return:
+    :param cache_file_name: binary cache of the events.  None for loading to memory without cache
+    :param chunk_bytes: number of bytes to parse at a time
+    :return: 2-tuple as (xyz_points as (n, 3) array, intensities as (n, ) array)
     """
     # check
-    assert isinstance(file_name, str) and os.path.exists(file_name)
-
-    # parse
-    data_file = open(file_name, 'r')
-    raw_lines = data_file.readlines()
-    data_file.close()
-
-    # construct ND data array
-    xyz_points = numpy.zeros((len(raw_lines), 3))
-    intensities = numpy.zeros((len(raw_lines), ))
-
-    # parse
-    for i in range(len(raw_lines)):
-        line = raw_lines[i].strip()
-
-        # skip empty line
-        if len(line) == 0:
-            continue
-
-        # set value
-        terms = line.split(',')
-        for j in range(3):
-            xyz_points[i][j] = float(terms[j])
-        intensities[i] = float(terms[3])
-    # END-FOR
+    assert isinstance(file_name, str) and os.path.exists(file_name), 'MD data file {0} does not exist.' \
+                                                                     ''.format(file_name)
+    assert isinstance(chunk_bytes, int) and chunk_bytes > 0, 'Chunk size {0} must be a positive integer.' \
+                                                             ''.format(chunk_bytes)
+
+    # use the cache if it is up to date
+    if cache_file_name is not None and os.path.exists(cache_file_name) \
+            and os.path.getmtime(cache_file_name) >= os.path.getmtime(file_name) \
+            and os.path.getsize(cache_file_name) % (4 * MD_CACHE_DTYPE.itemsize) == 0:
+        return load_hb3a_md_cache(cache_file_name)
+
+    # parse blocks of complete lines.  the incomplete last line of a block is parsed with the next block
+    block_list = list()
+    cache_file = None
+    temp_cache_name = None
+    if cache_file_name is not None:
+        # the cache is written to a temporary file, which replaces the cache only after the whole file is parsed
+        cache_fd, temp_cache_name = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(cache_file_name) + '.',
+                                                     dir=os.path.dirname(os.path.abspath(cache_file_name)))
+        cache_file = os.fdopen(cache_fd, 'wb')
+    num_columns = None
+    remainder = b''
+    try:
+        with open(file_name, 'rb') as data_file:
+            while True:
+                raw_bytes = data_file.read(chunk_bytes)
+                if len(raw_bytes) == 0:
+                    data_block = remainder
+                    remainder = b''
+                else:
+                    last_line_end = raw_bytes.rfind(b'\n')
+                    if last_line_end < 0:
+                        remainder += raw_bytes
+                        continue
+                    data_block = remainder + raw_bytes[:last_line_end + 1]
+                    remainder = raw_bytes[last_line_end + 1:]
+                # END-IF-ELSE
+
+                if num_columns is None and len(data_block.strip()) > 0:
+                    # number of columns is set by the first event
+                    num_columns = data_block.strip().split(b'\n', 1)[0].count(b',') + 1
+                    if num_columns < 4:
+                        raise RuntimeError('{0} columns are given but not x, y, z and intensity'
+                                           ''.format(num_columns))
+                if num_columns is not None:
+                    event_block = _parse_md_data_block(data_block, num_columns)
+                    if cache_file is None:
+                        block_list.append(event_block)
+                    else:
+                        numpy.ascontiguousarray(event_block, dtype=MD_CACHE_DTYPE).tofile(cache_file)
+                # END-IF
+
+                if len(raw_bytes) == 0:
+                    break
+            # END-WHILE
+        # END-WITH
+
+        if cache_file is not None:
+            cache_file.close()
+            # os.rename() of python 2 replaces an existing file on POSIX only
+            getattr(os, 'replace', os.rename)(temp_cache_name, cache_file_name)
+            temp_cache_name = None
+    except RuntimeError as parse_err:
+        raise RuntimeError('Unable to parse MD data file {0}: {1}'.format(file_name, parse_err))
+    finally:
+        # incomplete cache due to any error or interruption
+        if temp_cache_name is not None:
+            cache_file.close()
+            os.remove(temp_cache_name)
+
+    if cache_file is not None:
+        return load_hb3a_md_cache(cache_file_name)
+
+    if len(block_list) == 0:
+        event_array = numpy.zeros((0, 4))
+    else:
+        event_array = numpy.concatenate(block_list)
+
+    return numpy.ascontiguousarray(event_array[:, :3]), numpy.ascontiguousarray(event_array[:, 3])
+
+
+def load_hb3a_md_cache(cache_file_name):
+    """ Map the binary cache of MD events written by load_hb3a_md_data() to memory.  The cache is read only.
+    :param cache_file_name:
+    :return: 2-tuple as (xyz_points as (n, 3) memory-mapped array, intensities as (n, ) memory-mapped array)
+    """
+    assert isinstance(cache_file_name, str) and os.path.exists(cache_file_name), \
+        'MD cache file {0} does not exist.'.format(cache_file_name)
 
-    return xyz_points, intensities
+    if os.path.getsize(cache_file_name) == 0:
+        # an empty file cannot be mapped
+        return numpy.zeros((0, 3)), numpy.zeros((0, ))
+    event_array = numpy.memmap(cache_file_name, dtype=MD_CACHE_DTYPE, mode='r').reshape((-1, 4))
+
+    return event_array[:, :3], event_array[:, 3]
 
 
 def round_hkl_1(hkl):
@@ -713,17 +877,24 @@ def round_hkl_1(hkl):
 
 def round_hkl(index_h, index_k, index_l):
     """
-
+    Round HKL to the nearest integers (half away from zero)
     :param index_h:
     :param index_k:
     :param index_l:
     :return:
     """
-    index_h = math.copysign(1, index_h) * int(abs(index_h) + 0.5)
-    index_k = math.copysign(1, index_k) * int(abs(index_k) + 0.5)
-    index_l = math.copysign(1, index_l) * int(abs(index_l) + 0.5)
+    return tuple(round_hkl_array([index_h, index_k, index_l]).tolist())
+
+
+def round_hkl_array(hkl_array):
+    """
+    Round any number of Miller indexes to the nearest integers (half away from zero)
+    :param hkl_array: array of indexes such as (n, 3) HKLs
+    :return: float array of the same shape
+    """
+    hkl_array = numpy.asarray(hkl_array, dtype='float64')
 
-    return index_h, index_k, index_l
+    return numpy.copysign(numpy.floor(numpy.abs(hkl_array) + 0.5), hkl_array)
 
 
 def round_miller_index(value, tol):
@@ -733,12 +904,22 @@ def round_miller_index(value, tol):
     :param tol:
     :return:
     """
-    round_int = math.copysign(1, value) * int(abs(value) + 0.5)
-    if abs(round_int - value) >= tol:
-        # it is likely a magnetic peak
-        round_int = int(value * 100) * 0.01
+    return float(round_miller_index_array(value, tol))
+
+
+def round_miller_index_array(index_array, tol):
+    """
+    round peak indexes with some tolerance.  An index that is not within tol to an integer is likely of a magnetic
+    peak, and it is truncated to 0.01 instead
+    :param index_array: array of indexes of any shape
+    :param tol:
+    :return: float array of the same shape
+    """
+    index_array = numpy.asarray(index_array, dtype='float64')
+    round_array = round_hkl_array(index_array)
 
-    return round_int
+    return numpy.where(numpy.abs(round_array - index_array) >= tol, numpy.trunc(index_array * 100) * 0.01,
+                       round_array)
 
 
 def convert_hkl_to_integer(index_h, index_k, index_l, magnetic_tolerance=0.2):
@@ -751,19 +932,28 @@ def convert_hkl_to_integer(index_h, index_k, index_l, magnetic_tolerance=0.2):
     :param magnetic_tolerance: tolerance to magnetic peak's indexing
     :return:
     """
+    hkl_array, error_array = convert_hkl_array_to_integer([index_h, index_k, index_l], magnetic_tolerance)
+
+    return tuple(hkl_array.tolist()), float(error_array)
+
+
+def convert_hkl_array_to_integer(hkl_array, magnetic_tolerance=0.2):
+    """
+    Convert HKLs to integers by considering magnetic peaks, as convert_hkl_to_integer() does for one peak
+    :param hkl_array: (n, 3) array of HKLs (or one HKL)
+    :param magnetic_tolerance: tolerance to magnetic peak's indexing
+    :return: 2-tuple as ((n, 3) array of rounded HKLs, (n, ) array of rounding errors)
+    """
     # check inputs' validity
     assert isinstance(magnetic_tolerance, float) and 0. < magnetic_tolerance <= 0.5
+    hkl_array = numpy.asarray(hkl_array, dtype='float64')
+    assert hkl_array.shape[-1] == 3, 'HKL must be given as an (n, 3) array but not of shape {0}' \
+                                     ''.format(hkl_array.shape)
 
-    #
-    index_h_r = round_miller_index(index_h, magnetic_tolerance)
-    index_k_r = round_miller_index(index_k, magnetic_tolerance)
-    index_l_r = round_miller_index(index_l, magnetic_tolerance)
+    round_array = round_miller_index_array(hkl_array, magnetic_tolerance)
+    round_error = numpy.sqrt(numpy.sum((hkl_array - round_array) ** 2, axis=-1))
 
-    round_error = math.sqrt((index_h - index_h_r) ** 2 +
-                            (index_k - index_k_r) ** 2 +
-                            (index_l - index_l_r) ** 2)
-
-    return (index_h_r, index_k_r, index_l_r), round_error
+    return round_array, round_error
 
 
 def is_peak_nuclear(index_h, index_k, index_l, magnetic_tolerance=0.2):
@@ -775,19 +965,21 @@ def is_peak_nuclear(index_h, index_k, index_l, magnetic_tolerance=0.2):
     :param magnetic_tolerance:
     :return:
     """
-    round_h = math.copysign(1, index_h) * int(abs(index_h) + 0.5)
-    if abs(round_h - index_h) >= magnetic_tolerance:
-        return False
+    return bool(is_peak_nuclear_array([index_h, index_k, index_l], magnetic_tolerance))
 
-    round_k = math.copysign(1, index_k) * int(abs(index_k) + 0.5)
-    if abs(round_k - index_k) >= magnetic_tolerance:
-        return False
 
-    round_l = math.copysign(1, index_l) * int(abs(index_l) + 0.5)
-    if abs(round_l - index_l) >= magnetic_tolerance:
-        return False
+def is_peak_nuclear_array(hkl_array, magnetic_tolerance=0.2):
+    """
+    Classify peaks as nuclear (all of H, K and L are close enough to integers) or magnetic
+    :param hkl_array: (n, 3) array of HKLs (or one HKL)
+    :param magnetic_tolerance:
+    :return: (n, ) bool array, True for nuclear peaks
+    """
+    hkl_array = numpy.asarray(hkl_array, dtype='float64')
+    assert hkl_array.shape[-1] == 3, 'HKL must be given as an (n, 3) array but not of shape {0}' \
+                                     ''.format(hkl_array.shape)
 
-    return True
+    return numpy.all(numpy.abs(round_hkl_array(hkl_array) - hkl_array) < magnetic_tolerance, axis=-1)
 
 
 def write_pre_process_record(file_name, record_dict):
@@ -926,3 +1118,4 @@ def read_pre_process_record(file_name):
     # END-WITH
 
     return scan_record_dict
+
@@ -0,0 +1,252 @@
+from __future__ import (absolute_import, division, print_function)
+import json
+import os
+import numpy
+from numpy.lib.format import open_memmap
+from py4circle.lib import parse_spice_xml
+
+
+# data type of the detector counts of a new stacked file, which is widened once a Pt. has larger counts
+DEFAULT_FRAME_DTYPE = parse_spice_xml.COMPACT_DTYPES[0]
+# number of Pt. slots allocated to a new scan if the number of Pts. is not known
+DEFAULT_CAPACITY = 16
+
+
+def get_frame_store_names(cache_dir, exp_number, scan_number):
+    """ Form the names of the stacked detector counts file and its index file for a scan
+    :param cache_dir:
+    :param exp_number:
+    :param scan_number:
+    :return: 2-tuple as (.npy file name, .json file name)
+    """
+    base_name = os.path.join(cache_dir, 'HB3A_exp{0}_scan{1:04}_frames'.format(exp_number, scan_number))
+
+    return base_name + '.npy', base_name + '.json'
+
+
+def get_file_signature(file_name):
+    """ Get the signature of a file to tell whether a cached copy is still valid
+    :param file_name:
+    :return: 2-tuple as (modification time, size)
+    """
+    file_stat = os.stat(file_name)
+
+    return file_stat.st_mtime, file_stat.st_size
+
+
+class ScanFrameStore(object):
+    """
+    Persistent binary cache of the detector counts of all Pts. in a scan.  The counts are stacked into one
+    (n_pt, rows, cols) array saved as a .npy file, which is memory-mapped such that only the Pts. that
+    are accessed are paged in.  Counts are stored in the narrowest unsigned integer type holding all the Pts.
+    of the scan.  A JSON index maps each Pt. to its slot and the signature (modification time
+    and size) of the SPICE XML file that it is parsed from.
+    """
+    def __init__(self, cache_dir, exp_number, scan_number):
+        """
+        initialization
+        :param cache_dir:
+        :param exp_number:
+        :param scan_number:
+        """
+        assert isinstance(cache_dir, str), 'Cache directory {0} must be a string but not a {1}' \
+                                           ''.format(cache_dir, type(cache_dir))
+
+        self._cacheDir = cache_dir
+        self._frameFileName, self._indexFileName = get_frame_store_names(cache_dir, exp_number, scan_number)
+
+        # memory-mapped (n_pt, rows, cols) array
+        self._frames = None
+        # pt number -> slot for Pts. either stored or reserved to store
+        self._slotDict = dict()
+        # pt number -> (mtime, size) for stored Pts.
+        self._signatureDict = dict()
+
+        self._open()
+
+        return
+
+    def _open(self):
+        """
+        open the existing stacked file and its index if they are consistent
+        :return:
+        """
+        if not (os.path.exists(self._frameFileName) and os.path.exists(self._indexFileName)):
+            return
+
+        try:
+            with open(self._indexFileName, 'r') as index_file:
+                index_dict = json.load(index_file)
+            frames = numpy.load(self._frameFileName, mmap_mode='r+')
+        except (IOError, OSError, ValueError) as load_err:
+            print('[WARNING] Unable to open detector counts cache {0} due to {1}'
+                  ''.format(self._frameFileName, load_err))
+            return
+
+        self._frames = frames
+        for pt_str, (slot, mtime, size) in index_dict['pts'].items():
+            if slot < frames.shape[0]:
+                self._slotDict[int(pt_str)] = slot
+                self._signatureDict[int(pt_str)] = mtime, size
+        # END-FOR
+
+        return
+
+    def _create_frame_file(self, capacity, frame_shape, old_frames, dtype):
+        """
+        create (or replace) the stacked file
+        :param capacity:
+        :param frame_shape:
+        :param old_frames: frames to copy to the new file or None
+        :param dtype: data type of the counts
+        :return: memory-mapped array
+        """
+        if os.path.exists(self._cacheDir) is False:
+            os.makedirs(self._cacheDir)
+
+        temp_file_name = self._frameFileName + '.tmp'
+        frames = open_memmap(temp_file_name, mode='w+', dtype=dtype,
+                             shape=(capacity, frame_shape[0], frame_shape[1]))
+        if old_frames is not None:
+            frames[:old_frames.shape[0]] = old_frames
+        frames.flush()
+        del frames
+
+        if os.path.exists(self._frameFileName):
+            os.remove(self._frameFileName)
+        os.rename(temp_file_name, self._frameFileName)
+
+        return numpy.load(self._frameFileName, mmap_mode='r+')
+
+    def _write_index(self):
+        """
+        write the Pt. index of the stored Pts. to the JSON file
+        :return:
+        """
+        index_dict = {'pts': dict([(str(pt), [self._slotDict[pt], mtime, size])
+                                   for pt, (mtime, size) in self._signatureDict.items()])}
+        with open(self._indexFileName, 'w') as index_file:
+            json.dump(index_dict, index_file)
+
+        return
+
+    def commit_frames(self, signature_dict):
+        """
+        register the Pts. whose counts have been written to their reserved slots
+        :param signature_dict: dictionary: pt number -> (mtime, size) of the SPICE XML file
+        :return:
+        """
+        self._frames.flush()
+        for pt_number in signature_dict:
+            assert pt_number in self._slotDict, 'Pt {0} has no reserved slot'.format(pt_number)
+            self._signatureDict[pt_number] = tuple(signature_dict[pt_number])
+        self._write_index()
+
+        return
+
+    def get_frame(self, pt_number, signature):
+        """
+        get the cached counts of a Pt. if the SPICE XML file is not changed since it was cached
+        :param pt_number:
+        :param signature: (mtime, size) of the SPICE XML file
+        :return: read-only memory-mapped 2D array or None
+        """
+        if self._signatureDict.get(pt_number, None) != tuple(signature):
+            return None
+
+        frame = self._frames[self._slotDict[pt_number]]
+        frame.flags.writeable = False
+
+        return frame
+
+    def put_frame(self, pt_number, signature, count_matrix, capacity=DEFAULT_CAPACITY):
+        """
+        store the counts of a Pt.
+        :param pt_number:
+        :param signature: (mtime, size) of the SPICE XML file
+        :param count_matrix: 2D array of non-negative integer counts
+        :param capacity: expected number of Pts. in the scan, used if the stacked file is to be created
+        :return: read-only memory-mapped 2D array
+        """
+        slot = self.reserve_slots([pt_number], count_matrix.shape, capacity,
+                                  dtype=parse_spice_xml.get_compact_dtype(count_matrix.max()))[pt_number]
+        self._frames[slot] = count_matrix
+        self.commit_frames({pt_number: signature})
+
+        return self.get_frame(pt_number, signature)
+
+    def reserve_slots(self, pt_number_list, frame_shape, capacity=DEFAULT_CAPACITY, dtype=None):
+        """
+        reserve the slots for a list of Pts. and grow the stacked file if it is full or has a different frame shape,
+        or widen it if its data type is narrower than the given one.
+        The counts shall then be written to the slots of the file (possibly by other processes) and be committed.
+        :param pt_number_list:
+        :param frame_shape:
+        :param capacity: expected number of Pts. in the scan, used if the stacked file is to be created
+        :param dtype: data type required by the counts to write.  None for the default
+        :return: dictionary: pt number -> slot
+        """
+        if dtype is None:
+            dtype = DEFAULT_FRAME_DTYPE
+
+        if self._frames is not None and self._frames.shape[1:] != tuple(frame_shape):
+            # detector is changed: start over
+            self._frames = None
+            self._slotDict = dict()
+            self._signatureDict = dict()
+
+        # assign new slots after the last used one.  a reserved Pt. is invalid until it is committed
+        num_used = max(self._slotDict.values()) + 1 if len(self._slotDict) > 0 else 0
+        for pt_number in pt_number_list:
+            self._signatureDict.pop(pt_number, None)
+            if pt_number not in self._slotDict:
+                self._slotDict[pt_number] = num_used
+                num_used += 1
+        # END-FOR
+
+        if self._frames is None:
+            self._frames = self._create_frame_file(max(capacity, num_used, DEFAULT_CAPACITY), frame_shape, None,
+                                                   dtype)
+        elif num_used > self._frames.shape[0] or not numpy.can_cast(dtype, self._frames.dtype):
+            self._frames = self._create_frame_file(max(capacity, num_used, 2 * self._frames.shape[0]), frame_shape,
+                                                   self._frames, numpy.promote_types(dtype, self._frames.dtype))
+
+        return dict([(pt_number, self._slotDict[pt_number]) for pt_number in pt_number_list])
+
+    @property
+    def dtype(self):
+        """ data type of the stored counts, or None if nothing is stored """
+        if self._frames is None:
+            return None
+        return self._frames.dtype
+
+    @property
+    def frame_file_name(self):
+        return self._frameFileName
+
+    @property
+    def pt_numbers(self):
+        return sorted(self._signatureDict.keys())
+
+
+def parse_xml_to_frame_file(task):
+    """ Parse a SPICE XML file and write the counts to a reserved slot of a stacked frame file.
+    It runs in a worker process such that only the slot and file signature are sent back.
+    The counts are not written if they do not fit the data type of the frame file, which shall then be widened
+    by the owner of the store.
+    :param task: 3-tuple as (XML file name, stacked frame file name, slot)
+    :return: 3-tuple as (slot, (mtime, size), whether the counts are written)
+    """
+    xml_file_name, frame_file_name, slot = task
+
+    signature = get_file_signature(xml_file_name)
+    count_matrix = parse_spice_xml.get_counts_xml_file(xml_file_name, dtype=parse_spice_xml.COMPACT_DTYPE)
+
+    frames = numpy.load(frame_file_name, mmap_mode='r+')
+    is_written = numpy.can_cast(count_matrix.dtype, frames.dtype)
+    if is_written:
+        frames[slot] = count_matrix
+        frames.flush()
+    del frames
+
+    return slot, signature, is_written
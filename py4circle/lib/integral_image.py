@@ -0,0 +1,74 @@
+"""
+Summed-area table (integral image) of detector counts such that the sum of counts in any rectangle
+is calculated from four look-ups
+"""
+from __future__ import (absolute_import, division, print_function)
+import numpy
+
+
+def build_integral_image(counts):
+    """ Build the zero-padded integral image of one detector frame (2D) or a stack of frames (3D)
+    such that integral[..., i, j] is the sum of counts[..., :i, :j]
+    :param counts: 2D or 3D numpy array
+    :return: numpy array with last two dimensions one larger than the input's
+    """
+    assert isinstance(counts, numpy.ndarray) and counts.ndim in (2, 3), \
+        'Counts must be a 2D or 3D numpy array but not a {0}'.format(type(counts))
+
+    if numpy.issubdtype(counts.dtype, numpy.integer):
+        sum_type = 'int64'
+    else:
+        sum_type = 'float64'
+
+    pad_shape = counts.shape[:-2] + (counts.shape[-2] + 1, counts.shape[-1] + 1)
+    integral = numpy.zeros(shape=pad_shape, dtype=sum_type)
+    numpy.cumsum(counts, axis=-2, dtype=sum_type, out=integral[..., 1:, 1:])
+    numpy.cumsum(integral[..., 1:, 1:], axis=-1, out=integral[..., 1:, 1:])
+
+    return integral
+
+
+def get_rectangle_corners(integral, min_row, min_col, max_row, max_col):
+    """ Convert a rectangle given as numpy slice boundaries [min_row:max_row, min_col:max_col] to the
+    indexes of the integral image, following the same rule of numpy slicing for negative or out-of-range values
+    :param integral:
+    :param min_row:
+    :param min_col:
+    :param max_row:
+    :param max_col:
+    :return: 4-tuple as (start row, start column, stop row, stop column)
+    """
+    num_rows = integral.shape[-2] - 1
+    num_cols = integral.shape[-1] - 1
+
+    start_row, stop_row = slice(min_row, max_row).indices(num_rows)[:2]
+    start_col, stop_col = slice(min_col, max_col).indices(num_cols)[:2]
+
+    return start_row, start_col, max(start_row, stop_row), max(start_col, stop_col)
+
+
+def sum_rectangle(integral, min_row, min_col, max_row, max_col):
+    """ Sum counts in rectangle [min_row:max_row, min_col:max_col] from an integral image
+    :param integral: integral image from build_integral_image()
+    :param min_row:
+    :param min_col:
+    :param max_row:
+    :param max_col:
+    :return: a scalar for a 2D integral image or a 1D array (one value per frame) for a 3D one
+    """
+    r0, c0, r1, c1 = get_rectangle_corners(integral, min_row, min_col, max_row, max_col)
+
+    return integral[..., r1, c1] - integral[..., r0, c1] - integral[..., r1, c0] + integral[..., r0, c0]
+
+
+def sum_rectangles(integral, range_list):
+    """ Sum counts in a list of rectangles from an integral image in one vectorized operation
+    :param integral: integral image from build_integral_image()
+    :param range_list: list of 4-tuples as (min_row, min_col, max_row, max_col)
+    :return: numpy array of shape (..., number of rectangles)
+    """
+    corners = numpy.array([get_rectangle_corners(integral, *roi_range) for roi_range in range_list],
+                          dtype='int64').reshape(-1, 4)
+    r0, c0, r1, c1 = corners[:, 0], corners[:, 1], corners[:, 2], corners[:, 3]
+
+    return integral[..., r1, c1] - integral[..., r0, c1] - integral[..., r1, c0] + integral[..., r0, c0]
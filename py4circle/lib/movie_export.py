@@ -0,0 +1,178 @@
+"""
+Export the detector counts of all the Pts. in a scan as a series of PNG images and optionally a movie.
+Frames are rendered off-screen with matplotlib's Agg canvas by a pool of worker processes, each of which creates
+one figure and AxesImage and only replaces the image data and title for each frame.  The movie is encoded from
+the PNG images by ffmpeg if it can be found.
+"""
+from __future__ import (absolute_import, division, print_function)
+import multiprocessing
+import os
+import subprocess
+try:
+    from shutil import which as find_executable
+except ImportError:
+    # python 2
+    from distutils.spawn import find_executable
+import numpy
+
+
+# encoder to make a movie (.mp4, .gif, ...) from the PNG images
+ENCODER_NAME = 'ffmpeg'
+DEFAULT_FRAME_RATE = 5
+DEFAULT_DPI = 100
+
+# per-process rendering state set up by _init_renderer()
+_rendererDict = dict()
+
+
+def find_encoder():
+    """ Find the movie encoder
+    :return: full path of ffmpeg or None if it is not installed
+    """
+    return find_executable(ENCODER_NAME)
+
+
+def get_frame_file_name(output_dir, name_prefix, frame_number):
+    """ Form the PNG file name of a frame
+    :param output_dir:
+    :param name_prefix:
+    :param frame_number: 1 for the first frame
+    :return:
+    """
+    return os.path.join(output_dir, '{0}_{1:04}.png'.format(name_prefix, frame_number))
+
+
+def _init_renderer(counts_cube, color_range, dpi):
+    """ Create the figure and image of a rendering process
+    :param counts_cube: (n_pt, rows, cols) array
+    :param color_range: (min, max) of the color scale shared by all frames
+    :param dpi:
+    :return:
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(dpi=dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+    num_rows, num_cols = counts_cube.shape[1:]
+    image = axes.imshow(counts_cube[0], extent=[0, num_rows, 0, num_cols], interpolation='none',
+                        vmin=color_range[0], vmax=color_range[1])
+    figure.colorbar(image)
+
+    _rendererDict['counts'] = counts_cube
+    _rendererDict['figure'] = figure
+    _rendererDict['axes'] = axes
+    _rendererDict['image'] = image
+
+    return
+
+
+def _render_frame(task):
+    """ Render one frame to a PNG file with the figure of this process
+    :param task: 3-tuple as (frame index, title, PNG file name)
+    :return: PNG file name
+    """
+    frame_index, title, png_file_name = task
+
+    _rendererDict['image'].set_data(_rendererDict['counts'][frame_index])
+    _rendererDict['axes'].set_title(title)
+    _rendererDict['figure'].savefig(png_file_name)
+
+    return png_file_name
+
+
+def encode_movie(output_dir, name_prefix, num_frames, movie_file_name, frame_rate=DEFAULT_FRAME_RATE):
+    """ Encode the PNG images of the frames to a movie by ffmpeg.  The container is decided by the extension
+    of the movie file name, such as .mp4 or .gif
+    :param output_dir:
+    :param name_prefix:
+    :param num_frames:
+    :param movie_file_name:
+    :param frame_rate: frames per second
+    :return:
+    """
+    encoder = find_encoder()
+    if encoder is None:
+        raise RuntimeError('Movie encoder {0} cannot be found.'.format(ENCODER_NAME))
+
+    command = [encoder, '-y', '-loglevel', 'error', '-framerate', str(frame_rate),
+               '-i', os.path.join(output_dir, name_prefix + '_%04d.png'), '-frames:v', str(num_frames)]
+    if movie_file_name.lower().endswith('.gif') is False:
+        # H.264 requires even image size
+        command.extend(['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p'])
+    command.append(movie_file_name)
+
+    try:
+        subprocess.check_call(command)
+    except (subprocess.CalledProcessError, OSError) as encode_err:
+        raise RuntimeError('Unable to encode movie {0} due to {1}'.format(movie_file_name, encode_err))
+
+    return
+
+
+def export_movie(counts_cube, title_list, output_dir, name_prefix, movie_file_name=None,
+                 frame_rate=DEFAULT_FRAME_RATE, workers=None, dpi=DEFAULT_DPI, progress_callback=None):
+    """ Render the frames of a scan to PNG images in parallel and encode them to a movie
+    :param counts_cube: (n_pt, rows, cols) array of detector counts
+    :param title_list: title of each frame
+    :param output_dir: directory for the PNG images
+    :param name_prefix: PNG images are named as prefix_0001.png, prefix_0002.png, ... in the order of frames
+    :param movie_file_name: movie file name (.mp4, .gif, ...).  None for PNG images only
+    :param frame_rate: frames per second
+    :param workers: number of worker processes.  None for the number of CPUs
+    :param dpi:
+    :param progress_callback: method called as (number of rendered frames, number of frames).  An exception raised
+                              by it stops the workers and is passed on.  None for no progress report
+    :return: 2-tuple as (list of PNG file names, movie file name or None)
+    """
+    # check inputs
+    assert isinstance(counts_cube, numpy.ndarray) and counts_cube.ndim == 3, \
+        'Counts must be given as a (n_pt, rows, cols) numpy array but not a {0}'.format(type(counts_cube))
+    assert len(title_list) == counts_cube.shape[0], 'Number of titles {0} and frames {1} do not match' \
+                                                    ''.format(len(title_list), counts_cube.shape[0])
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    assert isinstance(workers, int) and workers > 0, 'Number of workers {0} must be a positive integer.' \
+                                                     ''.format(workers)
+
+    if os.path.exists(output_dir) is False:
+        os.makedirs(output_dir)
+
+    num_frames = counts_cube.shape[0]
+    color_range = float(counts_cube.min()), float(max(counts_cube.max(), counts_cube.min() + 1))
+    task_list = [(frame_index, title_list[frame_index],
+                  get_frame_file_name(output_dir, name_prefix, frame_index + 1))
+                 for frame_index in range(num_frames)]
+
+    # render
+    png_file_list = list()
+    if workers > 1 and num_frames > 1:
+        worker_pool = multiprocessing.Pool(processes=min(workers, num_frames), initializer=_init_renderer,
+                                           initargs=(counts_cube, color_range, dpi))
+        try:
+            for png_file_name in worker_pool.imap(_render_frame, task_list):
+                png_file_list.append(png_file_name)
+                if progress_callback is not None:
+                    progress_callback(len(png_file_list), num_frames)
+        except BaseException:
+            worker_pool.terminate()
+            raise
+        else:
+            worker_pool.close()
+        finally:
+            worker_pool.join()
+    else:
+        _init_renderer(counts_cube, color_range, dpi)
+        for task in task_list:
+            png_file_list.append(_render_frame(task))
+            if progress_callback is not None:
+                progress_callback(len(png_file_list), num_frames)
+        _rendererDict.clear()
+    # END-IF-ELSE
+
+    # encode
+    if movie_file_name is not None:
+        encode_movie(output_dir, name_prefix, num_frames, movie_file_name, frame_rate)
+
+    return png_file_list, movie_file_name
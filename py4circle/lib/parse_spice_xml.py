@@ -8,16 +8,89 @@ import re
 from math import sqrt
 
 
-def get_counts_xml_file(xml_name):
+# tags enclosing the detector counts in a SPICE detector XML file
+DETECTOR_START_TAG = b'<Detector'
+DETECTOR_END_TAG = b'</Detector>'
+# unsigned integer types to hold detector counts, from the narrowest
+COMPACT_DTYPES = ('uint16', 'uint32')
+# data type option of get_counts_xml_file() for the narrowest unsigned integer type holding the counts
+COMPACT_DTYPE = 'compact'
+
+
+def get_compact_dtype(max_count):
+    """Get the narrowest unsigned integer type to hold detector counts
+    @param max_count: maximum count
+    @return: numpy dtype
+    """
+    for dtype_name in COMPACT_DTYPES:
+        if max_count <= numpy.iinfo(dtype_name).max:
+            return numpy.dtype(dtype_name)
+
+    raise RuntimeError('Count {0} exceeds the range of {1}'.format(max_count, COMPACT_DTYPES[-1]))
+
+
+def compact_counts(det_array):
+    """Convert non-negative integer counts to the narrowest unsigned integer type
+    @param det_array: numpy array of integer counts
+    @return:
+    """
+    if det_array.size == 0:
+        return det_array.astype(COMPACT_DTYPES[0])
+    if det_array.min() < 0:
+        raise RuntimeError('Detector counts shall not be negative')
+
+    return det_array.astype(get_compact_dtype(det_array.max()), copy=False)
+
+
+def get_counts_xml_file(xml_name, method='stream', dtype='float'):
     """Get detector counts from a SPICE XML file
     @param xml_name:
+    @param method: 'stream' to scan the raw bytes for the <Detector> payload; 'etree' to build the full XML tree
+    @param dtype: data type of the returned counts matrix, or 'compact' for the narrowest unsigned integer type
     @return:
     """
     # check input
-    assert isinstance(xml_name, str), 'TODO'
+    assert isinstance(xml_name, str), 'SPICE XML file name {0} must be a string but not a {1}' \
+                                      ''.format(xml_name, type(xml_name))
     if os.path.exists(xml_name) is False:
-        raise RuntimeError('TODO')
+        raise RuntimeError('SPICE XML file {0} does not exist.'.format(xml_name))
+
+    if dtype == COMPACT_DTYPE:
+        parse_dtype = 'int64'
+    else:
+        parse_dtype = dtype
 
+    if method == 'stream':
+        det_array = _parse_counts_stream(xml_name, parse_dtype)
+    elif method == 'etree':
+        det_array = _parse_counts_etree(xml_name).astype(parse_dtype)
+    else:
+        raise RuntimeError('XML parsing method {0} is not supported. Supported are stream and etree'
+                           ''.format(method))
+
+    if dtype == COMPACT_DTYPE:
+        det_array = compact_counts(det_array)
+
+    # get detector size and check
+    num_pts = det_array.shape[0]
+    det_size = int(sqrt(num_pts))
+    if det_size * det_size != num_pts:
+        raise RuntimeError('Detector size {0}**2 does not match number of counts {1}'.format(det_size, num_pts))
+
+    # 1D array to 2D array
+    det_matrix = det_array.reshape(det_size, det_size)
+
+    # transpose?
+    det_matrix = numpy.rot90(det_matrix, 1)
+
+    return det_matrix
+
+
+def _parse_counts_etree(xml_name):
+    """ Parse detector counts by building the complete ElementTree (the original implementation)
+    @param xml_name:
+    @return: 1D numpy array of counts
+    """
     # get root and 'Data' ndoe
     tree = ET.parse(xml_name)
     root = tree.getroot()
@@ -31,25 +104,53 @@ def get_counts_xml_file(xml_name):
     det = data_node.find('Detector')
     det_str = str(det.text).strip()
 
-    # split to 2D array
+    # split to 1D array and convert to float
     det_count_list = re.split('\t|\n', det_str)
-    num_pts = len(det_count_list)
-    # get detector size and check
-    det_size = int(sqrt(num_pts))
-    if det_size * det_size != num_pts:
-        raise RuntimeError('Detector size {0}**2 does not match number of counts {1}'.format(det_size, num_pts))
-
-    # list to 1D array and convert to float
-    # det_array = numpy.ndarray(shape=(num_pts,), dtype='int')
     det_array = numpy.array(det_count_list)
     det_array = det_array.astype('float')
-    # 1D array to 2D array
-    det_matrix = det_array.reshape(det_size, det_size)
 
-    # transpose?
-    det_matrix = numpy.rot90(det_matrix, 1)
+    return det_array
 
-    return det_matrix
+
+def _parse_counts_stream(xml_name, dtype):
+    """ Parse detector counts by seeking the <Detector> payload in the raw bytes and converting the
+    white-space separated counts directly into a numpy array without any intermediate string list
+    @param xml_name:
+    @param dtype:
+    @return: 1D numpy array of counts
+    """
+    with open(xml_name, 'rb') as xml_file:
+        raw_bytes = xml_file.read()
+
+    # locate the payload between <Detector ...> and </Detector>
+    start_index = raw_bytes.find(DETECTOR_START_TAG)
+    if start_index < 0:
+        raise RuntimeError('Unable to locate Detector node in SPICE XML file {0}'.format(xml_name))
+    start_index = raw_bytes.find(b'>', start_index) + 1
+    stop_index = raw_bytes.find(DETECTOR_END_TAG, start_index)
+    if start_index == 0 or stop_index < 0:
+        raise RuntimeError('Detector node in SPICE XML file {0} is not closed'.format(xml_name))
+
+    # numpy.fromstring() stops at a token that is not a number without raising (older numpy): count the tokens,
+    # i.e., non-white-space bytes following a white-space byte, to check that every token is parsed
+    payload = raw_bytes[start_index:stop_index]
+    non_space_mask = numpy.frombuffer(payload, dtype='uint8') > ord(' ')
+    num_tokens = numpy.count_nonzero(non_space_mask[1:] & ~non_space_mask[:-1]) + int(non_space_mask[:1].sum())
+    if num_tokens == 0:
+        # numpy.fromstring() does not return an empty array from blanks
+        return numpy.zeros((0, ), dtype=dtype)
+
+    try:
+        det_array = numpy.fromstring(payload, dtype=dtype, sep=' ')
+    except ValueError as value_err:
+        # newer numpy raises on a bad token
+        raise RuntimeError('Detector counts in SPICE XML file {0} are not all numbers: {1}'
+                           ''.format(xml_name, value_err))
+    if det_array.shape[0] != num_tokens:
+        raise RuntimeError('Detector counts in SPICE XML file {0} are not all numbers: only {1} out of {2} values '
+                           'are parsed'.format(xml_name, det_array.shape[0], num_tokens))
+
+    return det_array
 
 
 if __name__ == '__main__':
@@ -0,0 +1,133 @@
+"""
+Vectorized calculation of flipping ratios (polarization) from the integrated counts of a scan whose Pts. are
+measured as spin-up/spin-down pairs
+"""
+from __future__ import (absolute_import, division, print_function)
+import numpy
+
+
+# spin-up and spin-down Pts. of a pair must have the same HKL within this squared distance
+HKL_TOLERANCE = 0.25
+
+# one record per spin-up/spin-down pair
+POLARIZATION_DTYPE = numpy.dtype([('pt_up', 'i8'), ('pt_down', 'i8'), ('hkl', 'f8', (3,)), ('flip', 'f8'),
+                                  ('error', 'f8'), ('spin_up', 'f8'), ('spin_up_bkgd', 'f8'), ('spin_down', 'f8'),
+                                  ('spin_down_bkgd', 'f8')])
+
+
+def check_spin_pairs(pt_vec, hkl_matrix, hkl_tolerance=HKL_TOLERANCE):
+    """ Check that the spin-up (even index) and spin-down (odd index) Pts. of all pairs are measured at the same HKL
+    :param pt_vec: 1D array of Pt. numbers
+    :param hkl_matrix: (n_pt, 3) array of HKL of the Pts.
+    :param hkl_tolerance: maximum squared distance between the HKLs of a pair
+    :return: number of pairs
+    """
+    pt_vec = numpy.asarray(pt_vec)
+    hkl_matrix = numpy.asarray(hkl_matrix, dtype='float64')
+    assert hkl_matrix.shape == (pt_vec.shape[0], 3), 'HKL shape {0} does not match {1} Pts.' \
+                                                     ''.format(hkl_matrix.shape, pt_vec.shape[0])
+
+    num_pairs = pt_vec.shape[0] // 2
+    hkl_up = hkl_matrix[0:2 * num_pairs:2]
+    hkl_down = hkl_matrix[1:2 * num_pairs:2]
+    bad_pairs = numpy.where(numpy.sum((hkl_up - hkl_down) ** 2, axis=1) >= hkl_tolerance)[0]
+    if bad_pairs.shape[0] > 0:
+        pair_index = bad_pairs[0]
+        raise RuntimeError('For pt {} and {}, HKL {} and {} shall be same!'
+                           ''.format(pt_vec[2 * pair_index], pt_vec[2 * pair_index + 1], hkl_up[pair_index],
+                                     hkl_down[pair_index]))
+
+    return num_pairs
+
+
+def calculate_flipping_ratios(pt_vec, hkl_matrix, peak_count_vec, bkgd_count_vec1, bkgd_count_vec2):
+    """ Calculate flipping ratios and their errors of all spin-up/spin-down pairs.  Intensity is the peak counts
+    minus both background counts.  A trailing unpaired Pt. is ignored.
+    :param pt_vec: 1D array of Pt. numbers
+    :param hkl_matrix: (n_pt, 3) array of HKL of the Pts.
+    :param peak_count_vec: 1D array of counts in peak ROI
+    :param bkgd_count_vec1: 1D array of counts in first background ROI
+    :param bkgd_count_vec2: 1D array of counts in second background ROI
+    :return: structured array of POLARIZATION_DTYPE
+    """
+    num_pairs = check_spin_pairs(pt_vec, hkl_matrix)
+
+    return _calculate_flipping_ratios(num_pairs, numpy.asarray(pt_vec), numpy.asarray(hkl_matrix, dtype='float64'),
+                                      peak_count_vec, bkgd_count_vec1, bkgd_count_vec2)
+
+
+def calculate_flipping_ratios_models(pt_vec, hkl_matrix, peak_count_vec, bkgd_model_dict):
+    """ Calculate flipping ratios of all spin pairs with several background models at once
+    :param pt_vec: 1D array of Pt. numbers
+    :param hkl_matrix: (n_pt, 3) array of HKL of the Pts.
+    :param peak_count_vec: 1D array of counts in peak ROI
+    :param bkgd_model_dict: dictionary: model name -> (first background counts, second background counts)
+    :return: dictionary: model name -> structured array of POLARIZATION_DTYPE
+    """
+    assert isinstance(bkgd_model_dict, dict), 'Background models {0} must be given in a dictionary but not a {1}' \
+                                              ''.format(bkgd_model_dict, type(bkgd_model_dict))
+
+    num_pairs = check_spin_pairs(pt_vec, hkl_matrix)
+    pt_vec = numpy.asarray(pt_vec)
+    hkl_matrix = numpy.asarray(hkl_matrix, dtype='float64')
+
+    result_dict = dict()
+    for model_name, (bkgd_count_vec1, bkgd_count_vec2) in bkgd_model_dict.items():
+        result_dict[model_name] = _calculate_flipping_ratios(num_pairs, pt_vec, hkl_matrix, peak_count_vec,
+                                                             bkgd_count_vec1, bkgd_count_vec2)
+
+    return result_dict
+
+
+def _calculate_flipping_ratios(num_pairs, pt_vec, hkl_matrix, peak_count_vec, bkgd_count_vec1, bkgd_count_vec2):
+    """ Calculate flipping ratios of checked spin pairs
+    :param num_pairs:
+    :param pt_vec:
+    :param hkl_matrix:
+    :param peak_count_vec:
+    :param bkgd_count_vec1:
+    :param bkgd_count_vec2:
+    :return: structured array of POLARIZATION_DTYPE
+    """
+    # (num_pairs, 2) arrays with spin up in column 0 and spin down in column 1
+    roi = numpy.asarray(peak_count_vec, dtype='float64')[:2 * num_pairs].reshape(num_pairs, 2)
+    b1 = numpy.asarray(bkgd_count_vec1, dtype='float64')[:2 * num_pairs].reshape(num_pairs, 2)
+    b2 = numpy.asarray(bkgd_count_vec2, dtype='float64')[:2 * num_pairs].reshape(num_pairs, 2)
+
+    bkgd = b1 + b2
+    intensity = roi - bkgd
+    count_error = numpy.sqrt(roi ** 2 + b1 ** 2 + b2 ** 2)
+
+    pol_array = numpy.zeros(num_pairs, dtype=POLARIZATION_DTYPE)
+    pol_array['pt_up'] = pt_vec[0:2 * num_pairs:2]
+    pol_array['pt_down'] = pt_vec[1:2 * num_pairs:2]
+    pol_array['hkl'] = hkl_matrix[0:2 * num_pairs:2]
+    pol_array['spin_up'] = intensity[:, 0]
+    pol_array['spin_up_bkgd'] = bkgd[:, 0]
+    pol_array['spin_down'] = intensity[:, 1]
+    pol_array['spin_down_bkgd'] = bkgd[:, 1]
+
+    # zero spin-down intensity results in inf or nan instead of an exception
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        pol_array['flip'] = intensity[:, 0] / intensity[:, 1]
+        pol_array['error'] = pol_array['flip'] * numpy.sqrt(numpy.sum((count_error / (1 + intensity)) ** 2, axis=1))
+
+    return pol_array
+
+
+def get_single_spin_counts(pol_array):
+    """ Get the background-subtracted intensities in the order of Pts.: spin up and spin down of each pair
+    :param pol_array: structured array of POLARIZATION_DTYPE
+    :return: 1D array
+    """
+    return numpy.column_stack((pol_array['spin_up'], pol_array['spin_down'])).ravel()
+
+
+def to_polarization_list(pol_array):
+    """ Convert a structured polarization array to the list of tuples
+    (hkl, flip, error, spin up, spin up background, spin down, spin down background)
+    :param pol_array: structured array of POLARIZATION_DTYPE
+    :return: list of 7-tuples
+    """
+    return [(record['hkl'].copy(), record['flip'], record['error'], record['spin_up'], record['spin_up_bkgd'],
+             record['spin_down'], record['spin_down_bkgd']) for record in pol_array]
@@ -1,31 +1,39 @@
 import os
 import sys
-sys.path.append('/Users/wzz/MantidBuild/debug-stable/bin/')
-sys.path.append('/opt/mantidnightly/bin/')
-
+import multiprocessing
+import shutil
+import tempfile
+import threading
 import numpy
-import mantid
-import mantid.simpleapi as mantidsimple
-from mantid.api import AnalysisDataService
-try:
-    from mantidqtpython import MantidQt
-except ImportError as e:
-    NO_SCROLL = True
-else:
-    NO_SCROLL = False
 from fourcircle_utility import *
 import parse_spice_xml
+import detector_cache
+import frame_store
+import integral_image
+import polarization
+import spice_table
+import survey_index
+import detector_backend
+import movie_export
 
 
 MAX_SCAN_NUMBER = 100000
+# sub directory of the working directory for the binary cache of parsed detector counts
+FRAME_CACHE_DIR = 'frame_cache'
+# pt number in the key of the counts cache for the integral image of a scan, such that the integral images are
+# counted against the memory budget of the cache and evicted with the scan
+INTEGRAL_IMAGE_PT = 'integral'
 
 
 class FourCirclePolarizedNeutronProcessor(object):
     """
     """
-    def __init__(self):
+    def __init__(self, counts_cache=None, backend=detector_backend.BACKEND_NUMPY):
         """
         initialization
+        :param counts_cache: cache for detector counts matrices.  None for a default DetectorCountsCache
+        :param backend: backend holding the per-Pt. detector data and scan tables: 'numpy' (in memory) or 'mantid'
+                        (workspaces in AnalysisDataService)
         """
         self._instrumentName = 'HB3A'
         self._detectorSize = [256, 256]
@@ -36,69 +44,65 @@ class FourCirclePolarizedNeutronProcessor(object):
         self._workDir = None
 
         self._mySpiceTableDict = dict()
-        self._myRawDataWSDict = dict()
+        self._backend = detector_backend.create_backend(backend, self)
 
-        self._refWorkspaceForMask = None
         self._roiDict = dict()
 
-        # dictionary to hold loaded detector count matrix loaded from SPICE XML file
-        self._loadedData = dict()
+        # cache to hold detector count matrix loaded from SPICE XML file
+        if counts_cache is None:
+            counts_cache = detector_cache.DetectorCountsCache()
+        self._loadedData = counts_cache
+        # keep detector counts in the narrowest unsigned integer type instead of float
+        self._compactCounts = True
+
+        # binary on-disk cache of parsed detector counts: (exp, scan) -> ScanFrameStore
+        self._useFrameStore = True
+        self._frameStoreDict = dict()
+        # serialize loading counts between the GUI and the background Pt. prefetcher
+        self._loadLock = threading.RLock()
+
+        # integral images held in the counts cache: (exp, scan) -> (pt number list, signatures of the XML files)
+        self._integralImageDict = dict()
 
         return
 
-    def _add_spice_workspace(self, exp_no, scan_no, spice_table_ws):
-        """
+    def _promote_counts(self, count_matrix):
+        """ Promote the compact integer counts to float if compact counts are disabled
+        :param count_matrix:
+        :return:
         """
-        assert isinstance(exp_no, int)
-        assert isinstance(scan_no, int)
-        assert isinstance(spice_table_ws, mantid.dataobjects.TableWorkspace)
-        self._mySpiceTableDict[(exp_no, scan_no)] = str(spice_table_ws)
+        if self._compactCounts:
+            return count_matrix
 
-        return
+        return count_matrix.astype('float64')
 
-    def _add_raw_workspace(self, exp_no, scan_no, pt_no, raw_ws):
-        """ Add raw Pt.'s workspace
+    def _get_frame_store(self, exp_no, scan_no):
+        """ Get the binary on-disk cache of detector counts of a scan
         :param exp_no:
         :param scan_no:
-        :param pt_no:
-        :param raw_ws: workspace or name of the workspace
-        :return: None
+        :return: ScanFrameStore or None if the cache is disabled
         """
-        # Check
-        assert isinstance(exp_no, int)
-        assert isinstance(scan_no, int)
-        assert isinstance(pt_no, int)
-
-        if isinstance(raw_ws, str):
-            # Given by name
-            matrix_ws = AnalysisDataService.retrieve(raw_ws)
-        else:
-            matrix_ws = raw_ws
-        assert isinstance(matrix_ws, mantid.dataobjects.Workspace2D)
+        if self._useFrameStore is False or self._workDir is None:
+            return None
 
-        self._myRawDataWSDict[(exp_no, scan_no, pt_no)] = matrix_ws
+        if (exp_no, scan_no) not in self._frameStoreDict:
+            cache_dir = os.path.join(self._workDir, FRAME_CACHE_DIR)
+            self._frameStoreDict[(exp_no, scan_no)] = frame_store.ScanFrameStore(cache_dir, exp_no, scan_no)
 
-        return
+        return self._frameStoreDict[(exp_no, scan_no)]
 
-    @staticmethod
-    def _get_spice_workspace(exp_no, scan_no):
-        """ Get SPICE's scan table workspace
+    def get_spice_table(self, exp_no, scan_no):
+        """ Get the SPICE scan table, which is loaded if it is not loaded yet
         :param exp_no:
         :param scan_no:
-        :return: Table workspace or None
+        :return: spice_table.SpiceTable
         """
-        # try:
-        #     ws = self._mySpiceTableDict[(exp_no, scan_no)]
-        # except KeyError:
-        #     return None
-
-        spice_ws_name = get_spice_table_name(exp_no, scan_no)
-        if AnalysisDataService.doesExist(spice_ws_name):
-            ws = AnalysisDataService.retrieve(spice_ws_name)
-        else:
-            raise KeyError('Spice table workspace %s does not exist in ADS.' % spice_ws_name)
+        if (exp_no, scan_no) not in self._mySpiceTableDict:
+            status, error_message = self.load_spice_scan_file(exp_no, scan_no)
+            if not status:
+                raise RuntimeError(error_message)
 
-        return ws
+        return self._mySpiceTableDict[(exp_no, scan_no)]
 
     def calculate_polarization(self, exp_number, scan_number, pt_list, peak_count_vec, upper_bkgd_count_vec,
                                lower_bkgd_count_vec, flag):
@@ -109,61 +113,64 @@ class FourCirclePolarizedNeutronProcessor(object):
         :param peak_count_vec:
         :param upper_bkgd_count_vec:
         :param lower_bkgd_count_vec:
-        :return:
+        :return: 2-tuple as (list of (hkl, flip, error, spin up, spin up bkgd, spin down, spin down bkgd),
+                 background-subtracted counts of each Pt.)
         """
-        pt_hkl_dict = self.retrieve_hkl_from_spice(exp_number, scan_number)
+        pol_array = self.calculate_polarizations(exp_number, scan_number, pt_list, peak_count_vec,
+                                                 {flag: (upper_bkgd_count_vec, lower_bkgd_count_vec)})[flag]
+
+        return polarization.to_polarization_list(pol_array), list(polarization.get_single_spin_counts(pol_array))
 
+    def calculate_polarizations(self, exp_number, scan_number, pt_list, peak_count_vec, bkgd_model_dict,
+                                export=True):
+        """ calculate polarization of all spin-up/spin-down pairs of a scan with one or more background models
+        :param exp_number:
+        :param scan_number:
+        :param pt_list:
+        :param peak_count_vec:
+        :param bkgd_model_dict: dictionary: model name (flag) -> (first background counts, second background counts)
+        :param export: flag to export the polarization of each model to a file in working directory
+        :return: dictionary: model name -> structured array of polarization.POLARIZATION_DTYPE
+        """
         # TODO FIXME - Pt number is all odd due to SPICE bug!
         if len(pt_list) % 2 == 1:
             print ('Number of Pts. = {} is odd... This is wrong! Talk with Huibo. \nFYI: Pt list: {}'
                    ''.format(len(pt_list), pt_list))
         # END-IF
 
-        polarization_list = list()
-        single_spin_counts = list()
-        for pair_index in range(len(pt_list)/2):
-            # check spin up and spin down shall have same pt.
-            spin_up_pt = pt_list[2*pair_index]
-            spin_down_pt = pt_list[2*pair_index + 1]
-            spin_up_hkl = pt_hkl_dict[spin_up_pt]
-            spin_down_hkl = pt_hkl_dict[spin_down_pt]
-            if sum((spin_up_hkl - spin_down_hkl)**2) >= 0.25:
-                raise RuntimeError('For pt {} and {}, HKL {} and {} shall be same!'
-                                   ''.format(spin_up_pt, spin_down_pt, spin_up_hkl, spin_down_hkl))
-            # calculate spin up
-            b1_up = upper_bkgd_count_vec[2*pair_index]
-            b2_up = lower_bkgd_count_vec[2*pair_index]
-            roi_up = peak_count_vec[2*pair_index]
-            spin_up_bkgd = b1_up + b2_up
-            intensity_spin_up = roi_up - spin_up_bkgd
-
-            # calculate spin down
-            b1_down = upper_bkgd_count_vec[2*pair_index + 1]
-            b2_down = lower_bkgd_count_vec[2*pair_index + 1]
-            roi_down = peak_count_vec[2*pair_index + 1]
-            spin_down_bkgd = b1_down + b2_down
-            intensity_spin_down = roi_down - spin_down_bkgd
-
-            # calculate polarization
-            polarization = intensity_spin_up / intensity_spin_down
-
-            # propagating the error
-            e_up = math.sqrt(roi_up**2 + b1_up**2 + b2_up**2)
-            e_down = math.sqrt(roi_down**2 + b1_down**2 + b2_down**2)
-
-            pol_err = \
-                polarization * math.sqrt((e_up/(1 + intensity_spin_up))**2 + (e_down/(1 + intensity_spin_down))**2)
-
-            polarization_list.append((spin_up_hkl, polarization, pol_err, intensity_spin_up, spin_up_bkgd,
-                                      intensity_spin_down, spin_down_bkgd))
-            single_spin_counts.append(intensity_spin_up)
-            single_spin_counts.append(intensity_spin_down)
-        # END-FOR
+        hkl_matrix = self.get_pt_hkl_matrix(exp_number, scan_number, pt_list)
+        pol_array_dict = polarization.calculate_flipping_ratios_models(pt_list, hkl_matrix, peak_count_vec,
+                                                                       bkgd_model_dict)
 
         # export to file automatically
-        self.export_polarization(polarization_list,  exp_number, scan_number, flag)
+        if export:
+            for flag in sorted(pol_array_dict.keys()):
+                self.export_polarization(pol_array_dict[flag], exp_number, scan_number, flag)
 
-        return polarization_list, single_spin_counts
+        return pol_array_dict
+
+    def get_pt_hkl_matrix(self, exp_number, scan_number, pt_list):
+        """
+        get HKL of a list of Pts. as a 2D array
+        :param exp_number:
+        :param scan_number:
+        :param pt_list:
+        :return: (number of Pts., 3) numpy array
+        """
+        scan_table = self.get_spice_table(exp_number, scan_number)
+        table_pt_vec = scan_table.column('Pt.')
+        pt_vec = numpy.asarray(pt_list)
+
+        # row of each Pt. in the scan table
+        table_order = numpy.argsort(table_pt_vec, kind='mergesort')
+        row_vec = table_order[numpy.searchsorted(table_pt_vec, pt_vec, sorter=table_order).clip(0, len(table_order) - 1)]
+        missing_pts = pt_vec[table_pt_vec[row_vec] != pt_vec]
+        if missing_pts.shape[0] > 0:
+            raise KeyError('Pt(s) {0} do not exist in SPICE table of Exp {1} Scan {2}'
+                           ''.format(missing_pts.tolist(), exp_number, scan_number))
+
+        return numpy.column_stack((scan_table.column('h')[row_vec], scan_table.column('k')[row_vec],
+                                   scan_table.column('l')[row_vec]))
 
     def retrieve_hkl_from_spice(self, exp_number, scan_number):
         """
@@ -172,18 +179,10 @@ class FourCirclePolarizedNeutronProcessor(object):
         :param scan_number:
         :return:
         """
-        spice_table_ws = self._get_spice_workspace(exp_number, scan_number)
-        pt_index = spice_table_ws.getColumnNames().index('Pt.')
-        h_index = spice_table_ws.getColumnNames().index('h')
-        k_index = spice_table_ws.getColumnNames().index('k')
-        l_index = spice_table_ws.getColumnNames().index('l')
-
-        pt_hkl_dict = dict()
-        for row_index in range(spice_table_ws.rowCount()):
-            pt_hkl_dict[spice_table_ws.cell(row_index, pt_index)] = numpy.array([
-                spice_table_ws.cell(row_index, h_index), spice_table_ws.cell(row_index, k_index), \
-                spice_table_ws.cell(row_index, l_index)])
-        # END-FOR
+        scan_table = self.get_spice_table(exp_number, scan_number)
+        hkl_matrix = numpy.column_stack((scan_table.column('h'), scan_table.column('k'), scan_table.column('l')))
+
+        pt_hkl_dict = dict(zip(scan_table.column('Pt.').tolist(), hkl_matrix))
 
         return pt_hkl_dict
 
@@ -224,13 +223,13 @@ class FourCirclePolarizedNeutronProcessor(object):
 
     def does_raw_loaded(self, exp_no, scan_no, pt_no):
         """
-        Check whether the raw Workspace2D for a Pt. exists
+        Check whether the raw data (Workspace2D or counts array by backend) for a Pt. exists
         :param exp_no:
         :param scan_no:
         :param pt_no:
         :return:
         """
-        return (exp_no, scan_no, pt_no) in self._myRawDataWSDict
+        return self._backend.has_pt(exp_no, scan_no, pt_no)
 
     def does_spice_loaded(self, exp_no, scan_no):
         """ Check whether a SPICE file has been loaded
@@ -240,10 +239,45 @@ class FourCirclePolarizedNeutronProcessor(object):
         """
         return (exp_no, scan_no) in self._mySpiceTableDict
 
-    def export_polarization(self, polarization_list, exp_number, scan_number, flag):
+    def evict_scan(self, exp_number, scan_number):
+        """ Release the cached detector counts of all Pts. of a scan
+        :param exp_number:
+        :param scan_number:
+        :return: number of released Pts.
         """
+        with self._loadLock:
+            self._integralImageDict.pop((exp_number, scan_number), None)
+
+            return self._loadedData.evict_scan(exp_number, scan_number)
 
-        :param polarization_list:
+    def export_scan_movie(self, exp_number, scan_number, output_dir, movie_file_name=None, workers=None,
+                          progress_callback=None):
+        """
+        Export the detector counts of all the Pts. of a scan to PNG images (scan<scan>_0001.png, ...) rendered
+        off-screen in parallel, and to a movie if a movie file name is given
+        :param exp_number:
+        :param scan_number:
+        :param output_dir:
+        :param movie_file_name: movie file name (.mp4, .gif, ...) to encode by ffmpeg.  None for PNG images only
+        :param workers: number of worker processes.  None for the number of CPUs
+        :param progress_callback: method called as (number of done, total number) while loading and rendering
+        :return: 2-tuple as (list of PNG file names, movie file name or None)
+        """
+        pt_number_list, counts_cube = self.load_scan_frames(exp_number, scan_number, progress_callback)
+        title_list = ['Exp {} Scan {} Pt {}'.format(exp_number, scan_number, pt_number)
+                      for pt_number in pt_number_list]
+
+        return movie_export.export_movie(counts_cube, title_list, output_dir, 'scan{0}'.format(scan_number),
+                                         movie_file_name=movie_file_name, workers=workers,
+                                         progress_callback=progress_callback)
+
+    def export_polarization(self, pol_array, exp_number, scan_number, flag):
+        """
+        export the polarization of the spin pairs of a scan to a file in working directory
+        :param pol_array: structured array of polarization.POLARIZATION_DTYPE
+        :param exp_number:
+        :param scan_number:
+        :param flag: background model
         :return:
         """
         import datetime
@@ -253,12 +287,15 @@ class FourCirclePolarizedNeutronProcessor(object):
 
         file_name = os.path.join(self._workDir, base_name)
 
-        out_buffer = '# H  K  L  Flip  Error  SpinUp  SpinUpBk  SpinDown  SpinDownBk'
-        for index in range(len(polarization_list)):
-            hkl, flip, error, spin_up, spin_up_bkgd, spin_down, spin_down_bkgd = polarization_list[index]
+        # HKL of all the pairs are rounded at once
+        hkl_matrix = round_hkl_array(pol_array['hkl']).astype('int64')
+        out_buffer = '# H  K  L  Flip  Error  SpinUp  SpinUpBk  SpinDown  SpinDownBk\n'
+        for index in range(pol_array.shape[0]):
             out_buffer += '{:4d}  {:4d}  {:4d}   {:3.5f}  {:3.5f}  {:3.5f}  {:3.5f}  {:3.5f}  {:3.5f}\n' \
-                          ''.format(int(round(hkl[0])), int(round(hkl[1])), int(round(hkl[2])), flip, error,
-                                    spin_up, spin_up_bkgd, spin_down, spin_down_bkgd)
+                          ''.format(hkl_matrix[index, 0], hkl_matrix[index, 1], hkl_matrix[index, 2],
+                                    pol_array['flip'][index], pol_array['error'][index], pol_array['spin_up'][index],
+                                    pol_array['spin_up_bkgd'][index], pol_array['spin_down'][index],
+                                    pol_array['spin_down_bkgd'][index])
 
         out_file = open(file_name, 'w')
         out_file.write(out_buffer)
@@ -301,54 +338,31 @@ class FourCirclePolarizedNeutronProcessor(object):
         assert isinstance(exp_no, int)
         assert isinstance(scan_no, int)
 
-        # Get workspace
+        # Get table
         status, ret_obj = self.load_spice_scan_file(exp_no, scan_no)
         if status is False:
             return False, ret_obj
-        else:
-            table_ws_name = ret_obj
-            table_ws = AnalysisDataService.retrieve(table_ws_name)
+        scan_table = self._mySpiceTableDict[(exp_no, scan_no)]
 
         # Get column for Pt.
-        col_name_list = table_ws.getColumnNames()
-        if 'Pt.' not in col_name_list:
+        if 'Pt.' not in scan_table:
             return False, 'No column with name Pt. can be found in SPICE table.'
 
-        i_pt = col_name_list.index('Pt.')
-        assert 0 <= i_pt < len(col_name_list), 'Impossible to have assertion error!'
-
-        pt_number_list = []
-        num_rows = table_ws.rowCount()
-        for i in range(num_rows):
-            pt_number = table_ws.cell(i, i_pt)
-            pt_number_list.append(pt_number)
+        pt_number_list = scan_table.column('Pt.').tolist()
 
         return True, pt_number_list
 
-    @staticmethod
-    def get_existing_workspaces():
+    def get_existing_workspaces(self):
         """
-        get the list of workspaces that are in ADS current
-        :return:
+        get the list of data (workspaces in ADS for Mantid backend) that are held by the backend
+        :return: list of 2-tuples as (name, type)
         """
-        ws_name_list = AnalysisDataService.getObjectNames()
-        for index, ws_name in enumerate(ws_name_list):
-            ws_i = AnalysisDataService.retrieve(ws_name)
-            ws_type = ws_i.id()
-            ws_name_list[index] = ws_name, ws_type
-
-        return ws_name_list
+        return self._backend.list_data()
 
     def get_raw_data_workspace(self, exp_no, scan_no, pt_no):
-        """ Get raw workspace
+        """ Get raw data of a Pt.: Workspace2D for Mantid backend or 2D counts array for NumPy backend
         """
-        try:
-            ws = self._myRawDataWSDict[(exp_no, scan_no, pt_no)]
-            assert isinstance(ws, mantid.dataobjects.Workspace2D)
-        except KeyError:
-            return None
-
-        return ws
+        return self._backend.get_pt_data(exp_no, scan_no, pt_no)
 
     def get_raw_detector_counts(self, exp_no, scan_no, pt_no):
         """
@@ -358,20 +372,12 @@ class FourCirclePolarizedNeutronProcessor(object):
         :param pt_no:
         :return: boolean, 2D numpy data
         """
-        # Get workspace (in memory or loading)
-        raw_ws = self.get_raw_data_workspace(exp_no, scan_no, pt_no)
-        if raw_ws is None:
+        if not self._backend.has_pt(exp_no, scan_no, pt_no):
             return False, 'Raw data for Exp %d Scan %d Pt %d is not loaded.' % (exp_no, scan_no, pt_no)
 
-        # Convert to numpy array
-        det_shape = (self._detectorSize[0], self._detectorSize[1])
-        array2d = numpy.ndarray(shape=det_shape, dtype='float')
-        for i in range(det_shape[0]):
-            for j in range(det_shape[1]):
-                array2d[i][j] = raw_ws.readY(j * det_shape[0] + i)[0]
-
-        # Flip the 2D array to look detector from sample
-        array2d = numpy.flipud(array2d)
+        # 2D array with detector size from the loaded data, flipped to look detector from sample
+        array2d = self._backend.get_detector_counts(exp_no, scan_no, pt_no)
+        self._detectorSize = list(array2d.shape)
 
         return array2d
 
@@ -418,9 +424,8 @@ class FourCirclePolarizedNeutronProcessor(object):
         @param mask_range:
         @return:
         """
-        # load data
-        # TODO shall check data holder first ... but not
-        det_matrix = self.load_spice_xml_file2(exp_number, scan_number, pt_number)
+        # load data (copy as the loaded matrix is shared with the cache)
+        det_matrix = numpy.array(self.load_spice_xml_file2(exp_number, scan_number, pt_number), dtype='float')
 
         min_row = int(mask_range[0][0])
         min_col = int(mask_range[0][1])
@@ -440,6 +445,122 @@ class FourCirclePolarizedNeutronProcessor(object):
         :param roi_range:
         :return: (list, numpy.ndarray): list as the list of pt numbers.  numpy.ndarray (1D) for integrated values
         """
+        return self.integrate_rois(exp_number, scan_number, {0: roi_range})[0]
+
+    def integrate_rois(self, exp_number, scan_number, roi_range_dict, progress_callback=None):
+        """
+        integrate counts in a set of ROIs over all Pts. of a scan with four look-ups per ROI on the scan's
+        integral image
+        :param exp_number:
+        :param scan_number:
+        :param roi_range_dict: dictionary: ROI name -> ((min_row, min_col), (max_row, max_col))
+        :param progress_callback: method called as (number of loaded Pts., number of Pts.) while loading the scan.
+                                  It may raise an exception to cancel.  None for no progress report
+        :return: dictionary: ROI name -> (list, numpy.ndarray) as sorted pt numbers and integrated values
+        """
+        # check inputs
+        assert isinstance(roi_range_dict, dict), 'ROI ranges {0} must be given in a dictionary but not a {1}' \
+                                                 ''.format(roi_range_dict, type(roi_range_dict))
+
+        # parse RIO ranges
+        matrix_range_dict = dict()
+        for roi_name in roi_range_dict:
+            roi_range = roi_range_dict[roi_name]
+            try:
+                min_row = int(roi_range[0][0])
+                min_col = int(roi_range[0][1])
+                max_row = int(roi_range[1][0])
+                max_col = int(roi_range[1][1])
+            except IndexError as index_err:
+                raise RuntimeError('Input ROI {0} does not have 2 x 2 elements. FYI: {1}'
+                                   ''.format(roi_range, index_err))
+            matrix_range_dict[roi_name] = min_row, min_col, max_row, max_col
+        # END-FOR
+
+        # get the integral image of all Pts. in this scan
+        pt_number_list, scan_integral = self.get_integral_image(exp_number, scan_number, progress_callback)
+
+        # do integration (simple summing) for all the Pts. and ROIs at once
+        roi_name_list = list(matrix_range_dict.keys())
+        roi_counts_matrix = integral_image.sum_rectangles(scan_integral,
+                                                          [matrix_range_dict[roi_name] for roi_name in roi_name_list])
+        roi_counts_matrix = roi_counts_matrix.astype('float')
+
+        integrated_dict = dict()
+        for roi_index, roi_name in enumerate(roi_name_list):
+            vec_integrated = roi_counts_matrix[:, roi_index].copy()
+            for pt_index in numpy.where(vec_integrated < 0.0001)[0]:
+                print ('[Warning] It is odd to have zero count on exp {} scan {} pt {} in ROI {}'
+                       ''.format(exp_number, scan_number, pt_number_list[pt_index], roi_name))
+            integrated_dict[roi_name] = pt_number_list[:], vec_integrated
+        # END-FOR
+
+        return integrated_dict
+
+    def get_integral_image(self, exp_number, scan_number, progress_callback=None):
+        """
+        get the integral image (summed-area table) of all the Pts. in a scan.  It is kept in the counts cache and
+        rebuilt if the Pts. of the scan or any of their XML files are changed
+        :param exp_number:
+        :param scan_number:
+        :param progress_callback: method called as (number of loaded Pts., number of Pts.) while loading the scan
+        :return: (list, numpy.ndarray) as sorted pt numbers and (n_pt, rows + 1, cols + 1) integral image
+        """
+        # the cache is checked and updated under the lock as the integral image may be requested by the GUI and
+        # by the background threads; the scan is loaded out of it such that the GUI can load a Pt. meanwhile
+        status, pt_number_list = self.get_pt_numbers(exp_number, scan_number)
+        with self._loadLock:
+            if status and (exp_number, scan_number) in self._integralImageDict:
+                cached_pt_list, cached_signatures = self._integralImageDict[(exp_number, scan_number)]
+                if cached_pt_list == sorted(pt_number_list) and \
+                        cached_signatures == self._get_xml_signatures(exp_number, scan_number, cached_pt_list):
+                    try:
+                        return cached_pt_list[:], self._loadedData[(exp_number, scan_number, INTEGRAL_IMAGE_PT)]
+                    except KeyError:
+                        # evicted from the counts cache
+                        pass
+            # END-IF
+        # END-WITH
+
+        pt_number_list, counts_cube = self.load_scan_frames(exp_number, scan_number, progress_callback)
+        signatures = self._get_xml_signatures(exp_number, scan_number, pt_number_list)
+        scan_integral = integral_image.build_integral_image(counts_cube)
+
+        with self._loadLock:
+            self._loadedData[(exp_number, scan_number, INTEGRAL_IMAGE_PT)] = scan_integral
+            self._integralImageDict[(exp_number, scan_number)] = pt_number_list[:], signatures
+
+        return pt_number_list[:], scan_integral
+
+    def _get_xml_signatures(self, exp_number, scan_number, pt_number_list):
+        """
+        get the signatures (modification time and size) of the detector XML files of Pts.
+        :param exp_number:
+        :param scan_number:
+        :param pt_number_list:
+        :return: list of (mtime, size) or None for a missing file
+        """
+        signature_list = list()
+        for pt_number in pt_number_list:
+            xml_file_name = os.path.join(self._dataDir, get_det_xml_file_name(self._instrumentName, exp_number,
+                                                                              scan_number, pt_number))
+            try:
+                signature_list.append(frame_store.get_file_signature(xml_file_name))
+            except OSError:
+                signature_list.append(None)
+        # END-FOR
+
+        return signature_list
+
+    def load_scan_frames(self, exp_number, scan_number, progress_callback=None):
+        """
+        load the detector counts of all the Pts. in a scan to a 3D array
+        :param exp_number:
+        :param scan_number:
+        :param progress_callback: method called as (number of loaded Pts., number of Pts.) after each Pt.
+                                  It may raise an exception to cancel.  None for no progress report
+        :return: (list, numpy.ndarray) as sorted pt numbers and (n_pt, rows, cols) array
+        """
         # check inputs
         assert isinstance(exp_number, int), 'Experiment number {0} must be an integer but not a {1}' \
                                             ''.format(exp_number, type(exp_number))
@@ -449,45 +570,173 @@ class FourCirclePolarizedNeutronProcessor(object):
             raise RuntimeError('Input experiment number {0} and stored experiment number {1} do '
                                'not match.'.format(exp_number, self._expNumber))
 
-        # parse RIO range
-        try:
-            min_row = int(roi_range[0][0])
-            min_col = int(roi_range[0][1])
-            max_row = int(roi_range[1][0])
-            max_col = int(roi_range[1][1])
-        except IndexError as index_err:
-            raise RuntimeError('Input ROI {0} does not have 2 x 2 elements. FYI: {1}'
-                               ''.format(roi_range, index_err))
-
-        # load all Pts. in this scan and do integration (simple summing)
         status, pt_number_list = self.get_pt_numbers(exp_number, scan_number)
         if not status:
             err_msg = pt_number_list
             raise RuntimeError('Unable to retrieve pt numbers from experiment {0} scan {1} due to {2}'
                                ''.format(exp_number, scan_number, err_msg))
-        ws_pt_list = list()
-        integrated_list = list()
-        for pt_number in sorted(pt_number_list):
-            count_matrix = self.load_spice_xml_file2(exp_no=exp_number, scan_no=scan_number, pt_no=pt_number)
-            roi_counts = numpy.sum(count_matrix[min_row:max_row, min_col:max_col])
-            if roi_counts < 0.0001:
-                print ('[Warning] It is odd to have zero count on exp {} scan {} pt {}'
-                       ''.format(exp_number, scan_number, pt_number))
-            ws_pt_list.append(pt_number)
-            integrated_list.append(roi_counts)
+        if len(pt_number_list) == 0:
+            raise RuntimeError('Experiment {0} scan {1} does not have any Pt.'.format(exp_number, scan_number))
+        pt_number_list = sorted(pt_number_list)
+
+        count_matrix_list = list()
+        for pt_number in pt_number_list:
+            count_matrix_list.append(self.load_spice_xml_file2(exp_no=exp_number, scan_no=scan_number,
+                                                               pt_no=pt_number))
+            if progress_callback is not None:
+                progress_callback(len(count_matrix_list), len(pt_number_list))
         # END-FOR
 
-        # convert to numpy array
-        vec_integrated = numpy.array(integrated_list)
+        # Pts. loaded before the frame file is widened may have a narrower type
+        counts_cube = numpy.ndarray(shape=(len(pt_number_list),) + count_matrix_list[0].shape,
+                                    dtype=numpy.result_type(*count_matrix_list))
+        for pt_index, count_matrix in enumerate(count_matrix_list):
+            counts_cube[pt_index] = count_matrix
+        # END-FOR
 
-        return pt_number_list, vec_integrated
+        return pt_number_list, counts_cube
+
+    def load_scan(self, exp_number, scan_number, workers=None):
+        """
+        Load the detector counts of all Pts. of a scan to the cache with SPICE XML files parsed in parallel
+        :param exp_number:
+        :param scan_number:
+        :param workers: number of worker processes.  None for the number of CPUs
+        :return: list of pt numbers
+        """
+        return self.load_scans(exp_number, [scan_number], workers)[scan_number]
 
-    def load_spice_scan_file(self, exp_no, scan_no, spice_file_name=None):
+    def load_scans(self, exp_number, scan_number_list, workers=None):
         """
-        Load a SPICE scan file to table workspace and run information matrix workspace.
+        Load the detector counts of all Pts. of a list of scans to the cache.  The SPICE XML files that are neither
+        in memory nor in the binary cache are parsed by a pool of worker processes, which write the counts into
+        the scans' memory-mapped frame files directly such that only Pt. slots and file signatures are passed
+        between processes.  Without a working directory, temporary frame files are used.
+        :param exp_number:
+        :param scan_number_list:
+        :param workers: number of worker processes.  None for the number of CPUs
+        :return: dictionary: scan number -> sorted pt number list
+        """
+        # check inputs
+        assert isinstance(exp_number, int), 'Experiment number {0} must be an integer but not a {1}' \
+                                            ''.format(exp_number, type(exp_number))
+        assert isinstance(scan_number_list, list), 'Scan numbers {0} must be given in a list but not a {1}' \
+                                                   ''.format(scan_number_list, type(scan_number_list))
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        assert isinstance(workers, int) and workers > 0, 'Number of workers {0} must be a positive integer.' \
+                                                         ''.format(workers)
+
+        with self._loadLock:
+            temp_dir = None
+            pt_number_dict = dict()
+            # (scan, pt) -> (store, XML file name, whether the store is temporary) for all the Pts. to parse
+            parse_dict = dict()
+            task_list = list()
+            task_key_list = list()
+
+            for scan_number in scan_number_list:
+                status, pt_number_list = self.get_pt_numbers(exp_number, scan_number)
+                if not status:
+                    raise RuntimeError('Unable to retrieve pt numbers from experiment {0} scan {1} due to {2}'
+                                       ''.format(exp_number, scan_number, pt_number_list))
+                pt_number_dict[scan_number] = sorted(pt_number_list)
+
+                # get the binary cache or a temporary one
+                scan_store = self._get_frame_store(exp_number, scan_number)
+                is_temp_store = scan_store is None
+                if is_temp_store:
+                    if temp_dir is None:
+                        temp_dir = tempfile.mkdtemp(prefix='py4circle_')
+                    scan_store = frame_store.ScanFrameStore(temp_dir, exp_number, scan_number)
+
+                # find out the Pts. that are neither in memory nor in the binary cache
+                to_parse_list = list()
+                for pt_number in pt_number_dict[scan_number]:
+                    if (exp_number, scan_number, pt_number) in self._loadedData:
+                        continue
+                    xml_file_name = os.path.join(self._dataDir, get_det_xml_file_name(self._instrumentName, exp_number,
+                                                                                      scan_number, pt_number))
+                    if os.path.exists(xml_file_name) is False:
+                        raise RuntimeError('SPICE detector count XML file {0} for Exp {1} Scan {2} Pt {3} does not '
+                                           'exist.'.format(xml_file_name, exp_number, scan_number, pt_number))
+                    cached_matrix = scan_store.get_frame(pt_number, frame_store.get_file_signature(xml_file_name))
+                    if cached_matrix is None:
+                        to_parse_list.append(pt_number)
+                        parse_dict[(scan_number, pt_number)] = scan_store, xml_file_name, is_temp_store
+                    else:
+                        self._loadedData[(exp_number, scan_number, pt_number)] = self._promote_counts(cached_matrix)
+                # END-FOR
+                if len(to_parse_list) == 0:
+                    continue
+
+                # parse the first Pt. here to find out the detector size and then reserve the slots for all
+                first_xml_name = parse_dict[(scan_number, to_parse_list[0])][1]
+                first_matrix = parse_spice_xml.get_counts_xml_file(first_xml_name,
+                                                                   dtype=parse_spice_xml.COMPACT_DTYPE)
+                slot_dict = scan_store.reserve_slots(to_parse_list, first_matrix.shape,
+                                                     capacity=len(pt_number_dict[scan_number]),
+                                                     dtype=first_matrix.dtype)
+                scan_store.put_frame(to_parse_list[0], frame_store.get_file_signature(first_xml_name), first_matrix)
+
+                for pt_number in to_parse_list[1:]:
+                    task_list.append((parse_dict[(scan_number, pt_number)][1], scan_store.frame_file_name,
+                                      slot_dict[pt_number]))
+                    task_key_list.append((scan_number, pt_number))
+                # END-FOR
+            # END-FOR (scan_number)
+
+            # parse in parallel
+            if workers > 1 and len(task_list) > 1:
+                worker_pool = multiprocessing.Pool(processes=min(workers, len(task_list)))
+                try:
+                    result_list = worker_pool.map(frame_store.parse_xml_to_frame_file, task_list)
+                finally:
+                    worker_pool.close()
+                    worker_pool.join()
+            else:
+                result_list = [frame_store.parse_xml_to_frame_file(task) for task in task_list]
+
+            # register the parsed Pts. to the frame files
+            commit_dict = dict()
+            overflow_list = list()
+            for (scan_number, pt_number), (slot, signature, is_written) in zip(task_key_list, result_list):
+                if is_written:
+                    commit_dict.setdefault(scan_number, dict())[pt_number] = signature
+                else:
+                    overflow_list.append((scan_number, pt_number))
+            for scan_number in commit_dict:
+                scan_store = parse_dict[(scan_number, list(commit_dict[scan_number].keys())[0])][0]
+                scan_store.commit_frames(commit_dict[scan_number])
+
+            # counts exceeding the data type of their frame file: widen the file and store them
+            for scan_number, pt_number in overflow_list:
+                scan_store, xml_file_name, is_temp_store = parse_dict[(scan_number, pt_number)]
+                count_matrix = parse_spice_xml.get_counts_xml_file(xml_file_name, dtype=parse_spice_xml.COMPACT_DTYPE)
+                scan_store.put_frame(pt_number, frame_store.get_file_signature(xml_file_name), count_matrix)
+            # END-FOR
+
+            # populate the in-memory cache: counts in temporary frame files are copied to memory
+            for scan_number, pt_number in parse_dict:
+                scan_store, xml_file_name, is_temp_store = parse_dict[(scan_number, pt_number)]
+                count_matrix = scan_store.get_frame(pt_number, frame_store.get_file_signature(xml_file_name))
+                if is_temp_store:
+                    count_matrix = numpy.array(count_matrix)
+                self._loadedData[(exp_number, scan_number, pt_number)] = self._promote_counts(count_matrix)
+            # END-FOR
+
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        return pt_number_dict
+
+    def load_spice_scan_file(self, exp_no, scan_no, spice_file_name=None, reload=False):
+        """
+        Load a SPICE scan file to a column-oriented SPICE table.
         :param exp_no:
         :param scan_no:
         :param spice_file_name:
+        :param reload: flag to read the file again even if it has been loaded, such as for a scan in progress
         :return: status (boolean), error message (string)
         """
         # Default for exp_no
@@ -498,29 +747,22 @@ class FourCirclePolarizedNeutronProcessor(object):
         assert isinstance(exp_no, int)
         assert isinstance(scan_no, int)
         out_ws_name = get_spice_table_name(exp_no, scan_no)
-        if (exp_no, scan_no) in self._mySpiceTableDict:
+        if (exp_no, scan_no) in self._mySpiceTableDict and not reload:
             return True, out_ws_name
 
-        # load the SPICE table data if the target workspace does not exist
-        if not AnalysisDataService.doesExist(out_ws_name):
-            # Form standard name for a SPICE file if name is not given
-            if spice_file_name is None:
-                spice_file_name = os.path.join(self._dataDir,
-                                               get_spice_file_name(self._instrumentName, exp_no, scan_no))
+        # Form standard name for a SPICE file if name is not given
+        if spice_file_name is None:
+            spice_file_name = os.path.join(self._dataDir, get_spice_file_name(self._instrumentName, exp_no, scan_no))
 
-            try:
-                spice_table_ws, info_matrix_ws = mantidsimple.LoadSpiceAscii(Filename=spice_file_name,
-                                                                             OutputWorkspace=out_ws_name,
-                                                                             RunInfoWorkspace='TempInfo')
-                mantidsimple.DeleteWorkspace(Workspace=info_matrix_ws)
-            except RuntimeError as run_err:
-                return False, 'Unable to load SPICE data %s due to %s' % (spice_file_name, str(run_err))
-        else:
-            spice_table_ws = AnalysisDataService.retrieve(out_ws_name)
-        # END-IF
+        # load the SPICE table data
+        try:
+            scan_table = spice_table.read_spice_ascii(spice_file_name)
+        except (RuntimeError, IOError) as run_err:
+            return False, 'Unable to load SPICE data %s due to %s' % (spice_file_name, str(run_err))
 
         # Store
-        self._add_spice_workspace(exp_no, scan_no, spice_table_ws)
+        with self._loadLock:
+            self._mySpiceTableDict[(exp_no, scan_no)] = scan_table
 
         return True, out_ws_name
 
@@ -539,33 +781,49 @@ class FourCirclePolarizedNeutronProcessor(object):
                                          ''.format(scan_no, type(scan_no))
         assert isinstance(pt_no, int), 'Pt number {0} shall be integer but not {1}'.format(pt_no, type(pt_no))
 
-        # check whether it has been loaded
-        if (exp_no, scan_no, pt_no) in self._loadedData:
-            assert isinstance(self._loadedData[(exp_no, scan_no, pt_no)], numpy.ndarray),\
-                'Loaded data must be a numpy ndarray'
-            return self._loadedData[(exp_no, scan_no, pt_no)]
-
-        # Get XML file name with full path
-        if xml_file_name is None:
-            # use default
-            assert isinstance(exp_no, int) and isinstance(scan_no, int) and isinstance(pt_no, int),\
-                'Experiment number {0} ({3}), Scan number {1} ({4}) and Pt number {2} ({5}) all shall be integers' \
-                ''.format(exp_no, scan_no, pt_no, type(exp_no), type(scan_no), type(pt_no))
-            xml_file_name = os.path.join(self._dataDir, get_det_xml_file_name(self._instrumentName,
-                                                                              exp_no, scan_no, pt_no))
-        # END-IF
-
-        # check whether file exists
-        if os.path.exists(xml_file_name) is False:
-            raise RuntimeError('SPICE detector count XML file {0} for Exp {1} Scan {2} Pt {3} does not exist.'
-                               ''.format(xml_file_name, exp_no, scan_no, pt_no))
+        with self._loadLock:
+            # check whether it has been loaded, possibly by another thread while waiting for the lock
+            try:
+                return self._loadedData[(exp_no, scan_no, pt_no)]
+            except KeyError:
+                pass
+
+            # Get XML file name with full path
+            if xml_file_name is None:
+                # use default
+                assert isinstance(exp_no, int) and isinstance(scan_no, int) and isinstance(pt_no, int),\
+                    'Experiment number {0} ({3}), Scan number {1} ({4}) and Pt number {2} ({5}) all shall be ' \
+                    'integers'.format(exp_no, scan_no, pt_no, type(exp_no), type(scan_no), type(pt_no))
+                xml_file_name = os.path.join(self._dataDir, get_det_xml_file_name(self._instrumentName,
+                                                                                  exp_no, scan_no, pt_no))
+            # END-IF
 
-        # load data
-        count_matrix = parse_spice_xml.get_counts_xml_file(xml_file_name)
-        assert isinstance(count_matrix, numpy.ndarray), 'Returned counts must be stored in numpy.ndarray'
+            # check whether file exists
+            if os.path.exists(xml_file_name) is False:
+                raise RuntimeError('SPICE detector count XML file {0} for Exp {1} Scan {2} Pt {3} does not exist.'
+                                   ''.format(xml_file_name, exp_no, scan_no, pt_no))
+
+            # load data: from the binary cache of the scan if the XML file is not changed since it was cached
+            scan_store = self._get_frame_store(exp_no, scan_no)
+            if scan_store is None:
+                count_matrix = parse_spice_xml.get_counts_xml_file(xml_file_name, dtype=parse_spice_xml.COMPACT_DTYPE)
+            else:
+                signature = frame_store.get_file_signature(xml_file_name)
+                count_matrix = scan_store.get_frame(pt_no, signature)
+                if count_matrix is None:
+                    count_matrix = parse_spice_xml.get_counts_xml_file(xml_file_name,
+                                                                       dtype=parse_spice_xml.COMPACT_DTYPE)
+                    try:
+                        count_matrix = scan_store.put_frame(pt_no, signature, count_matrix)
+                    except (IOError, OSError) as io_err:
+                        print('[WARNING] Unable to cache detector counts of Exp {0} Scan {1} Pt {2} due to {3}'
+                              ''.format(exp_no, scan_no, pt_no, io_err))
+            # END-IF-ELSE
+            assert isinstance(count_matrix, numpy.ndarray), 'Returned counts must be stored in numpy.ndarray'
+            count_matrix = self._promote_counts(count_matrix)
 
-        # store
-        self._loadedData[(exp_no, scan_no, pt_no)] = count_matrix
+            # store
+            self._loadedData[(exp_no, scan_no, pt_no)] = count_matrix
 
         return count_matrix
 
@@ -595,37 +853,43 @@ class FourCirclePolarizedNeutronProcessor(object):
         # check whether file exists
         assert os.path.exists(xml_file_name)
 
-        # retrieve and check SPICE table workspace
-        spice_table_ws = self._get_spice_workspace(exp_no, scan_no)
-        assert isinstance(spice_table_ws, mantid.dataobjects.TableWorkspace), 'SPICE table workspace must be a ' \
-                                                                              'TableWorkspace but not %s.' \
-                                                                              '' % type(spice_table_ws)
-        spice_table_name = spice_table_ws.name()
-
-        # load SPICE Pt.  detector file
-        pt_ws_name = get_raw_data_workspace_name(exp_no, scan_no, pt_no)
-        if AnalysisDataService.doesExist(pt_ws_name) and over_write_existing is False:
-            pass
-        else:
-            try:
-                mantidsimple.LoadSpiceXML2DDet(Filename=xml_file_name,
-                                               OutputWorkspace=pt_ws_name,
-                                               SpiceTableWorkspace=spice_table_name,
-                                               PtNumber=pt_no)
-                if self._refWorkspaceForMask is None or AnalysisDataService.doesExist(pt_ws_name) is False:
-                    self._refWorkspaceForMask = pt_ws_name
-            except RuntimeError as run_err:
-                return False, str(run_err)
-            # END-IF-ELSE
+        return self._backend.load_pt(exp_no, scan_no, pt_no, xml_file_name, over_write_existing)
 
-            # Add data storage
-            assert AnalysisDataService.doesExist(pt_ws_name), 'Unable to locate workspace {0}.'.format(pt_ws_name)
-            raw_matrix_ws = AnalysisDataService.retrieve(pt_ws_name)
-            self._add_raw_workspace(exp_no, scan_no, pt_no, raw_matrix_ws)
-        # END-IF
+    def set_counts_cache(self, counts_cache):
+        """ Replace the cache of detector counts matrices
+        :param counts_cache: an object with the DetectorCountsCache interface
+        :return:
+        """
+        assert hasattr(counts_cache, 'evict_scan'), 'Counts cache {0} does not support evict_scan()' \
+                                                    ''.format(type(counts_cache))
+        with self._loadLock:
+            self._loadedData = counts_cache
+            self._integralImageDict = dict()
+
+        return
+
+    def set_frame_cache(self, enabled):
+        """ Enable or disable the binary on-disk cache of parsed detector counts under working directory
+        :param enabled:
+        :return:
+        """
+        assert isinstance(enabled, bool), 'Flag {0} must be a boolean but not a {1}'.format(enabled, type(enabled))
+        self._useFrameStore = enabled
+        self._frameStoreDict = dict()
+
+        return
+
+    def set_compact_counts(self, enabled):
+        """ Keep detector counts in memory as the narrowest unsigned integer type (uint16 or uint32) holding
+        the counts, or as float as before.  Counts already in memory are not converted.
+        :param enabled:
+        :return:
+        """
+        assert isinstance(enabled, bool), 'Flag {0} must be a boolean but not a {1}'.format(enabled, type(enabled))
+        self._compactCounts = enabled
+
+        return
 
-        return True, pt_ws_name
-   
     def set_exp_number(self, exp_number):
         """ Add experiment number
         :param exp_number:
@@ -679,15 +943,19 @@ class FourCirclePolarizedNeutronProcessor(object):
             return False, 'User specified working directory %s is not writable.' % work_dir
 
         self._workDir = work_dir
+        self._frameStoreDict = dict()
 
         return True, ''
 
-    def survey(self, exp_number, start_scan, end_scan):
+    def survey(self, exp_number, start_scan, end_scan, progress_callback=None):
         """ Load all the SPICE ascii file to get the big picture such that
         * the strongest peaks and their HKL in order to make data reduction and analysis more convenient
+        SPICE files are summarized in parallel and only the new or changed ones since the last survey are read.
         :param exp_number: experiment number
         :param start_scan:
         :param end_scan:
+        :param progress_callback: method called as (number of read scans, number of scans to read).
+                                  It may raise an exception to cancel.  None for no progress report
         :return: 3-tuple (status, scan_summary list, error message)
         """
         # Check
@@ -697,97 +965,50 @@ class FourCirclePolarizedNeutronProcessor(object):
         if isinstance(end_scan, int) is False:
             end_scan = MAX_SCAN_NUMBER
 
-        # Output workspace
-        scan_sum_list = list()
+        if self._dataDir is None:
+            return False, 'Data directory is not set up.', ''
 
-        error_message = ''
+        # summaries of the scans surveyed before are read from the index in working directory
+        index_file_name = None
+        if self._workDir is not None:
+            index_file_name = os.path.join(self._workDir, survey_index.get_index_file_name(self._instrumentName,
+                                                                                           exp_number))
 
-        # Download and
-        for scan_number in range(start_scan, end_scan+1):
-            # check whether file exists
-            if self.does_file_exist(exp_number, scan_number):
-                spice_file_name = get_spice_file_name(self._instrumentName, exp_number, scan_number)
-                spice_file_name = os.path.join(self._dataDir, spice_file_name)
-            else:
-                # SPICE file does not exist in data directory.
-                print RuntimeError('Exp {0} Scan {1} does not exist.'.format(exp_number, scan_number))
-                continue
+        try:
+            scan_sum_list, error_message = survey_index.survey_experiment(self._dataDir, self._instrumentName,
+                                                                          exp_number, start_scan, end_scan,
+                                                                          index_file_name,
+                                                                          progress_callback=progress_callback)
+        except OSError as os_err:
+            return False, 'Unable to survey data directory {0} due to {1}'.format(self._dataDir, os_err), ''
 
-            # Load SPICE file and retrieve information
-            try:
-                spice_table_ws_name = 'TempTable'
-                mantidsimple.LoadSpiceAscii(Filename=spice_file_name,
-                                            OutputWorkspace=spice_table_ws_name,
-                                            RunInfoWorkspace='TempInfo')
-                spice_table_ws = AnalysisDataService.retrieve(spice_table_ws_name)
-                num_rows = spice_table_ws.rowCount()
-
-                if num_rows == 0:
-                    # it is an empty table
-                    error_message += 'Scan %d: empty spice table.\n' % scan_number
-                    continue
+        if error_message != '':
+            print('[Error]\n%s' % error_message)
 
-                col_name_list = spice_table_ws.getColumnNames()
-                h_col_index = col_name_list.index('h')
-                k_col_index = col_name_list.index('k')
-                l_col_index = col_name_list.index('l')
-                col_2theta_index = col_name_list.index('2theta')
-                m1_col_index = col_name_list.index('m1')
-                # optional as T-Sample
-                if 'tsample' in col_name_list:
-                    tsample_col_index = col_name_list.index('tsample')
-                else:
-                    tsample_col_index = None
-
-                max_count = 0
-                max_row = 0
-                max_h = max_k = max_l = 0
-                max_tsample = 0.
-
-                two_theta = m1 = -1
-
-                for i_row in range(num_rows):
-                    det_count = spice_table_ws.cell(i_row, 5)
-                    if det_count > max_count:
-                        max_count = det_count
-                        max_row = i_row
-                        max_h = spice_table_ws.cell(i_row, h_col_index)
-                        max_k = spice_table_ws.cell(i_row, k_col_index)
-                        max_l = spice_table_ws.cell(i_row, l_col_index)
-                        two_theta = spice_table_ws.cell(i_row, col_2theta_index)
-                        m1 = spice_table_ws.cell(i_row, m1_col_index)
-                        # t-sample is not a mandatory sample log in SPICE
-                        if tsample_col_index is None:
-                            max_tsample = 0.
-                        else:
-                            max_tsample = spice_table_ws.cell(i_row, tsample_col_index)
-                # END-FOR
+        self._scanSummaryList = scan_sum_list
 
-                # calculate wavelength
-                wavelength = get_hb3a_wavelength(m1)
-                if wavelength is None:
-                    q_range = 0.
-                    print('[ERROR] Scan number {0} has invalid m1 for wavelength.'.format(scan_number))
-                else:
-                    q_range = 4.*math.pi*math.sin(two_theta/180.*math.pi*0.5)/wavelength
+        return True, scan_sum_list, error_message
 
-                # appending to list
-                scan_sum_list.append([max_count, scan_number, max_row, max_h, max_k, max_l,
-                                      q_range, max_tsample])
+    @property
+    def backend(self):
+        return self._backend
 
-            except RuntimeError as e:
-                return False, None, str(e)
-            except ValueError as e:
-                # Unable to import a SPICE file without necessary information
-                error_message += 'Scan %d: unable to locate column h, k, or l. See %s.' % (scan_number, str(e))
-        # END-FOR (scan_number)
+    @property
+    def counts_cache(self):
+        return self._loadedData
 
-        if error_message != '':
-            print('[Error]\n%s' % error_message)
+    @property
+    def data_dir(self):
+        return self._dataDir
 
-        self._scanSummaryList = scan_sum_list
+    @property
+    def instrument_name(self):
+        return self._instrumentName
 
-        return True, scan_sum_list, error_message
+    @property
+    def loaded_spice_tables(self):
+        """ list of (exp number, scan number) of the loaded SPICE tables """
+        return list(self._mySpiceTableDict.keys())
 
     @property
     def working_dir(self):
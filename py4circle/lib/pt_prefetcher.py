@@ -0,0 +1,106 @@
+from __future__ import (absolute_import, division, print_function)
+import threading
+
+
+# number of Pts. on each side of the displayed one to load ahead of time
+DEFAULT_PREFETCH_RADIUS = 3
+
+
+class PtPrefetcher(object):
+    """
+    Background thread to load the detector counts of the Pts. next to the displayed one into the processor's cache
+    such that stepping through a scan does not wait for parsing SPICE XML files
+    """
+    def __init__(self, processor, radius=DEFAULT_PREFETCH_RADIUS):
+        """
+        initialization
+        :param processor: FourCirclePolarizedNeutronProcessor instance
+        :param radius: number of Pts. on each side of the displayed one to load
+        """
+        assert isinstance(radius, int) and radius >= 0, 'Prefetch radius {0} must be a non-negative integer.' \
+                                                        ''.format(radius)
+
+        self._processor = processor
+        self._radius = radius
+
+        # (exp, scan, pt) to load in order
+        self._pendingList = list()
+        self._condition = threading.Condition()
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._run, name='PtPrefetcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+        return
+
+    def _run(self):
+        """
+        load the pending Pts. until it is stopped
+        :return:
+        """
+        while True:
+            with self._condition:
+                while len(self._pendingList) == 0 and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                exp_number, scan_number, pt_number = self._pendingList.pop(0)
+            # END-WITH
+
+            try:
+                self._processor.load_spice_xml_file2(exp_number, scan_number, pt_number)
+            except RuntimeError:
+                # Pt. out of the scan or XML file not available yet: nothing to prefetch
+                pass
+            except Exception as load_err:
+                # any other failure of one Pt. must not stop prefetching for the rest of the session
+                print('[ERROR] Unable to prefetch Exp {0} Scan {1} Pt {2}: {3}: {4}'
+                      ''.format(exp_number, scan_number, pt_number, load_err.__class__.__name__, load_err))
+        # END-WHILE
+
+    def cancel(self):
+        """
+        cancel all the pending Pts.
+        :return:
+        """
+        with self._condition:
+            self._pendingList = list()
+
+        return
+
+    def prefetch(self, exp_number, scan_number, pt_number):
+        """
+        load the Pts. around a displayed Pt. in background.  Pending Pts. from the previous request,
+        including the ones from a different scan, are cancelled
+        :param exp_number:
+        :param scan_number:
+        :param pt_number: displayed Pt. number
+        :return:
+        """
+        pending_list = list()
+        for distance in range(1, self._radius + 1):
+            # the next Pts. go first as users mostly step forward
+            for neighbour_pt in (pt_number + distance, pt_number - distance):
+                if neighbour_pt > 0:
+                    pending_list.append((exp_number, scan_number, neighbour_pt))
+        # END-FOR
+
+        with self._condition:
+            self._pendingList = pending_list
+            self._condition.notify()
+
+        return
+
+    def stop(self):
+        """
+        stop the background thread
+        :return:
+        """
+        with self._condition:
+            self._stopped = True
+            self._pendingList = list()
+            self._condition.notify()
+        self._thread.join()
+
+        return
@@ -0,0 +1,125 @@
+"""
+Command line interface of the headless batch polarization reduction (script py4circle-reduce).
+It imports neither Qt, IPython nor matplotlib such that it can be run on the nodes of a cluster, where each
+instance reduces its own scans to its own output file.
+"""
+from __future__ import (absolute_import, division, print_function)
+import argparse
+import json
+import os
+import sys
+from py4circle.lib import batch_reduction
+
+
+# options that can be given in the JSON configuration file, which are overridden by the command line arguments
+CONFIG_KEYS = ['exp', 'scans', 'roi', 'data_dir', 'work_dir', 'output', 'workers', 'detector_size']
+
+
+def create_parser():
+    """ Create the command line argument parser
+    :return: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='py4circle-reduce',
+                                     description='Integrate the peak and background ROIs of HB3A scans and calculate '
+                                                 'the polarization (flipping ratio) of all spin pairs without GUI.')
+    parser.add_argument('-c', '--config', dest='config', default=None,
+                        help='JSON file with any of the options {0}. Command line arguments take precedence.'
+                             ''.format(', '.join(CONFIG_KEYS)))
+    parser.add_argument('-e', '--exp', dest='exp', type=int, default=None, help='experiment number')
+    parser.add_argument('-s', '--scans', dest='scans', default=None,
+                        help="scan numbers such as '12, 15-20'")
+    parser.add_argument('-r', '--roi', dest='roi', type=int, nargs=4, default=None,
+                        metavar=('X', 'Y', 'WIDTH', 'HEIGHT'),
+                        help='peak ROI as left bottom corner, width and height in detector pixels')
+    parser.add_argument('-d', '--data-dir', dest='data_dir', default=None, help='directory of SPICE data files')
+    parser.add_argument('-w', '--work-dir', dest='work_dir', default=None,
+                        help='working directory for the binary detector counts cache. No cache if not given')
+    parser.add_argument('-o', '--output', dest='output', default=None, help='name of the result table file')
+    parser.add_argument('-j', '--workers', dest='workers', type=int, default=None,
+                        help='number of worker processes (default: 1)')
+    parser.add_argument('--detector-size', dest='detector_size', type=int, default=None,
+                        help='number of pixels on each side of the detector (default: {0})'
+                             ''.format(batch_reduction.DEFAULT_DETECTOR_SIZE))
+
+    return parser
+
+
+def parse_options(argv):
+    """ Merge the options from configuration file and command line arguments
+    :param argv: command line arguments without program name
+    :return: dictionary: option name -> value
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    option_dict = {'work_dir': None, 'output': None, 'workers': 1,
+                   'detector_size': batch_reduction.DEFAULT_DETECTOR_SIZE}
+    if args.config is not None:
+        try:
+            with open(args.config, 'r') as config_file:
+                config_dict = json.load(config_file)
+        except (IOError, ValueError) as config_err:
+            parser.error('Unable to read configuration file {0} due to {1}'.format(args.config, config_err))
+        unknown_keys = sorted(set(config_dict.keys()) - set(CONFIG_KEYS))
+        if len(unknown_keys) > 0:
+            parser.error('Unknown option(s) {0} in configuration file {1}'.format(unknown_keys, args.config))
+        option_dict.update(config_dict)
+    # END-IF
+
+    for key in CONFIG_KEYS:
+        if getattr(args, key) is not None:
+            option_dict[key] = getattr(args, key)
+
+    # check
+    for key in ['exp', 'scans', 'roi', 'data_dir']:
+        if option_dict.get(key, None) is None:
+            parser.error('Option {0} must be given in command line or configuration file'.format(key))
+
+    # JSON strings are unicode in python 2
+    for key in ['data_dir', 'work_dir', 'output']:
+        if option_dict[key] is not None:
+            option_dict[key] = str(option_dict[key])
+    if not isinstance(option_dict['scans'], (int, list)):
+        option_dict['scans'] = str(option_dict['scans'])
+    if os.path.isdir(option_dict['data_dir']) is False:
+        parser.error('Data directory {0} does not exist'.format(option_dict['data_dir']))
+    if isinstance(option_dict['scans'], int):
+        option_dict['scans'] = [option_dict['scans']]
+    if len(option_dict['roi']) != 4:
+        parser.error('ROI {0} must be given as [x, y, width, height]'.format(option_dict['roi']))
+
+    return option_dict
+
+
+def main(argv=None):
+    """ Reduce the scans
+    :param argv: command line arguments without program name.  None for sys.argv
+    :return: exit code: 0 if all scans are reduced, 1 otherwise
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    option_dict = parse_options(argv)
+
+    try:
+        result_table, error_dict = batch_reduction.reduce_scans(int(option_dict['exp']), option_dict['scans'],
+                                                                [int(x) for x in option_dict['roi']],
+                                                                option_dict['data_dir'],
+                                                                work_dir=option_dict['work_dir'],
+                                                                output_file_name=option_dict['output'],
+                                                                workers=int(option_dict['workers']),
+                                                                detector_size=int(option_dict['detector_size']))
+    except (RuntimeError, AssertionError) as run_err:
+        print('[ERROR] {0}'.format(run_err), file=sys.stderr)
+        return 1
+
+    num_scans = len(set(result_table['scan']))
+    print('Reduced {0} scan(s) to {1} polarization record(s).'.format(num_scans, result_table.shape[0]))
+    if option_dict['output'] is not None:
+        print('Result is written to {0}'.format(option_dict['output']))
+    for scan_number in sorted(error_dict.keys()):
+        print('[ERROR] Scan {0}: {1}'.format(scan_number, error_dict[scan_number]), file=sys.stderr)
+
+    if len(error_dict) > 0:
+        return 1
+
+    return 0
@@ -0,0 +1,200 @@
+"""
+Formula on the integrated counts of ROIs, such as 'roi0 - 0.5 * (roi0_upper_bkgd + roi0_lower_bkgd)'.
+The expression is parsed once into an AST that is restricted to arithmetic, numbers, variables and NumPy ufuncs,
+and evaluated for all Pts. at once with each variable bound to a whole column of counts.
+"""
+from __future__ import (absolute_import, division, print_function)
+import ast
+import numbers
+import re
+import numpy
+
+
+# functions that can be called in a formula
+FORMULA_FUNCTIONS = {'abs': numpy.abs, 'sqrt': numpy.sqrt, 'exp': numpy.exp, 'log': numpy.log,
+                     'log10': numpy.log10, 'sin': numpy.sin, 'cos': numpy.cos, 'tan': numpy.tan,
+                     'arcsin': numpy.arcsin, 'arccos': numpy.arccos, 'arctan': numpy.arctan,
+                     'arctan2': numpy.arctan2, 'minimum': numpy.minimum, 'maximum': numpy.maximum}
+# constants that can be used in a formula
+FORMULA_CONSTANTS = {'pi': numpy.pi, 'e': numpy.e}
+# largest absolute value of an exponent in a formula
+MAX_EXPONENT = 100
+
+# AST nodes allowed in a formula
+_OPERATOR_NODES = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub)
+_NUMBER_NODES = tuple(getattr(ast, name) for name in ['Num', 'Constant'] if hasattr(ast, name))
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load, ast.Call) + _OPERATOR_NODES + \
+                 _NUMBER_NODES
+
+
+def _get_number(number_node):
+    """ Get the value of a constant node of AST
+    :param number_node: ast.Num (python 2) or ast.Constant
+    :return:
+    """
+    if hasattr(ast, 'Constant') and isinstance(number_node, ast.Constant):
+        return number_node.value
+
+    return number_node.n
+
+
+def _set_number(number_node, value):
+    """ Set the value of a constant node of AST
+    :param number_node: ast.Num (python 2) or ast.Constant
+    :param value:
+    :return:
+    """
+    if hasattr(ast, 'Constant') and isinstance(number_node, ast.Constant):
+        number_node.value = value
+    else:
+        number_node.n = value
+
+    return
+
+
+def _is_real_number(number_node):
+    """ Check whether a constant node of AST is a real number (but not a string, complex or bool)
+    :param number_node: ast.Num (python 2) or ast.Constant
+    :return:
+    """
+    value = _get_number(number_node)
+
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _is_small_exponent(exponent_node):
+    """ Check whether the exponent of a power is a number (with sign) whose absolute value is not above
+    MAX_EXPONENT, such that a power cannot take forever as 9 ** 9 ** 9
+    :param exponent_node:
+    :return:
+    """
+    if isinstance(exponent_node, ast.UnaryOp) and isinstance(exponent_node.op, (ast.UAdd, ast.USub)):
+        exponent_node = exponent_node.operand
+
+    return isinstance(exponent_node, _NUMBER_NODES) and _is_real_number(exponent_node) and \
+        abs(_get_number(exponent_node)) <= MAX_EXPONENT
+
+
+def get_variable_name(column_name):
+    """ Get the name of the formula variable for a table column.  A ROI name starting with a digit, such as '0',
+    is prefixed by 'roi' and characters other than letters, digits and '_' are replaced by '_'
+    :param column_name:
+    :return:
+    """
+    variable_name = re.sub(r'\W', '_', str(column_name))
+    if variable_name[0].isdigit():
+        variable_name = 'roi{0}'.format(variable_name)
+
+    return variable_name
+
+
+class RoiFormula(object):
+    """
+    Parsed and compiled formula on columns of integrated counts
+    """
+    def __init__(self, expression):
+        """
+        initialization: parse, check and compile the expression
+        :param expression: formula such as 'roi1 - roi2 + 3 * (roi3)'
+        """
+        assert isinstance(expression, str), 'Formula {0} must be a string but not a {1}.' \
+                                            ''.format(expression, type(expression))
+
+        self._expression = expression.strip()
+        try:
+            syntax_tree = ast.parse(self._expression, mode='eval')
+        except SyntaxError as syntax_err:
+            raise RuntimeError('Unable to parse formula "{0}": {1}'.format(self._expression, syntax_err))
+
+        self._variableSet = self._check_syntax_tree(syntax_tree)
+        self._code = compile(syntax_tree, '<formula>', 'eval')
+
+        return
+
+    def __str__(self):
+        return self._expression
+
+    @property
+    def variables(self):
+        """
+        names of the variables used in formula
+        :return: sorted list
+        """
+        return sorted(self._variableSet)
+
+    def _check_syntax_tree(self, syntax_tree):
+        """
+        check that the syntax tree has nothing but arithmetic, numbers, variables and calls of FORMULA_FUNCTIONS
+        :param syntax_tree:
+        :return: set of variable names
+        """
+        variable_set = set()
+        function_node_set = set()
+        for node in ast.walk(syntax_tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise RuntimeError('{0} is not allowed in formula "{1}"'.format(node.__class__.__name__,
+                                                                                self._expression))
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS:
+                    raise RuntimeError('Only functions {0} can be called in formula "{1}"'
+                                       ''.format(sorted(FORMULA_FUNCTIONS.keys()), self._expression))
+                if len(node.keywords) > 0 or getattr(node, 'starargs', None) is not None \
+                        or getattr(node, 'kwargs', None) is not None:
+                    raise RuntimeError('Only positional arguments are allowed in formula "{0}"'
+                                       ''.format(self._expression))
+                function_node_set.add(node.func)
+            elif isinstance(node, ast.Name) and node not in function_node_set:
+                if node.id in FORMULA_FUNCTIONS:
+                    raise RuntimeError('Function {0} must be called in formula "{1}"'.format(node.id,
+                                                                                              self._expression))
+                if node.id not in FORMULA_CONSTANTS:
+                    variable_set.add(node.id)
+            elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) and \
+                    not _is_small_exponent(node.right):
+                raise RuntimeError('Exponent must be a number between -{0} and {0} in formula "{1}"'
+                                   ''.format(MAX_EXPONENT, self._expression))
+            elif isinstance(node, _NUMBER_NODES):
+                if not _is_real_number(node):
+                    raise RuntimeError('Only numbers are allowed as constants in formula "{0}"'
+                                       ''.format(self._expression))
+                # float arithmetic on constants, such as (9 ** 99) ** 99, overflows instead of growing integers
+                _set_number(node, float(_get_number(node)))
+        # END-FOR
+
+        return variable_set
+
+    def evaluate(self, column_dict):
+        """
+        evaluate the formula for all rows at once
+        :param column_dict: dictionary: variable name -> 1D array (or a number) of the column
+        :return: 1D float array with one value per row (or a number if all the columns are numbers)
+        """
+        assert isinstance(column_dict, dict), 'Columns {0} shall be given in a dictionary but not {1}' \
+                                              ''.format(column_dict, type(column_dict))
+
+        missing_list = sorted(self._variableSet - set(column_dict.keys()))
+        if len(missing_list) > 0:
+            raise RuntimeError('Variable(s) {0} in formula "{1}" are not defined. Available are {2}'
+                               ''.format(missing_list, self._expression, sorted(column_dict.keys())))
+
+        name_dict = dict(FORMULA_FUNCTIONS)
+        name_dict.update(FORMULA_CONSTANTS)
+        for var_name in self._variableSet:
+            name_dict[var_name] = numpy.asarray(column_dict[var_name], dtype='float64')
+
+        # division by zero gives inf or nan for that row
+        with numpy.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            try:
+                result = numpy.asarray(eval(self._code, {'__builtins__': {}}, name_dict), dtype='float64')
+            except ArithmeticError as arith_err:
+                # such as overflow or division by zero of constants
+                raise RuntimeError('Unable to evaluate formula "{0}": {1}'.format(self._expression, arith_err))
+
+        # a formula without variables has the same value for all the rows
+        row_numbers = [numpy.shape(column) for column in column_dict.values() if numpy.ndim(column) > 0]
+        if result.ndim == 0 and len(row_numbers) > 0:
+            result = numpy.full(row_numbers[0], float(result))
+        elif result.ndim == 0:
+            result = float(result)
+
+        return result
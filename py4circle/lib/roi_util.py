@@ -0,0 +1,158 @@
+"""
+Region of interest (ROI) helpers shared by the GUI and the batch reduction: automatic background ROIs around
+a peak ROI and conversion from detector pixel coordinates to detector counts matrix ranges
+"""
+from __future__ import (absolute_import, division, print_function)
+import math
+import six
+import numpy
+
+
+# suffixes of the background ROIs generated around a peak ROI
+UPPER_BKGD = 'upper_bkgd'
+LOWER_BKGD = 'lower_bkgd'
+LEFT_BKGD = 'left_bkgd'
+RIGHT_BKGD = 'right_bkgd'
+ENCIRCLE_BKGD = 'encircle'
+BKGD_TYPES = (UPPER_BKGD, LOWER_BKGD, LEFT_BKGD, RIGHT_BKGD, ENCIRCLE_BKGD)
+
+
+def _half(value):
+    """ half of a pixel dimension: integer division for integers as the ROIs are defined with python 2 """
+    if isinstance(value, six.integer_types):
+        return value // 2
+    return value / 2.
+
+
+def get_background_roi_name(roi_name, bkgd_type):
+    """ Form the name of a background ROI generated around a peak ROI
+    :param roi_name:
+    :param bkgd_type: one of UPPER_BKGD, LOWER_BKGD, LEFT_BKGD, RIGHT_BKGD and ENCIRCLE_BKGD
+    :return:
+    """
+    return '{}_{}'.format(roi_name, bkgd_type)
+
+
+def is_background_roi_name(roi_name):
+    """ Check whether a ROI is a background ROI generated around a peak ROI by its name
+    :param roi_name:
+    :return:
+    """
+    if not isinstance(roi_name, six.string_types):
+        return False
+
+    return any([roi_name.endswith('_' + bkgd_type) for bkgd_type in BKGD_TYPES])
+
+
+def add_background_rois(roi_dimension_dict):
+    """ Add the background ROIs (upper, lower, left, right and encircling) around each ROI
+    :param roi_dimension_dict: dictionary: ROI name -> [left bottom x, left bottom y, width, height] in pixels
+    :return: new dictionary with both the original and the background ROIs
+    """
+    assert isinstance(roi_dimension_dict, dict), 'ROI dimensions {0} must be given in a dictionary but not a {1}' \
+                                                 ''.format(roi_dimension_dict, type(roi_dimension_dict))
+
+    full_roi_dict = dict(roi_dimension_dict)
+    for roi_name in roi_dimension_dict:
+        left_bottom_x, left_bottom_y, width, height = roi_dimension_dict[roi_name]
+
+        # upper and lower backgrounds
+        full_roi_dict[get_background_roi_name(roi_name, UPPER_BKGD)] = [left_bottom_x, left_bottom_y + height,
+                                                                         width, _half(height)]
+        full_roi_dict[get_background_roi_name(roi_name, LOWER_BKGD)] = [left_bottom_x,
+                                                                         left_bottom_y - _half(height),
+                                                                         width, _half(height)]
+
+        # left and right backgrounds
+        full_roi_dict[get_background_roi_name(roi_name, LEFT_BKGD)] = [left_bottom_x - _half(width), left_bottom_y,
+                                                                        _half(width), height]
+        full_roi_dict[get_background_roi_name(roi_name, RIGHT_BKGD)] = [left_bottom_x + width, left_bottom_y,
+                                                                         _half(width), height]
+
+        # encircling background: same center and twice the area
+        new_width = int(width * math.sqrt(2.))
+        new_height = int(height * math.sqrt(2.))
+        full_roi_dict[get_background_roi_name(roi_name, ENCIRCLE_BKGD)] = [
+            left_bottom_x - _half(new_width - width), left_bottom_y - _half(new_height - height), new_width, new_height]
+    # END-FOR
+
+    return full_roi_dict
+
+
+def convert_roi_to_matrix_range(roi_dimension, detector_size):
+    """ Convert a ROI in detector pixel coordinates to the range of the detector counts matrix, which is cropped
+    by the detector boundary
+    :param roi_dimension: [left bottom x, left bottom y, width, height] in pixels
+    :param detector_size: number of pixels on each side of the detector
+    :return: 2-tuple as (((min_row, min_col), (max_row, max_col)), multiplication factor to compensate the cropping)
+    """
+    left_bottom_x, left_bottom_y, width, height = roi_dimension
+
+    # convert to numpy array range
+    min_row = (detector_size - 1) - int(left_bottom_y + height + 1)
+    min_col = int(left_bottom_x - 1)
+    max_row = min_row + int(height) + 2
+    max_col = int(min_col + width)
+
+    # check whether it is out of boundary
+    original_size = (max_row - min_row + 1) * (max_col - min_col + 1)
+    min_row = max(min_row, 0)
+    max_row = min(max_row, detector_size - 1)
+    min_col = max(min_col, 0)
+    max_col = min(max_col, detector_size - 1)
+    if max_row < min_row or max_col < min_col:
+        raise RuntimeError('ROI {0} is completely outside of detector of size {1}'.format(roi_dimension,
+                                                                                       detector_size))
+    new_size = (max_row - min_row + 1) * (max_col - min_col + 1)
+
+    return ((min_row, min_col), (max_row, max_col)), float(original_size) / float(new_size)
+
+
+def convert_rois_to_matrix_ranges(roi_dimension_dict, detector_size):
+    """ Convert a set of ROIs in detector pixel coordinates to the ranges of the detector counts matrix.
+    A background ROI completely outside of the detector (peak ROI at the edge of the detector) is integrated to
+    zero counts by an empty range and a zero multiplication factor, while a peak ROI outside of the detector is an
+    error
+    :param roi_dimension_dict: dictionary: ROI name -> [left bottom x, left bottom y, width, height] in pixels
+    :param detector_size: number of pixels on each side of the detector
+    :return: 2-tuple as (dictionary: ROI name -> ((min_row, min_col), (max_row, max_col)),
+             dictionary: ROI name -> multiplication factor)
+    """
+    matrix_range_dict = dict()
+    multiply_factor_dict = dict()
+    for roi_name in roi_dimension_dict:
+        try:
+            matrix_range_dict[roi_name], multiply_factor_dict[roi_name] = \
+                convert_roi_to_matrix_range(roi_dimension_dict[roi_name], detector_size)
+        except RuntimeError as run_err:
+            if not is_background_roi_name(roi_name):
+                raise
+            print('[WARNING] Background {0} is set to zero: {1}'.format(roi_name, run_err))
+            matrix_range_dict[roi_name] = (0, 0), (0, 0)
+            multiply_factor_dict[roi_name] = 0.
+    # END-FOR
+
+    return matrix_range_dict, multiply_factor_dict
+
+
+def get_background_models(roi_counts_dict, roi_name):
+    """ Get the peak counts and the background models for polarization calculation from the integrated counts
+    of a peak ROI and its background ROIs
+    :param roi_counts_dict: dictionary: ROI name -> (pt number list, counts vector)
+    :param roi_name: name of the peak ROI
+    :return: 2-tuple as (peak counts vector, dictionary: model name -> (first background counts,
+             second background counts))
+    """
+    peak_count_vec = roi_counts_dict[roi_name][1]
+
+    # encircling ROI contains the peak ROI
+    outer_bkgd_count_vec = roi_counts_dict[get_background_roi_name(roi_name, ENCIRCLE_BKGD)][1] - peak_count_vec
+    zero_count_vec = numpy.zeros(shape=outer_bkgd_count_vec.shape, dtype=outer_bkgd_count_vec.dtype)
+
+    bkgd_model_dict = {'vertical': (roi_counts_dict[get_background_roi_name(roi_name, UPPER_BKGD)][1],
+                                    roi_counts_dict[get_background_roi_name(roi_name, LOWER_BKGD)][1]),
+                       'horizontal': (roi_counts_dict[get_background_roi_name(roi_name, LEFT_BKGD)][1],
+                                      roi_counts_dict[get_background_roi_name(roi_name, RIGHT_BKGD)][1]),
+                       'outer': (outer_bkgd_count_vec, zero_count_vec)}
+
+    return peak_count_vec, bkgd_model_dict
@@ -0,0 +1,290 @@
+"""
+Live "tail" mode: watch the SPICE data directory for new detector XML files of a scan during beam time, and
+integrate the ROIs (and polarization of completed spin pairs) of each new Pt. incrementally such that the cost
+per Pt. does not depend on the length of the scan
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import re
+import threading
+import numpy
+from py4circle.lib import fourcircle_utility
+from py4circle.lib import integral_image
+from py4circle.lib import polarization
+from py4circle.lib import roi_util
+try:
+    import pyinotify
+except ImportError:
+    # fall back to poll the data directory
+    pyinotify = None
+
+
+# seconds between 2 checks of the data directory without inotify
+DEFAULT_POLL_INTERVAL = 2.
+
+
+class ScanWatcher(object):
+    """
+    Background thread to follow a scan in progress.  New Pts. are found by inotify if pyinotify is available
+    or by polling for the next Pt. file otherwise.  Each update is passed to a callback as a dictionary with keys
+    'pts' (new pt numbers), 'counts' (ROI name -> integrated counts of the new Pts.) and 'polarization'
+    (model name -> polarization structured array of the new spin pairs).
+    The callbacks are called from the watcher thread.
+    """
+    def __init__(self, processor, exp_number, scan_number, roi_range_dict, multiply_factor_dict=None,
+                 peak_roi_name=None, update_callback=None, integrated_counts_dict=None,
+                 poll_interval=DEFAULT_POLL_INTERVAL, error_callback=None):
+        """
+        initialization
+        :param processor: FourCirclePolarizedNeutronProcessor instance with data directory set up
+        :param exp_number:
+        :param scan_number:
+        :param roi_range_dict: dictionary: ROI name -> ((min_row, min_col), (max_row, max_col))
+        :param multiply_factor_dict: dictionary: ROI name -> multiplication factor.  None for no factor
+        :param peak_roi_name: name of the peak ROI whose background ROIs are in roi_range_dict to calculate
+                              polarization.  None for not calculating polarization
+        :param update_callback: method to call with the update dictionary
+        :param integrated_counts_dict: dictionary: ROI name -> (pt list, counts vector) of the Pts. that have
+                                       been integrated already.  None to start from the first Pt.
+        :param poll_interval: seconds between 2 checks of the data directory
+        :param error_callback: method to call with the error message if an update fails.  The watcher keeps on
+                               watching after an error
+        """
+        assert isinstance(roi_range_dict, dict), 'ROI ranges {0} must be given in a dictionary but not a {1}' \
+                                                 ''.format(roi_range_dict, type(roi_range_dict))
+        assert processor.data_dir is not None, 'Data directory of the processor must be set up'
+
+        self._processor = processor
+        self._expNumber = exp_number
+        self._scanNumber = scan_number
+        self._dataDir = processor.data_dir
+        self._peakROIName = peak_roi_name
+        self._updateCallback = update_callback
+        self._pollInterval = poll_interval
+        self._errorCallback = error_callback
+
+        # ROIs as (min_row, min_col, max_row, max_col) in a fixed order
+        self._roiNameList = list(roi_range_dict.keys())
+        self._roiRangeList = [(roi_range_dict[roi_name][0][0], roi_range_dict[roi_name][0][1],
+                               roi_range_dict[roi_name][1][0], roi_range_dict[roi_name][1][1])
+                              for roi_name in self._roiNameList]
+        if multiply_factor_dict is None:
+            self._multiplyFactorVec = numpy.ones(len(self._roiNameList))
+        else:
+            self._multiplyFactorVec = numpy.array([multiply_factor_dict[roi_name]
+                                                   for roi_name in self._roiNameList])
+
+        # integrated Pts.: counts are kept in lists such that appending a Pt. is O(1)
+        self._ptNumberList = list()
+        self._countsDict = dict([(roi_name, list()) for roi_name in self._roiNameList])
+        if integrated_counts_dict is not None:
+            self._ptNumberList = list(integrated_counts_dict[self._roiNameList[0]][0])
+            for roi_name in self._roiNameList:
+                self._countsDict[roi_name] = list(integrated_counts_dict[roi_name][1])
+        # number of spin pairs whose polarization has been calculated
+        self._numPairs = len(self._ptNumberList) // 2
+        # Pts. are written in order: polling checks the XML file of the next Pt. instead of listing the directory
+        self._nextPtNumber = max(self._ptNumberList) + 1 if len(self._ptNumberList) > 0 else 1
+
+        # new XML files reported by inotify
+        self._xmlNamePattern = re.compile(r'^{0}_exp{1}_scan{2:04}_(\d+)\.xml$'
+                                          ''.format(processor.instrument_name, exp_number, scan_number))
+        self._newPtSet = set()
+        self._lock = threading.Lock()
+        self._wakeEvent = threading.Event()
+        self._stopped = False
+        self._notifier = None
+
+        self._thread = threading.Thread(target=self._run, name='ScanWatcher')
+        self._thread.daemon = True
+
+        return
+
+    def _find_new_pts(self):
+        """
+        find the Pts. that are not integrated yet
+        :return: sorted list of pt numbers
+        """
+        with self._lock:
+            new_pt_set = self._newPtSet
+            self._newPtSet = set()
+
+        if self._notifier is None:
+            # polling
+            while os.path.exists(os.path.join(self._dataDir, fourcircle_utility.get_det_xml_file_name(
+                    self._processor.instrument_name, self._expNumber, self._scanNumber, self._nextPtNumber))):
+                new_pt_set.add(self._nextPtNumber)
+                self._nextPtNumber += 1
+        # END-IF
+
+        integrated_pt_set = set(self._ptNumberList)
+
+        return sorted([pt_number for pt_number in new_pt_set if pt_number not in integrated_pt_set])
+
+    def _integrate_pt(self, pt_number):
+        """
+        integrate all ROIs of one Pt.
+        :param pt_number:
+        :return: 1D array of integrated counts in the order of ROI names
+        """
+        count_matrix = self._processor.load_spice_xml_file2(self._expNumber, self._scanNumber, pt_number)
+        pt_integral = integral_image.build_integral_image(count_matrix)
+
+        return integral_image.sum_rectangles(pt_integral, self._roiRangeList).astype('float') * \
+            self._multiplyFactorVec
+
+    def _calculate_new_pairs(self):
+        """
+        calculate polarization of the spin pairs completed since last time
+        :return: dictionary: model name -> polarization structured array, or None if there is no new pair
+        """
+        if self._peakROIName is None or len(self._ptNumberList) // 2 <= self._numPairs:
+            return None
+
+        start_index = 2 * self._numPairs
+        stop_index = 2 * (len(self._ptNumberList) // 2)
+        pair_pt_list = self._ptNumberList[start_index:stop_index]
+        try:
+            hkl_matrix = self._processor.get_pt_hkl_matrix(self._expNumber, self._scanNumber, pair_pt_list)
+        except (KeyError, RuntimeError):
+            # SPICE scan file is updated after the detector files: reload it and try again in next update
+            self._processor.load_spice_scan_file(self._expNumber, self._scanNumber, reload=True)
+            return None
+
+        pair_counts_dict = dict([(roi_name, (pair_pt_list, numpy.array(self._countsDict[roi_name][start_index:
+                                                                                                   stop_index])))
+                                 for roi_name in self._roiNameList])
+        peak_count_vec, bkgd_model_dict = roi_util.get_background_models(pair_counts_dict, self._peakROIName)
+        self._numPairs = stop_index // 2
+        try:
+            pol_array_dict = polarization.calculate_flipping_ratios_models(pair_pt_list, hkl_matrix,
+                                                                           peak_count_vec, bkgd_model_dict)
+        except RuntimeError as run_err:
+            # HKL of spin up and down do not match: skip these pairs
+            print('[ERROR] Exp {0} Scan {1}: {2}'.format(self._expNumber, self._scanNumber, run_err))
+            return None
+
+        return pol_array_dict
+
+    def _run(self):
+        """
+        check the data directory until it is stopped
+        :return:
+        """
+        while not self._stopped:
+            try:
+                self.update()
+            except Exception as run_err:
+                # any error of one update must not stop watching
+                error_message = 'Unable to update Exp {0} Scan {1} due to {2}'.format(self._expNumber,
+                                                                                     self._scanNumber, run_err)
+                print('[ERROR] {0}'.format(error_message))
+                if self._errorCallback is not None:
+                    self._errorCallback(error_message)
+            self._wakeEvent.wait(self._pollInterval)
+            self._wakeEvent.clear()
+        # END-WHILE
+
+    def _start_notifier(self):
+        """
+        start inotify on the data directory
+        :return:
+        """
+        watcher = self
+
+        class XMLFileHandler(pyinotify.ProcessEvent):
+            def process_default(self, event):
+                match = watcher._xmlNamePattern.match(event.name)
+                if match is not None:
+                    with watcher._lock:
+                        watcher._newPtSet.add(int(match.group(1)))
+                    watcher._wakeEvent.set()
+        # END-CLASS
+
+        watch_manager = pyinotify.WatchManager()
+        self._notifier = pyinotify.ThreadedNotifier(watch_manager, XMLFileHandler())
+        self._notifier.daemon = True
+        self._notifier.start()
+        watch_manager.add_watch(self._dataDir, pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO)
+
+        # the Pts. written before inotify starts are found by listing the directory once
+        for file_name in os.listdir(self._dataDir):
+            match = self._xmlNamePattern.match(file_name)
+            if match is not None:
+                self._newPtSet.add(int(match.group(1)))
+
+        return
+
+    def start(self):
+        """
+        start watching
+        :return:
+        """
+        if pyinotify is not None:
+            self._start_notifier()
+        self._thread.start()
+
+        return
+
+    def stop(self):
+        """
+        stop watching
+        :return:
+        """
+        self._stopped = True
+        self._wakeEvent.set()
+        if self._notifier is not None:
+            self._notifier.stop()
+            self._notifier = None
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+        return
+
+    def update(self):
+        """
+        integrate the new Pts. and calculate polarization of the new spin pairs, and then call back
+        :return: update dictionary or None if there is no new Pt.
+        """
+        new_pt_list = list()
+        found_pt_list = self._find_new_pts()
+        for pt_index, pt_number in enumerate(found_pt_list):
+            try:
+                roi_counts_vec = self._integrate_pt(pt_number)
+            except RuntimeError as run_err:
+                # XML file is being written: try again with all the following Pts. in next update
+                print('[INFO] Exp {0} Scan {1} Pt {2} is not ready: {3}'
+                      ''.format(self._expNumber, self._scanNumber, pt_number, run_err))
+                with self._lock:
+                    self._newPtSet.update(found_pt_list[pt_index:])
+                break
+            except Exception:
+                # Pts. that are found already are integrated again in next update
+                with self._lock:
+                    self._newPtSet.update(found_pt_list[pt_index:])
+                raise
+
+            self._ptNumberList.append(pt_number)
+            for roi_index, roi_name in enumerate(self._roiNameList):
+                self._countsDict[roi_name].append(roi_counts_vec[roi_index])
+            new_pt_list.append(pt_number)
+        # END-FOR
+
+        pol_array_dict = self._calculate_new_pairs()
+        if len(new_pt_list) == 0 and pol_array_dict is None:
+            return None
+
+        num_new = len(new_pt_list)
+        update_dict = {'pts': new_pt_list,
+                       'counts': dict([(roi_name, numpy.array(self._countsDict[roi_name][len(self._ptNumberList) -
+                                                                                         num_new:]))
+                                       for roi_name in self._roiNameList]),
+                       'polarization': pol_array_dict}
+        if self._updateCallback is not None:
+            self._updateCallback(update_dict)
+
+        return update_dict
+
+    @property
+    def pt_numbers(self):
+        return self._ptNumberList[:]
@@ -0,0 +1,157 @@
+"""
+Native reader of SPICE scan (.dat) ASCII files.  A scan file is read in one pass to a column-oriented table
+(column name -> numpy array) with the header/footer metadata, without creating any Mantid workspace.
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import numpy
+
+
+# comment line followed by the one with the column names
+COLUMN_HEADER_KEY = 'col_headers'
+# column holding Pt. numbers, which are integers
+PT_COLUMN = 'Pt.'
+
+
+class SpiceTable(object):
+    """
+    Column-oriented SPICE scan table.  getColumnNames(), rowCount() and cell() follow Mantid's TableWorkspace
+    such that it can be used in place of the table workspace loaded by LoadSpiceAscii.
+    """
+    def __init__(self, column_names, column_dict, metadata_dict, file_name=None):
+        """
+        initialization
+        :param column_names: list of column names in the order of the file
+        :param column_dict: dictionary: column name -> 1D numpy array
+        :param metadata_dict: dictionary: key -> value (string) from '# key = value' lines
+        :param file_name: SPICE file name
+        """
+        assert isinstance(column_names, list), 'Column names {0} must be given in a list but not a {1}' \
+                                               ''.format(column_names, type(column_names))
+
+        self._columnNames = column_names
+        self._columnDict = column_dict
+        self._metadataDict = metadata_dict
+        self._fileName = file_name
+
+        if len(column_names) > 0:
+            self._numRows = column_dict[column_names[0]].shape[0]
+        else:
+            self._numRows = 0
+
+        return
+
+    def __contains__(self, column_name):
+        return column_name in self._columnDict
+
+    def cell(self, row_index, column_index):
+        """
+        get the value of a cell as a python scalar
+        :param row_index:
+        :param column_index: column index or column name
+        :return:
+        """
+        if isinstance(column_index, int):
+            column_index = self._columnNames[column_index]
+
+        return self._columnDict[column_index][row_index].item()
+
+    def column(self, column_name):
+        """
+        get a column
+        :param column_name:
+        :return: 1D numpy array
+        """
+        try:
+            return self._columnDict[column_name]
+        except KeyError:
+            raise KeyError('Column {0} does not exist in SPICE table {1}. Available columns: {2}'
+                           ''.format(column_name, self._fileName, self._columnNames))
+
+    def getColumnNames(self):
+        return self._columnNames[:]
+
+    def rowCount(self):
+        return self._numRows
+
+    @property
+    def file_name(self):
+        return self._fileName
+
+    @property
+    def metadata(self):
+        return self._metadataDict
+
+
+def _convert_column(column_name, value_list):
+    """ Convert the string values of a column to a numpy array: integer for Pt., float if possible, or string
+    :param column_name:
+    :param value_list:
+    :return:
+    """
+    str_array = numpy.array(value_list)
+    try:
+        if column_name == PT_COLUMN:
+            return str_array.astype('int64')
+        return str_array.astype('float64')
+    except ValueError:
+        return str_array
+
+
+def read_spice_ascii(file_name):
+    """ Read a SPICE scan file
+    :param file_name:
+    :return: SpiceTable
+    """
+    assert isinstance(file_name, str), 'SPICE file name {0} must be a string but not a {1}' \
+                                       ''.format(file_name, type(file_name))
+    if os.path.exists(file_name) is False:
+        raise RuntimeError('SPICE file {0} does not exist.'.format(file_name))
+
+    with open(file_name, 'r') as spice_file:
+        raw_lines = spice_file.readlines()
+
+    metadata_dict = dict()
+    column_names = None
+    data_rows = list()
+    next_is_header = False
+    for raw_line in raw_lines:
+        line = raw_line.strip()
+        if len(line) == 0:
+            continue
+
+        if line.startswith('#'):
+            line = line[1:].strip()
+            if next_is_header:
+                column_names = line.split()
+                next_is_header = False
+            elif '=' in line:
+                key, value = line.split('=', 1)
+                key = key.strip()
+                if key == COLUMN_HEADER_KEY:
+                    next_is_header = True
+                else:
+                    metadata_dict[key] = value.strip()
+        else:
+            data_rows.append(line.split())
+    # END-FOR
+
+    if column_names is None:
+        raise RuntimeError('SPICE file {0} does not have column headers.'.format(file_name))
+
+    # check rows and convert each column in one go
+    num_columns = len(column_names)
+    for row_index, row_values in enumerate(data_rows):
+        if len(row_values) != num_columns:
+            raise RuntimeError('SPICE file {0}: data row {1} has {2} values but there are {3} columns.'
+                               ''.format(file_name, row_index, len(row_values), num_columns))
+
+    if len(data_rows) > 0:
+        column_values = list(zip(*data_rows))
+    else:
+        column_values = [tuple()] * num_columns
+    column_dict = dict()
+    for column_index, column_name in enumerate(column_names):
+        column_dict[column_name] = _convert_column(column_name, list(column_values[column_index]))
+
+    return SpiceTable(column_names, column_dict, metadata_dict, file_name)
@@ -0,0 +1,308 @@
+"""
+Survey of the strongest reflection of each scan in an experiment.  SPICE scan files are found with one
+directory listing and summarized by a pool of worker processes.  The summaries are kept in a CSV index file
+with the modification time and size of each SPICE file such that a re-survey only reads new or changed scans.
+"""
+from __future__ import (absolute_import, division, print_function)
+import csv
+import math
+import multiprocessing
+import os
+import re
+import numpy
+from py4circle.lib import spice_table
+from py4circle.lib.fourcircle_utility import get_hb3a_wavelength, is_peak_nuclear_array
+
+
+# columns of the index file.  The summary of a scan is [max count, scan, max row, h, k, l, Q, T-sample]
+INDEX_COLUMNS = ['scan', 'mtime', 'size', 'max_count', 'max_row', 'h', 'k', 'l', 'q_range', 'tsample']
+
+# record of a scan summary, in the order of the summary list
+SURVEY_DTYPE = numpy.dtype([('counts', 'f8'), ('scan', 'i8'), ('pt', 'i8'), ('h', 'f8'), ('k', 'f8'), ('l', 'f8'),
+                            ('q', 'f8'), ('temperature', 'f8')])
+# scans within this distance from the HKL to find are kept by filter_survey()
+SURVEY_HKL_TOLERANCE = 0.1
+# peak types to filter the survey by
+PEAK_NUCLEAR = 'nuclear'
+PEAK_MAGNETIC = 'magnetic'
+
+
+def get_index_file_name(instrument_name, exp_number):
+    """ Form the name of the survey index file of an experiment
+    :param instrument_name:
+    :param exp_number:
+    :return:
+    """
+    return '{0}_exp{1:04}_survey.csv'.format(instrument_name, exp_number)
+
+
+def list_scan_files(data_dir, instrument_name, exp_number):
+    """ Find all SPICE scan files of an experiment in a directory
+    :param data_dir:
+    :param instrument_name:
+    :param exp_number:
+    :return: dictionary: scan number -> SPICE file name with full path
+    """
+    name_pattern = re.compile(r'^{0}_exp{1:04}_scan(\d+)\.dat$'.format(instrument_name, exp_number))
+
+    scan_file_dict = dict()
+    for file_name in os.listdir(data_dir):
+        match = name_pattern.match(file_name)
+        if match is not None:
+            scan_file_dict[int(match.group(1))] = os.path.join(data_dir, file_name)
+    # END-FOR
+
+    return scan_file_dict
+
+
+def summarize_scan(task):
+    """ Find the Pt. with the maximum detector counts of a scan.  It runs in a worker process.
+    :param task: 2-tuple as (scan number, SPICE file name)
+    :return: 3-tuple as (scan number, summary list or None, error message)
+    """
+    scan_number, spice_file_name = task
+
+    try:
+        scan_table = spice_table.read_spice_ascii(spice_file_name)
+    except (RuntimeError, IOError) as run_err:
+        return scan_number, None, 'Scan %d: %s\n' % (scan_number, str(run_err))
+
+    num_rows = scan_table.rowCount()
+    if num_rows == 0:
+        # it is an empty table
+        return scan_number, None, 'Scan %d: empty spice table.\n' % scan_number
+
+    col_name_list = scan_table.getColumnNames()
+    try:
+        for col_name in ['h', 'k', 'l', '2theta', 'm1']:
+            col_name_list.index(col_name)
+    except ValueError as value_err:
+        # Unable to import a SPICE file without necessary information
+        return scan_number, None, 'Scan %d: unable to locate column h, k, or l. See %s.' % (scan_number,
+                                                                                             str(value_err))
+
+    max_count = 0
+    max_row = 0
+    max_h = max_k = max_l = 0
+    max_tsample = 0.
+    two_theta = m1 = -1
+
+    # the first Pt. with the maximum (positive) detector counts
+    det_count_vec = scan_table.column(col_name_list[5])
+    i_row = int(numpy.argmax(det_count_vec))
+    if det_count_vec[i_row] > max_count:
+        max_count = scan_table.cell(i_row, 5)
+        max_row = i_row
+        max_h = scan_table.cell(i_row, 'h')
+        max_k = scan_table.cell(i_row, 'k')
+        max_l = scan_table.cell(i_row, 'l')
+        two_theta = scan_table.cell(i_row, '2theta')
+        m1 = scan_table.cell(i_row, 'm1')
+        # t-sample is not a mandatory sample log in SPICE
+        if 'tsample' in scan_table:
+            max_tsample = scan_table.cell(i_row, 'tsample')
+    # END-IF
+
+    # calculate wavelength
+    wavelength = get_hb3a_wavelength(m1)
+    if wavelength is None:
+        q_range = 0.
+        print('[ERROR] Scan number {0} has invalid m1 for wavelength.'.format(scan_number))
+    else:
+        q_range = 4.*math.pi*math.sin(two_theta/180.*math.pi*0.5)/wavelength
+
+    return scan_number, [max_count, scan_number, max_row, max_h, max_k, max_l, q_range, max_tsample], ''
+
+
+def load_index(index_file_name):
+    """ Load the survey index file
+    :param index_file_name:
+    :return: dictionary: scan number -> ((mtime, size), summary list)
+    """
+    index_dict = dict()
+    if index_file_name is None or os.path.exists(index_file_name) is False:
+        return index_dict
+
+    try:
+        with open(index_file_name, 'r') as index_file:
+            for row in csv.DictReader(index_file):
+                scan_number = int(row['scan'])
+                summary = [float(row['max_count']), scan_number, int(row['max_row']), float(row['h']),
+                           float(row['k']), float(row['l']), float(row['q_range']), float(row['tsample'])]
+                index_dict[scan_number] = (float(row['mtime']), int(row['size'])), summary
+    except (IOError, KeyError, ValueError) as index_err:
+        # a broken index is rebuilt
+        print('[WARNING] Unable to read survey index {0} due to {1}'.format(index_file_name, index_err))
+        index_dict = dict()
+
+    return index_dict
+
+
+def save_index(index_file_name, index_dict):
+    """ Save the survey index file
+    :param index_file_name:
+    :param index_dict: dictionary: scan number -> ((mtime, size), summary list)
+    :return:
+    """
+    with open(index_file_name, 'w') as index_file:
+        index_writer = csv.writer(index_file)
+        index_writer.writerow(INDEX_COLUMNS)
+        for scan_number in sorted(index_dict.keys()):
+            (mtime, size), summary = index_dict[scan_number]
+            max_count, scan_number, max_row, max_h, max_k, max_l, q_range, max_tsample = summary
+            # repr() keeps the full precision of modification time
+            index_writer.writerow([scan_number, repr(mtime), size, repr(max_count), max_row, repr(max_h),
+                                   repr(max_k), repr(max_l), repr(q_range), repr(max_tsample)])
+    # END-WITH
+
+    return
+
+
+def survey_experiment(data_dir, instrument_name, exp_number, start_scan, end_scan, index_file_name=None,
+                      workers=None, progress_callback=None):
+    """ Survey the strongest reflection of each scan in a range
+    :param data_dir: directory of SPICE files
+    :param instrument_name:
+    :param exp_number:
+    :param start_scan:
+    :param end_scan:
+    :param index_file_name: survey index file to read and update.  None for not using an index
+    :param workers: number of worker processes.  None for the number of CPUs
+    :param progress_callback: method called as (number of read scans, number of scans to read) after each scan.
+                              An exception raised by it stops the workers and is passed on.
+    :return: 2-tuple as (list of summary [max count, scan, max row, h, k, l, Q, T-sample] in the order of scans,
+             error message)
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    assert isinstance(workers, int) and workers > 0, 'Number of workers {0} must be a positive integer.' \
+                                                     ''.format(workers)
+
+    scan_file_dict = list_scan_files(data_dir, instrument_name, exp_number)
+    index_dict = load_index(index_file_name)
+
+    # find out the scans that are new or changed since last survey
+    task_list = list()
+    signature_dict = dict()
+    for scan_number in sorted(scan_file_dict.keys()):
+        if scan_number < start_scan or scan_number > end_scan:
+            continue
+        file_stat = os.stat(scan_file_dict[scan_number])
+        signature_dict[scan_number] = file_stat.st_mtime, file_stat.st_size
+        if scan_number not in index_dict or index_dict[scan_number][0] != signature_dict[scan_number]:
+            task_list.append((scan_number, scan_file_dict[scan_number]))
+    # END-FOR
+
+    # summarize in parallel
+    result_list = list()
+    if workers > 1 and len(task_list) > 1:
+        worker_pool = multiprocessing.Pool(processes=min(workers, len(task_list)))
+        try:
+            for result in worker_pool.imap(summarize_scan, task_list):
+                result_list.append(result)
+                if progress_callback is not None:
+                    progress_callback(len(result_list), len(task_list))
+        except BaseException:
+            worker_pool.terminate()
+            raise
+        else:
+            worker_pool.close()
+        finally:
+            worker_pool.join()
+    else:
+        for task in task_list:
+            result_list.append(summarize_scan(task))
+            if progress_callback is not None:
+                progress_callback(len(result_list), len(task_list))
+    # END-IF-ELSE
+
+    error_message = ''
+    for scan_number, summary, scan_error in result_list:
+        if summary is None:
+            index_dict.pop(scan_number, None)
+            error_message += scan_error
+        else:
+            index_dict[scan_number] = signature_dict[scan_number], summary
+    # END-FOR
+
+    if index_file_name is not None and len(result_list) > 0:
+        try:
+            save_index(index_file_name, index_dict)
+        except (IOError, OSError) as io_err:
+            print('[WARNING] Unable to write survey index {0} due to {1}'.format(index_file_name, io_err))
+
+    scan_sum_list = [index_dict[scan_number][1] for scan_number in sorted(signature_dict.keys())
+                     if scan_number in index_dict]
+
+    return scan_sum_list, error_message
+
+
+def create_survey_array(scan_sum_list):
+    """ Convert the scan summaries of a survey to a record array
+    :param scan_sum_list: list of summary [max count, scan, max row, h, k, l, Q, T-sample]
+    :return: structured array of SURVEY_DTYPE
+    """
+    return numpy.array([tuple(summary) for summary in scan_sum_list], dtype=SURVEY_DTYPE)
+
+
+def filter_survey(survey_array, start_scan=None, end_scan=None, min_counts=None, max_counts=None, hkl=None,
+                  hkl_tolerance=SURVEY_HKL_TOLERANCE, peak_type=None, magnetic_tolerance=0.2):
+    """ Find the scans of a survey within the ranges of scan number and maximum counts, close to an HKL and of
+    nuclear or magnetic peaks
+    :param survey_array: structured array with (at least) the fields of SURVEY_DTYPE
+    :param start_scan: None for no lower limit
+    :param end_scan: None for no upper limit
+    :param min_counts: None for no lower limit
+    :param max_counts: None for no upper limit
+    :param hkl: 3-tuple of the HKL to find.  None for any HKL
+    :param hkl_tolerance: maximum distance from hkl
+    :param peak_type: PEAK_NUCLEAR or PEAK_MAGNETIC.  None for both
+    :param magnetic_tolerance: a peak is magnetic if any of its HKL is not within this tolerance to an integer
+    :return: 1D array of the row indexes in survey_array
+    """
+    keep_mask = numpy.ones(survey_array.shape[0], dtype=bool)
+    if start_scan is not None:
+        keep_mask &= survey_array['scan'] >= start_scan
+    if end_scan is not None:
+        keep_mask &= survey_array['scan'] <= end_scan
+    if min_counts is not None:
+        keep_mask &= survey_array['counts'] >= min_counts
+    if max_counts is not None:
+        keep_mask &= survey_array['counts'] <= max_counts
+    if hkl is not None:
+        assert len(hkl) == 3, 'HKL {0} must have 3 values'.format(hkl)
+        distance_sq = (survey_array['h'] - hkl[0]) ** 2 + (survey_array['k'] - hkl[1]) ** 2 + \
+                      (survey_array['l'] - hkl[2]) ** 2
+        keep_mask &= distance_sq <= hkl_tolerance ** 2
+    if peak_type is not None:
+        if peak_type not in [PEAK_NUCLEAR, PEAK_MAGNETIC]:
+            raise RuntimeError('Peak type {0} is not supported. Supported are {1}'
+                               ''.format(peak_type, [PEAK_NUCLEAR, PEAK_MAGNETIC]))
+        nuclear_mask = is_peak_nuclear_array(numpy.column_stack((survey_array['h'], survey_array['k'],
+                                                                 survey_array['l'])), magnetic_tolerance)
+        if peak_type == PEAK_NUCLEAR:
+            keep_mask &= nuclear_mask
+        else:
+            keep_mask &= ~nuclear_mask
+    # END-IF
+
+    return numpy.nonzero(keep_mask)[0]
+
+
+def sort_survey(survey_array, row_indexes, sort_by, descending=False):
+    """ Order rows of a survey by a column.  Rows with the same value keep their order
+    :param survey_array: structured array
+    :param row_indexes: 1D array of the row indexes to order, such as from filter_survey()
+    :param sort_by: field name
+    :param descending:
+    :return: 1D array of the row indexes in order
+    """
+    if sort_by not in survey_array.dtype.names:
+        raise RuntimeError('Survey cannot be sorted by {0}. Fields are {1}'.format(sort_by, survey_array.dtype.names))
+
+    values = survey_array[sort_by][row_indexes]
+    if descending:
+        values = -values
+    order = numpy.argsort(values, kind='mergesort')
+
+    return numpy.asarray(row_indexes)[order]
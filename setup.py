@@ -134,7 +134,7 @@ if __name__ == "__main__":
     """
     main
     """
-    scripts = ['scripts/four']
+    scripts = ['scripts/four', 'scripts/py4circle-reduce']
     test_scripts = [ ]
     scripts.extend(test_scripts)
 
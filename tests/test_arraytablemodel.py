@@ -0,0 +1,51 @@
+"""
+Table model over a structured array.  The tests are skipped if Qt is not available
+"""
+from __future__ import (absolute_import, division, print_function)
+import unittest
+import numpy
+try:
+    from PyQt5 import QtCore
+except ImportError:
+    try:
+        from PyQt4 import QtCore
+    except ImportError:
+        raise unittest.SkipTest('PyQt is not available')
+from py4circle.interface.gui.arraytablemodel import ArrayTableModel
+
+
+class TestSortRows(unittest.TestCase):
+    """
+    stable sort: rows with the same value keep their order in both directions
+    """
+    def setUp(self):
+        self._model = ArrayTableModel()
+        data_array = numpy.zeros(6, dtype=[('Scan', 'int64'), ('Counts', 'float64'), ('Pt', 'uint32'),
+                                           ('Selected', 'bool'), ('Type', 'S8')])
+        data_array['Scan'] = [1, 2, 3, 4, 5, 6]
+        data_array['Counts'] = [5., 7., 5., 9., 7., 5.]
+        data_array['Pt'] = [5, 7, 5, 9, 7, 5]
+        data_array['Selected'] = [True, False, True, False, False, True]
+        data_array['Type'] = [b'b', b'a', b'b', b'c', b'a', b'b']
+        self._model.set_array(data_array)
+
+    def get_scans(self):
+        """ Get the scan numbers in the order shown
+        :return:
+        """
+        return list(self._model.array['Scan'][self._model.get_record_indexes()])
+
+    def test_ascending(self):
+        self._model.sort_rows('Counts')
+        self.assertEqual(self.get_scans(), [1, 3, 6, 2, 5, 4])
+
+    def test_descending(self):
+        for column_name in ['Counts', 'Pt']:
+            self._model.sort_rows(column_name, descending=True)
+            self.assertEqual(self.get_scans(), [4, 2, 5, 1, 3, 6])
+
+    def test_descending_others(self):
+        self._model.sort_rows('Selected', descending=True)
+        self.assertEqual(self.get_scans(), [1, 3, 6, 2, 4, 5])
+        self._model.sort_rows('Type', descending=True)
+        self.assertEqual(self.get_scans(), [4, 1, 3, 6, 2, 5])
@@ -0,0 +1,81 @@
+"""
+Bulk extraction of detector counts from a Mantid workspace against the original per-spectrum loop, on the
+detector sizes of HB3A (256 x 256) and of the upgraded detector (512 x 512)
+"""
+from __future__ import (absolute_import, division, print_function)
+import time
+import unittest
+import numpy
+from py4circle.lib import detector_workspace
+
+
+def create_detector_workspace(det_size):
+    """ Create a workspace with one single-bin spectrum per pixel as LoadSpiceXML2DDet does
+    :param det_size:
+    :return: MatrixWorkspace
+    """
+    try:
+        from mantid import simpleapi
+    except ImportError:
+        raise unittest.SkipTest('Mantid is not available')
+
+    num_pixels = det_size * det_size
+    y_values = numpy.random.randint(0, 1000, size=num_pixels).astype('float')
+
+    return simpleapi.CreateWorkspace(DataX=numpy.zeros(num_pixels), DataY=y_values, NSpec=num_pixels,
+                                     OutputWorkspace='test_detector_{0}'.format(det_size), EnableLogging=False)
+
+
+def extract_detector_counts_by_pixel(matrix_ws, det_size):
+    """ The original pixel-by-pixel extraction with one readY() call per pixel
+    :param matrix_ws:
+    :param det_size:
+    :return:
+    """
+    array2d = numpy.ndarray(shape=(det_size, det_size), dtype='float')
+    for i in range(det_size):
+        for j in range(det_size):
+            array2d[i][j] = matrix_ws.readY(j * det_size + i)[0]
+
+    return numpy.flipud(array2d)
+
+
+def check_extraction(det_size):
+    """ Check that the bulk extraction gives the same counts as the pixel-by-pixel one and is faster
+    :param det_size:
+    :return:
+    """
+    matrix_ws = create_detector_workspace(det_size)
+
+    start_time = time.time()
+    pixel_counts = extract_detector_counts_by_pixel(matrix_ws, det_size)
+    pixel_time = time.time() - start_time
+
+    start_time = time.time()
+    bulk_counts = detector_workspace.extract_detector_counts(matrix_ws)
+    bulk_time = time.time() - start_time
+
+    assert numpy.array_equal(pixel_counts, bulk_counts), 'Bulk extraction does not match pixel-by-pixel one ' \
+                                                         'on {0}x{0} detector'.format(det_size)
+    assert bulk_time < pixel_time, 'Bulk extraction ({0:.5f} s) is not faster than pixel-by-pixel one ' \
+                                   '({1:.5f} s) on {2}x{2} detector'.format(bulk_time, pixel_time, det_size)
+
+    return
+
+
+def test_extract_256():
+    check_extraction(256)
+
+
+def test_extract_512():
+    check_extraction(512)
+
+
+def test_square_detector_size():
+    assert detector_workspace.get_square_detector_size(512 * 512) == 512
+    try:
+        detector_workspace.get_square_detector_size(1000)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError('Non-square number of pixels is not rejected')
@@ -0,0 +1,66 @@
+"""
+Import time of the library modules.  Each module is imported in a fresh interpreter such that the time includes
+all its dependencies, and heavy packages (Mantid, Qt, ...) must only be imported on first use.
+"""
+from __future__ import (absolute_import, division, print_function)
+import json
+import os
+import subprocess
+import sys
+
+
+# seconds allowed to import a library module in a fresh interpreter
+IMPORT_TIME_BUDGET = 1.0
+# number of measurements, of which the fastest one is taken
+NUM_REPEATS = 3
+# packages that shall only be imported on first use
+HEAVY_PACKAGES = ['mantid', 'mantidqtpython', 'PyQt4', 'PyQt5', 'IPython', 'matplotlib']
+# root of the repository, from which py4circle is imported
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MEASURE_SCRIPT = """
+import json, sys, time
+start_time = time.time()
+import {0}
+import_time = time.time() - start_time
+print(json.dumps([import_time, sorted(set(name.split('.')[0] for name in sys.modules))]))
+"""
+
+
+def measure_import(module_name):
+    """ Import a module in a fresh interpreter
+    :param module_name:
+    :return: 2-tuple as (seconds, list of imported top-level packages)
+    """
+    output = subprocess.check_output([sys.executable, '-c', _MEASURE_SCRIPT.format(module_name)], cwd=REPO_DIR)
+    import_time, package_list = json.loads(output.decode().strip().split('\n')[-1])
+
+    return import_time, package_list
+
+
+def check_module(module_name):
+    """ Check that importing a module is within the time budget and does not import any heavy package
+    :param module_name:
+    :return:
+    """
+    time_list = list()
+    package_list = list()
+    for i_repeat in range(NUM_REPEATS):
+        import_time, package_list = measure_import(module_name)
+        time_list.append(import_time)
+
+    heavy_list = sorted(set(package_list) & set(HEAVY_PACKAGES))
+    assert len(heavy_list) == 0, 'Importing {0} imports {1}, which shall be imported on first use' \
+                                 ''.format(module_name, heavy_list)
+    assert min(time_list) <= IMPORT_TIME_BUDGET, 'Importing {0} takes {1:.3f} s, which exceeds the budget {2:.3f} s' \
+                                                 ''.format(module_name, min(time_list), IMPORT_TIME_BUDGET)
+
+    return
+
+
+def test_import_fourcircle_utility():
+    check_module('py4circle.lib.fourcircle_utility')
+
+
+def test_import_polarized_neutron_processor():
+    check_module('py4circle.lib.polarized_neutron_processor')
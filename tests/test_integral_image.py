@@ -0,0 +1,36 @@
+"""
+ROI sums from the integral image against numpy slicing
+"""
+from __future__ import (absolute_import, division, print_function)
+import unittest
+import numpy
+from py4circle.lib import integral_image
+
+
+class TestIntegralImage(unittest.TestCase):
+    """
+    integral image of a stack of detector frames
+    """
+    def setUp(self):
+        self._counts = numpy.random.randint(0, 1000, size=(5, 32, 32)).astype('uint32')
+        self._integral = integral_image.build_integral_image(self._counts)
+
+    def test_build(self):
+        self.assertEqual(self._integral.shape, (5, 33, 33))
+        self.assertEqual(self._integral.dtype, numpy.dtype('int64'))
+        self.assertTrue(numpy.array_equal(self._integral[:, -1, -1], self._counts.sum(axis=(1, 2))))
+
+    def test_sum_rectangles(self):
+        corners = numpy.random.randint(0, 32, size=(50, 4))
+        range_list = [(min(r0, r1), min(c0, c1), max(r0, r1), max(c0, c1)) for r0, c0, r1, c1 in corners]
+        # rectangles following numpy slicing rules: empty, negative and out of range
+        range_list.extend([(3, 3, 3, 10), (-5, 0, 32, -2), (20, 20, 100, 100)])
+
+        slice_sums = numpy.array([self._counts[:, r0:r1, c0:c1].sum(axis=(1, 2)) for r0, c0, r1, c1 in range_list])
+        table_sums = integral_image.sum_rectangles(self._integral, range_list)
+        self.assertTrue(numpy.array_equal(slice_sums.T, table_sums))
+
+    def test_sum_rectangle_2d(self):
+        frame_integral = integral_image.build_integral_image(self._counts[0].astype('float'))
+        self.assertEqual(integral_image.sum_rectangle(frame_integral, 2, 4, 10, 20),
+                         self._counts[0, 2:10, 4:20].sum())
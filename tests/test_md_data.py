@@ -0,0 +1,92 @@
+"""
+Loading ASCii MD event files generated by ConvertCWSDMDtoHKL by blocks and through the binary cache
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+from py4circle.lib import fourcircle_utility
+
+
+class TestLoadMdData(unittest.TestCase):
+    """
+    events loaded by blocks against the events written to the file
+    """
+    def setUp(self):
+        self._workDir = tempfile.mkdtemp()
+        self._mdFileName = os.path.join(self._workDir, 'md_events.dat')
+        self._cacheFileName = os.path.join(self._workDir, 'md_events.bin')
+        self._events = numpy.round(numpy.random.random((1000, 4)), 6)
+
+    def tearDown(self):
+        shutil.rmtree(self._workDir)
+
+    def write_md_file(self, text):
+        """ Write the MD event file as is
+        :param text:
+        :return:
+        """
+        with open(self._mdFileName, 'wb') as md_file:
+            md_file.write(text.encode('ascii'))
+
+        return
+
+    def check_events(self, events, **kwargs):
+        """ Check that the events loaded from the MD event file are the same as the events given
+        :param events: (n, 4) array
+        :return:
+        """
+        xyz_points, intensities = fourcircle_utility.load_hb3a_md_data(self._mdFileName, **kwargs)
+        self.assertTrue(numpy.array_equal(xyz_points, events[:, :3]))
+        self.assertTrue(numpy.array_equal(intensities, events[:, 3]))
+
+        return
+
+    def test_chunk_boundaries(self):
+        numpy.savetxt(self._mdFileName, self._events, fmt='%.6f', delimiter=', ')
+        # blocks smaller than a line, ending within a line and of many lines
+        for chunk_bytes in [7, 100, 4096, fourcircle_utility.MD_DATA_CHUNK_BYTES]:
+            self.check_events(self._events, chunk_bytes=chunk_bytes)
+
+    def test_blank_lines_and_crlf(self):
+        lines = ['{0:.6f}, {1:.6f}, {2:.6f}, {3:.6f}'.format(*event) for event in self._events[:10]]
+        self.write_md_file('\r\n\r\n' + '\r\n'.join(lines[:5]) + '\r\n\r\n   \r\n' + '\r\n'.join(lines[5:]))
+        self.check_events(self._events[:10], chunk_bytes=50)
+
+    def test_extra_columns(self):
+        extra_events = numpy.hstack((self._events, numpy.ones((self._events.shape[0], 2))))
+        numpy.savetxt(self._mdFileName, extra_events, fmt='%.6f', delimiter=',')
+        self.check_events(self._events, chunk_bytes=1000)
+
+    def test_empty_file(self):
+        self.write_md_file('\n\n')
+        xyz_points, intensities = fourcircle_utility.load_hb3a_md_data(self._mdFileName)
+        self.assertEqual(xyz_points.shape, (0, 3))
+        self.assertEqual(intensities.shape, (0, ))
+
+    def test_bad_lines(self):
+        for text in ['1,2,3,4\n5,6,7\n8,9,10,11\n', '1,2,3,4\n5,6,7,8,9\n10,11,12,13\n',
+                     '1,2,3,4\n5,6,7\n8,9,10,11,12\n', '1,2,3,4\n5,6,x,8\n', '1,2,3\n4,5,6\n', '1,2,,3,4\n']:
+            self.write_md_file(text)
+            self.assertRaises(RuntimeError, fourcircle_utility.load_hb3a_md_data, self._mdFileName)
+
+    def test_cache(self):
+        numpy.savetxt(self._mdFileName, self._events, fmt='%.6f', delimiter=', ')
+        self.check_events(self._events, cache_file_name=self._cacheFileName, chunk_bytes=1000)
+        self.assertTrue(os.path.exists(self._cacheFileName))
+        self.assertEqual(os.path.getsize(self._cacheFileName), self._events.size * 8)
+
+        # reused as long as it is newer than the ASCii file
+        cache_time = int(os.path.getmtime(self._mdFileName)) + 10
+        os.utime(self._cacheFileName, (cache_time, cache_time))
+        self.check_events(self._events, cache_file_name=self._cacheFileName)
+        self.assertEqual(os.path.getmtime(self._cacheFileName), cache_time)
+
+    def test_cache_bad_file(self):
+        # no cache or temporary cache is left if the file cannot be parsed
+        self.write_md_file('1,2,3,4\n5,6,7\n8,9,10,11,12\n')
+        self.assertRaises(RuntimeError, fourcircle_utility.load_hb3a_md_data, self._mdFileName,
+                          self._cacheFileName)
+        self.assertEqual(os.listdir(self._workDir), [os.path.basename(self._mdFileName)])
@@ -0,0 +1,59 @@
+"""
+Saving the 2D detector view with the ROIs drawn over it.  The tests are skipped if Qt is not available
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+try:
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    try:
+        from PyQt4.QtGui import QApplication
+    except ImportError:
+        raise unittest.SkipTest('PyQt is not available')
+import matplotlib.image
+from py4circle.interface.gui.mplgraphicsview2d import MplGraphicsView2D
+
+
+def get_application():
+    """ Get the QApplication required by widgets, without a display
+    :return:
+    """
+    if QApplication.instance() is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        return QApplication([])
+
+    return QApplication.instance()
+
+
+class TestSaveImage(unittest.TestCase):
+    """
+    ROI rectangles are overlays, which are animated artists
+    """
+    def setUp(self):
+        self._app = get_application()
+        self._workDir = tempfile.mkdtemp()
+        self._view = MplGraphicsView2D(None)
+        self._view.resize(400, 400)
+        self._view.show()
+        self._view.add_2d_plot(numpy.zeros((64, 64)), x_min=0, x_max=64, y_min=0, y_max=64)
+        self._app.processEvents()
+
+    def tearDown(self):
+        self._view.close()
+        shutil.rmtree(self._workDir)
+
+    def test_save_with_roi(self):
+        image_name = os.path.join(self._workDir, 'detector.png')
+        roi_rect = self._view.canvas().add_rectangular(0, 0, 64, 64, 'red', 'roi')
+        self._app.processEvents()
+        self._view.save_image(image_name)
+
+        # red of the image of zero counts is 0.27 (viridis) without the ROI
+        image = matplotlib.image.imread(image_name)
+        self.assertTrue(image.shape[0] > 0)
+        self.assertTrue(image[image.shape[0] // 2, image.shape[1] // 2, 0] > 0.35)
+        self.assertTrue(roi_rect.get_animated())
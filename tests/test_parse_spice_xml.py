@@ -0,0 +1,67 @@
+"""
+Parsing detector counts out of SPICE XML files
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+from py4circle.lib import parse_spice_xml
+
+
+def write_spice_xml(xml_name, count_matrix):
+    """ Write a SPICE detector XML file with the counts of a square detector, one detector row per line
+    :param xml_name:
+    :param count_matrix: 2D integer array
+    :return:
+    """
+    det_str = '\n'.join(['\t'.join([str(count) for count in row]) for row in count_matrix])
+    with open(xml_name, 'w') as xml_file:
+        xml_file.write('<?xml version="1.0" encoding="UTF-8"?>\n<SPICErack>\n<Header>\n</Header>\n<Data>\n'
+                       '<Detector type="INT32[{0},{0}]">\n{1}\n</Detector>\n</Data>\n</SPICErack>\n'
+                       ''.format(count_matrix.shape[0], det_str))
+
+    return
+
+
+class TestParseSpiceXml(unittest.TestCase):
+    """
+    stream parsing against the original ElementTree parsing
+    """
+    def setUp(self):
+        self._workDir = tempfile.mkdtemp()
+        self._xmlName = os.path.join(self._workDir, 'HB3A_exp1_scan0001_0001.xml')
+        self._counts = numpy.random.randint(0, 70000, size=(64, 64))
+        write_spice_xml(self._xmlName, self._counts)
+
+    def tearDown(self):
+        shutil.rmtree(self._workDir)
+
+    def test_stream_matches_etree(self):
+        stream_matrix = parse_spice_xml.get_counts_xml_file(self._xmlName, method='stream')
+        etree_matrix = parse_spice_xml.get_counts_xml_file(self._xmlName, method='etree')
+        assert numpy.array_equal(stream_matrix, etree_matrix), 'Stream and etree parsing are different'
+        assert numpy.array_equal(etree_matrix, numpy.rot90(self._counts.astype('float'), 1))
+
+    def test_compact_dtype(self):
+        compact_matrix = parse_spice_xml.get_counts_xml_file(self._xmlName, dtype=parse_spice_xml.COMPACT_DTYPE)
+        assert compact_matrix.dtype == numpy.dtype('uint32'), 'Counts above 65535 need uint32'
+        assert numpy.array_equal(compact_matrix, numpy.rot90(self._counts, 1))
+
+    def test_bad_count(self):
+        with open(self._xmlName, 'r') as xml_file:
+            xml_str = xml_file.read()
+        # replace the count in the middle of the detector
+        det_lines = xml_str.split('\n')
+        det_lines[6 + 32] = 'abc\t' + det_lines[6 + 32].split('\t', 1)[1]
+        with open(self._xmlName, 'w') as xml_file:
+            xml_file.write('\n'.join(det_lines))
+
+        for dtype in ['float', parse_spice_xml.COMPACT_DTYPE]:
+            try:
+                parse_spice_xml.get_counts_xml_file(self._xmlName, dtype=dtype)
+            except RuntimeError as run_err:
+                assert self._xmlName in str(run_err), 'Error message {0} does not name the file'.format(run_err)
+            else:
+                raise AssertionError('Bad count is not detected')
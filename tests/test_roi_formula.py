@@ -0,0 +1,65 @@
+"""
+Formula on the integrated counts of ROIs
+"""
+from __future__ import (absolute_import, division, print_function)
+import unittest
+import numpy
+from py4circle.lib.roi_formula import RoiFormula, get_variable_name
+
+
+class TestRoiFormula(unittest.TestCase):
+    """
+    parsing, checking and evaluating formulas
+    """
+    def setUp(self):
+        self._columnDict = {'roi0': numpy.array([10., 20., 30.]),
+                            'roi0_upper_bkgd': numpy.array([1., 2., 3.]),
+                            'roi0_lower_bkgd': numpy.array([3., 2., 1.])}
+
+    def test_variable_name(self):
+        self.assertEqual(get_variable_name(0), 'roi0')
+        self.assertEqual(get_variable_name('0_upper_bkgd'), 'roi0_upper_bkgd')
+        self.assertEqual(get_variable_name('peak-1'), 'peak_1')
+
+    def test_evaluate_columns(self):
+        formula = RoiFormula('roi0 - 0.5 * (roi0_upper_bkgd + roi0_lower_bkgd)')
+        self.assertEqual(formula.variables, ['roi0', 'roi0_lower_bkgd', 'roi0_upper_bkgd'])
+
+        # same as evaluating the formula row by row
+        row_values = [RoiFormula(str(formula)).evaluate(dict([(name, self._columnDict[name][row])
+                                                              for name in self._columnDict]))
+                      for row in range(3)]
+        self.assertTrue(numpy.allclose(formula.evaluate(self._columnDict), row_values))
+        self.assertTrue(numpy.allclose(formula.evaluate(self._columnDict), [8., 18., 28.]))
+
+    def test_functions_and_constants(self):
+        result = RoiFormula('sqrt(roi0) * cos(0) + pi - pi').evaluate(self._columnDict)
+        self.assertTrue(numpy.allclose(result, numpy.sqrt(self._columnDict['roi0'])))
+
+    def test_constant_formula(self):
+        result = RoiFormula('2 * 3').evaluate(self._columnDict)
+        self.assertTrue(numpy.array_equal(result, [6., 6., 6.]))
+
+    def test_division_by_zero(self):
+        result = RoiFormula('roi0 / (roi0_upper_bkgd - 2)').evaluate(self._columnDict)
+        self.assertTrue(numpy.isinf(result[1]))
+
+    def test_rejected(self):
+        for expression in ['__import__("os")', 'roi0.real', 'roi0[0]', 'sqrt(x=roi0)', '"a"',
+                           'lambda: 1', 'roi0 if roi0 else 1', 'roi0 +']:
+            self.assertRaises(RuntimeError, RoiFormula, expression)
+
+    def test_undefined_variable(self):
+        self.assertRaises(RuntimeError, RoiFormula('roi1 + roi0').evaluate, self._columnDict)
+
+    def test_power(self):
+        result = RoiFormula('roi0 ** 2 + roi0 ** -0.5 + 2 ** 10').evaluate(self._columnDict)
+        self.assertTrue(numpy.allclose(result, self._columnDict['roi0'] ** 2 + self._columnDict['roi0'] ** -0.5 +
+                                       1024.))
+
+        # exponent must be a small number
+        for expression in ['9 ** 9 ** 9', 'roi0 ** 1000', 'roi0 ** roi0', '2 ** (1 + 1)', 'roi0 ** -101']:
+            self.assertRaises(RuntimeError, RoiFormula, expression)
+        # powers of constants overflow
+        self.assertRaises(RuntimeError, RoiFormula('((9 ** 99) ** 99) ** 99').evaluate, self._columnDict)
+        self.assertRaises(RuntimeError, RoiFormula('1 / 0').evaluate, self._columnDict)
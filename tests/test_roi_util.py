@@ -0,0 +1,38 @@
+"""
+Background ROIs around a peak ROI and their ranges in the detector counts matrix
+"""
+from __future__ import (absolute_import, division, print_function)
+import unittest
+from py4circle.lib import roi_util
+
+
+class TestRoiUtil(unittest.TestCase):
+    """
+    ROIs in detector pixel coordinates to detector counts matrix ranges
+    """
+    def test_background_roi_name(self):
+        self.assertTrue(roi_util.is_background_roi_name(roi_util.get_background_roi_name(0, roi_util.UPPER_BKGD)))
+        self.assertTrue(roi_util.is_background_roi_name('peak_encircle'))
+        self.assertFalse(roi_util.is_background_roi_name(0))
+        self.assertFalse(roi_util.is_background_roi_name('peak'))
+
+    def test_inside(self):
+        roi_dimension_dict = roi_util.add_background_rois({0: [100, 100, 20, 10]})
+        matrix_range_dict, multiply_factor_dict = roi_util.convert_rois_to_matrix_ranges(roi_dimension_dict, 256)
+        self.assertEqual(set(matrix_range_dict.keys()), set(roi_dimension_dict.keys()))
+        for roi_name in multiply_factor_dict:
+            self.assertEqual(multiply_factor_dict[roi_name], 1.)
+
+    def test_background_outside(self):
+        # peak ROI at the bottom edge of the detector: lower background is outside
+        roi_dimension_dict = roi_util.add_background_rois({0: [100, -6, 20, 10]})
+        matrix_range_dict, multiply_factor_dict = roi_util.convert_rois_to_matrix_ranges(roi_dimension_dict, 256)
+
+        lower_bkgd_name = roi_util.get_background_roi_name(0, roi_util.LOWER_BKGD)
+        self.assertEqual(multiply_factor_dict[lower_bkgd_name], 0.)
+        for roi_name in [0, roi_util.get_background_roi_name(0, roi_util.UPPER_BKGD)]:
+            self.assertTrue(multiply_factor_dict[roi_name] > 0.)
+
+    def test_peak_outside(self):
+        roi_dimension_dict = roi_util.add_background_rois({0: [300, 300, 20, 10]})
+        self.assertRaises(RuntimeError, roi_util.convert_rois_to_matrix_ranges, roi_dimension_dict, 256)
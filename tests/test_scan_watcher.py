@@ -0,0 +1,108 @@
+"""
+Following a scan in progress by polling the data directory
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy
+from py4circle.lib import scan_watcher
+
+
+class DetectorFileProcessor(object):
+    """
+    processor loading detector counts from the files in data directory
+    """
+    instrument_name = 'HB3A'
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def load_spice_xml_file2(self, exp_no, scan_no, pt_no):
+        file_name = os.path.join(self.data_dir, 'HB3A_exp{0}_scan{1:04}_{2:04}.xml'.format(exp_no, scan_no, pt_no))
+        with open(file_name, 'r') as det_file:
+            counts = [int(term) for term in det_file.read().split()]
+
+        return numpy.array(counts).reshape((4, 4))
+
+
+class TestScanWatcher(unittest.TestCase):
+    """
+    integrate the Pts. written to the data directory
+    """
+    def setUp(self):
+        self._dataDir = tempfile.mkdtemp()
+        self._processor = DetectorFileProcessor(self._dataDir)
+        self._roiRangeDict = {'0': ((0, 0), (2, 2)), '1': ((2, 2), (4, 4))}
+        self._pyinotify = scan_watcher.pyinotify
+        scan_watcher.pyinotify = None
+
+    def tearDown(self):
+        scan_watcher.pyinotify = self._pyinotify
+        shutil.rmtree(self._dataDir)
+
+    def write_pt(self, pt_number, content=None):
+        """ Write the detector file of a Pt. with all counts equal to the pt number
+        :param pt_number:
+        :param content: file content.  None for the counts
+        :return:
+        """
+        if content is None:
+            content = ' '.join([str(pt_number)] * 16)
+        with open(os.path.join(self._dataDir, 'HB3A_exp1_scan0002_{0:04}.xml'.format(pt_number)), 'w') as det_file:
+            det_file.write(content)
+
+        return
+
+    def test_poll(self):
+        watcher = scan_watcher.ScanWatcher(self._processor, 1, 2, self._roiRangeDict)
+        self.assertEqual(watcher.update(), None)
+
+        # Pts. after a missing Pt. are not found until the missing Pt. is written
+        for pt_number in [1, 2, 4]:
+            self.write_pt(pt_number)
+        update_dict = watcher.update()
+        self.assertEqual(update_dict['pts'], [1, 2])
+        self.assertTrue(numpy.array_equal(update_dict['counts']['0'], [4., 8.]))
+
+        self.write_pt(3)
+        self.assertEqual(watcher.update()['pts'], [3, 4])
+        self.assertEqual(watcher.update(), None)
+        self.assertEqual(watcher.pt_numbers, [1, 2, 3, 4])
+
+    def test_resume(self):
+        for pt_number in [1, 2, 3]:
+            self.write_pt(pt_number)
+        integrated_counts_dict = {'0': ([1, 2], numpy.array([4., 8.])), '1': ([1, 2], numpy.array([4., 8.]))}
+        watcher = scan_watcher.ScanWatcher(self._processor, 1, 2, self._roiRangeDict,
+                                           integrated_counts_dict=integrated_counts_dict)
+        self.assertEqual(watcher.update()['pts'], [3])
+
+    def test_error(self):
+        # an error other than RuntimeError is reported and the watcher keeps on watching.  the Pt. is integrated
+        # once the file is fixed
+        error_list = list()
+        update_event = threading.Event()
+
+        def update_callback(update_dict):
+            update_event.set()
+
+        def error_callback(error_message):
+            error_list.append(error_message)
+            if len(error_list) == 1:
+                self.write_pt(1)
+
+        self.write_pt(1, 'not counts')
+        watcher = scan_watcher.ScanWatcher(self._processor, 1, 2, self._roiRangeDict, update_callback=update_callback,
+                                           poll_interval=0.01, error_callback=error_callback)
+        watcher.start()
+        try:
+            self.assertTrue(update_event.wait(10.))
+        finally:
+            watcher.stop()
+
+        self.assertEqual(len(error_list), 1)
+        self.assertTrue('Scan 2' in error_list[0])
+        self.assertEqual(watcher.pt_numbers, [1])
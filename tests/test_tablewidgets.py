@@ -0,0 +1,62 @@
+"""
+Integrated counts table backed by a structured array.  The tests are skipped if Qt is not available
+"""
+from __future__ import (absolute_import, division, print_function)
+import os
+import unittest
+import numpy
+try:
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    try:
+        from PyQt4.QtGui import QApplication
+    except ImportError:
+        raise unittest.SkipTest('PyQt is not available')
+from py4circle.interface.gui.tablewidgets import IntegratedCountsTable
+
+
+def get_application():
+    """ Get the QApplication required by widgets, without a display
+    :return:
+    """
+    if QApplication.instance() is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        return QApplication([])
+
+    return QApplication.instance()
+
+
+class TestIntegratedCountsTable(unittest.TestCase):
+    """
+    set, append and read back whole columns
+    """
+    def setUp(self):
+        self._app = get_application()
+        self._table = IntegratedCountsTable(None)
+        self._table.setup('Pt', 'int', ['0', '0_upper_bkgd'])
+        self._countsDict = {'0': numpy.array([10., 20., 30., 40.]),
+                            '0_upper_bkgd': numpy.array([1., 2., 3., 4.])}
+        self._table.set_integrated_counts([1, 2, 3, 4], self._countsDict)
+
+    def test_set_and_read(self):
+        self.assertEqual(self._table.rowCount(), 4)
+        self.assertTrue(numpy.array_equal(self._table.get_column_data('Pt'), [1, 2, 3, 4]))
+        for roi_name in self._countsDict:
+            self.assertTrue(numpy.array_equal(self._table.get_column_data(roi_name), self._countsDict[roi_name]))
+
+    def test_append(self):
+        self._table.append_integrated_counts([5, 6], {'0': numpy.array([50., 60.]),
+                                                      '0_upper_bkgd': numpy.array([5., 6.])})
+        self.assertEqual(self._table.rowCount(), 6)
+        self.assertTrue(numpy.array_equal(self._table.get_column_data('0'), [10., 20., 30., 40., 50., 60.]))
+
+    def test_polarization(self):
+        # set by spin-up Pts.
+        self._table.set_polarization_values([1, 3], [1.5, 2.5])
+        polarization_vec = self._table.get_column_data('Polarization')
+        self.assertEqual(polarization_vec[0], 1.5)
+        self.assertEqual(polarization_vec[2], 2.5)
+
+        # set every other row
+        self._table.set_column_values(self._table._polarizationColumnIndex, [3.5, 4.5], skip=1)
+        self.assertTrue(numpy.array_equal(self._table.get_column_data('Polarization')[[0, 2]], [3.5, 4.5]))